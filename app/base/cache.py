@@ -0,0 +1,123 @@
+import hashlib
+import uuid
+from functools import wraps
+from typing import Callable, Iterable
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from app.base.renderers import PrerenderedJSONResponse
+from app.core.db_routers import read_from_primary
+
+
+CACHE_TAG_KEY = 'cache_tag'
+CACHED_RESPONSE_KEY = 'cached_response'
+
+
+def get_list_cache_tag(name: str) -> str:
+    return f'{name}:list'
+
+
+def get_object_cache_tag(name: str, object_id) -> str:
+    return f'{name}:{object_id}'
+
+
+def get_cache_tag_key(tag: str) -> str:
+    return f'{CACHE_TAG_KEY}:{tag}'
+
+
+def get_cache_tag_versions(tags: Iterable[str]) -> dict[str, str]:
+    """
+    This function will return the current version token of each tag, creating the missing ones
+    Input:
+        tags: list of tags, like product:list or product:1
+    Output:
+        {<tag>: <version token>}
+    """
+    tag_keys = {get_cache_tag_key(tag): tag for tag in tags}
+    versions = {
+        tag_keys[tag_key]: version
+        for tag_key, version in cache.get_many(tag_keys.keys()).items()
+    }
+
+    for tag_key, tag in tag_keys.items():
+        if tag in versions:
+            continue
+        # another process may create the version at the same time, keep whichever was stored first
+        cache.add(tag_key, uuid.uuid4().hex, timeout=None)
+        versions[tag] = cache.get(tag_key)
+
+    return versions
+
+
+def invalidate_cache_tags(*tags: str) -> None:
+    """
+    This function will invalidate every cached value registered under one of the tags.
+    Only the version token of each tag is replaced, the stale values are never read again and expire on their own.
+    Input:
+        tags: list of tags, like product:list or product:1
+    """
+    if not tags:
+        return
+
+    cache.set_many({get_cache_tag_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+
+def cache_response(timeout: int, prefix: str, tags: Callable[..., list[str]], vary_on_user: bool = False):
+    """
+    Cache the data of successful responses of a DRF view method under tags.
+    Input:
+        timeout: int, seconds to keep a response
+        prefix: str, namespace of the cached responses
+        tags: callable receiving the same arguments as the view method and returning the tags of the response
+        vary_on_user: bool, keep a separate response per authenticated user and role, for user dependent querysets
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            versions = get_cache_tag_versions(tags(view, request, *args, **kwargs))
+            cache_key = get_cached_response_key(prefix, request, versions, vary_on_user)
+
+            cached_data = cache.get(cache_key)
+            if isinstance(cached_data, bytes):
+                return PrerenderedJSONResponse(cached_data)
+            if cached_data is not None:
+                return Response(cached_data, status=status.HTTP_200_OK)
+
+            # the cached response is served until the next invalidation, it is not built from a replica
+            with read_from_primary():
+                response = view_method(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                # a prerendered response is cached as its bytes
+                data = response.content if isinstance(response, PrerenderedJSONResponse) else response.data
+                cache.set(cache_key, data, timeout=timeout)
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def get_cached_response_key(prefix: str, request, versions: dict[str, str], vary_on_user: bool = False) -> str:
+    fingerprint = '|'.join([
+        get_request_user_fingerprint(request) if vary_on_user else '',
+        request.path,
+        '&'.join(
+            f'{key}={value}'
+            for key, values in sorted(request.query_params.lists())
+            for value in values
+        ),
+        '&'.join(f'{tag}={version}' for tag, version in sorted(versions.items())),
+    ])
+
+    return f'{CACHED_RESPONSE_KEY}:{prefix}:{hashlib.md5(fingerprint.encode()).hexdigest()}'
+
+
+def get_request_user_fingerprint(request) -> str:
+    user = request.user
+    if not user or not user.is_authenticated:
+        return 'anonymous'
+
+    return f'{user.id}:{user.role}'
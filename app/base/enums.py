@@ -7,3 +7,7 @@ class BaseEnum(Enum):
     @classmethod
     def choices(cls):
         return [(item.value, item.name) for item in cls]
+
+    @classmethod
+    def values(cls):
+        return [item.value for item in cls]
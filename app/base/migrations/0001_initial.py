@@ -0,0 +1,45 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+
+CODE_COUNTER_KEYS = ['booking.booking', 'product.productpriceconfiguration']
+
+
+def create_code_counters(apps, schema_editor):
+    CodeCounter = apps.get_model('base', 'CodeCounter')
+    # without a day, the first allocation starts after the last code of the day in the database
+    CodeCounter.objects.bulk_create([CodeCounter(key=key) for key in CODE_COUNTER_KEYS], ignore_conflicts=True)
+
+
+def drop_code_sequences(apps, schema_editor):
+    # the per day sequences the codes were allocated from before the counters
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT relname FROM pg_class WHERE relkind = 'S' AND starts_with(relname, 'code_allocator_')")
+        for (name,) in cursor.fetchall():
+            cursor.execute(f'DROP SEQUENCE IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=128, unique=True)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_code_counters, migrations.RunPython.noop),
+        migrations.RunPython(drop_code_sequences, migrations.RunPython.noop),
+    ]
@@ -21,3 +21,12 @@ class SoftDeleteMixin(models.Model):
         self.is_deleted = True
         self.deleted_at = timezone.now()
         self.save()
+
+
+class CodeCounter(models.Model):
+    """
+    Last code number handed out of a model for the day, see app.core.utils.code
+    """
+    key = models.CharField(max_length=128, unique=True)
+    day = models.DateField(null=True, blank=True)
+    value = models.BigIntegerField(default=0)
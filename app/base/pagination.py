@@ -1,11 +1,218 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 
+# below this estimate the exact count is cheap enough to be run
+APPROXIMATE_COUNT_THRESHOLD = 10_000
+
+
+def estimate_count(queryset) -> int:
+    """
+    This function will return the number of rows PostgreSQL expects the queryset to return, without counting them
+    Input: queryset
+    Output: the estimate, None when it is not available
+    """
+    if not isinstance(queryset, QuerySet) or connections[queryset.db].vendor != 'postgresql':
+        return None
+
+    # a whole table: the row count kept up to date by autovacuum
+    if not queryset.query.where and not queryset.query.group_by and not queryset.query.distinct:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # -1 until the table is analyzed for the first time
+        if row and row[0] >= 0:
+            return int(row[0])
+        return None
+
+    # a filtered queryset: the estimate of the planner
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class ApproximateCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= APPROXIMATE_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+
+def is_nullable_ordering_field(queryset, field_name: str) -> bool:
+    # the annotations may be empty, unless they are coalesced
+    if not isinstance(queryset, QuerySet):
+        return False
+    if field_name in queryset.query.annotations:
+        return not isinstance(queryset.query.annotations[field_name], Coalesce)
+    if field_name == 'pk':
+        return False
+
+    try:
+        return queryset.model._meta.get_field(field_name).null
+    except FieldDoesNotExist:
+        return False
+
+
+def get_ordering_value(instance, field_name: str):
+    if isinstance(instance, dict):
+        return instance[field_name]
+
+    # the foreign keys are positioned on their id
+    try:
+        field_name = instance._meta.get_field(field_name).attname
+    except FieldDoesNotExist:
+        pass
+    return getattr(instance, field_name)
+
+
+class CustomCursorPagination(CursorPagination):
+    """
+    Cursor pagination positioned on every ordering field, the primary key last, instead of the first one only:
+    the rows sharing a value are neither skipped nor repeated and no offset is needed.
+    The ordering fields can not be empty, a NULL is never before nor after a position.
+    """
+    page_size_query_param = 'page_size'
+    ordering = '-created_at'
+
+    def get_ordering(self, request, queryset, view):
+        # keep the ordering the listing was given, the ordering filter of the view still has precedence
+        if isinstance(queryset, QuerySet):
+            queryset_ordering = [field for field in queryset.query.order_by if isinstance(field, str)]
+            if queryset_ordering:
+                self.ordering = queryset_ordering
+
+        ordering = super().get_ordering(request, queryset, view)
+
+        # the primary key breaks the ties of the cursor field, in the same direction
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+
+        for field in ordering:
+            if is_nullable_ordering_field(queryset, field.lstrip('-')):
+                raise ValidationError({'ordering': f'Can not paginate with a cursor on {field.lstrip("-")}, it may be empty'})
+
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*[field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self.get_position_filter(self.decode_position(current_position), reverse))
+
+        # one more row tells whether there is a following page
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        has_following_position = len(results) > len(self.page)
+        following_position = self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_position_filter(self, position: list[str], reverse: bool) -> Q:
+        """
+        This function will return the rows after a position in the pagination order,
+        (a, b, id) > (1, 2, 3) is a > 1 or (a = 1 and b > 2) or (a = 1 and b = 2 and id > 3)
+        """
+        position_filter = Q()
+        previous_fields_equal = Q()
+        for field, value in zip(self.ordering, position):
+            field_name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            position_filter |= previous_fields_equal & Q(**{f'{field_name}__{lookup}': value})
+            previous_fields_equal &= Q(**{field_name: value})
+
+        return position_filter
+
+    def decode_position(self, position: str) -> list[str]:
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return values
+
+    def _get_position_from_instance(self, instance, ordering):
+        return json.dumps([str(get_ordering_value(instance, field.lstrip('-'))) for field in ordering])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'page_size': self.page_size,
+            'data': data
+        })
+
+
 class CustomPagination(PageNumberPagination):
+    """
+    Page number pagination, with two opt-in modes for the large listings:
+    - ?cursor= switches to cursor pagination on the listing ordering, without COUNT nor OFFSET
+    - ?count=approximate reports the planner estimate as total when the listing is large
+    """
     page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_pagination = None
+        if self.cursor_query_param in request.query_params and isinstance(queryset, QuerySet):
+            self.cursor_pagination = CustomCursorPagination()
+            return self.cursor_pagination.paginate_queryset(queryset, request, view)
+
+        if request.query_params.get(self.count_query_param) == 'approximate':
+            self.django_paginator_class = ApproximateCountPaginator
+
+        return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
+        if self.cursor_pagination:
+            return self.cursor_pagination.get_paginated_response(data)
+
         return Response({
             'total': self.page.paginator.count,
             'total_page': self.page.paginator.num_pages,
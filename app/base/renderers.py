@@ -0,0 +1,104 @@
+import datetime
+import decimal
+
+import orjson
+from django.db.models.query import QuerySet
+from django.http import HttpResponse
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+
+# datetime, date, time, UUID and dataclasses are encoded natively, UTC datetimes end with Z like the DRF encoder
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def default_orjson_encoder(obj):
+    """
+    This function will encode the types orjson does not support, the same way as the DRF encoder
+    Input: obj
+    Output: a value orjson can encode
+    """
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        try:
+            return dict(obj)
+        except (TypeError, ValueError):
+            pass
+    if hasattr(obj, '__iter__'):
+        return tuple(obj)
+
+    raise TypeError(f'Type is not JSON serializable: {type(obj).__name__}')
+
+
+def render_json(data, indent: bool = False) -> bytes:
+    options = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    return orjson.dumps(data, default=default_orjson_encoder, option=options)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson, the output is compact UTF-8 like the default DRF settings
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+
+        return render_json(data, indent=bool(indent))
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSON parser backed by orjson
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+def render_prerendered_list(envelope: dict, rendered_items: list[bytes], data_key: str = 'data') -> bytes:
+    """
+    This function will build a JSON list response from items already rendered to JSON bytes, without parsing them again
+    Input:
+        envelope: dict, the other keys of the response, like the pagination
+        rendered_items: list of JSON documents
+        data_key: str, the key of the items in the envelope
+    Output: JSON bytes
+    """
+    items = b'[' + b','.join(rendered_items) + b']'
+    if envelope is None:
+        return items
+
+    envelope = {key: value for key, value in envelope.items() if key != data_key}
+    rendered_envelope = render_json(envelope)
+    separator = b',' if envelope else b''
+
+    return rendered_envelope[:-1] + separator + render_json(data_key) + b':' + items + b'}'
+
+
+class PrerenderedJSONResponse(HttpResponse):
+    """
+    Response whose body is already JSON bytes, it skips the DRF renderers
+    """
+    def __init__(self, content: bytes, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content, **kwargs)
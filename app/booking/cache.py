@@ -0,0 +1,35 @@
+from django.db import transaction
+
+from app.base.cache import get_list_cache_tag, get_object_cache_tag, invalidate_cache_tags
+
+
+BOOKING_CACHE_TAG = 'booking'
+CUSTOMER_BOOKING_CACHE_TAG = 'booking_customer'
+
+
+def get_booking_list_cache_tags(user) -> list[str]:
+    # internal users list every booking, customers only their own
+    if user.is_internal:
+        return [get_list_cache_tag(BOOKING_CACHE_TAG)]
+
+    return [get_object_cache_tag(CUSTOMER_BOOKING_CACHE_TAG, user.id)]
+
+
+def get_booking_cache_tags(booking) -> list[str]:
+    tags = [
+        get_list_cache_tag(BOOKING_CACHE_TAG),
+        get_object_cache_tag(BOOKING_CACHE_TAG, booking.code),
+    ]
+    if booking.customer_id:
+        tags.append(get_object_cache_tag(CUSTOMER_BOOKING_CACHE_TAG, booking.customer_id))
+
+    return tags
+
+
+def invalidate_booking_cache(booking) -> None:
+    """
+    Invalidate the cached responses showing the booking, once the current transaction is committed
+    so that a concurrent request can not cache the data being replaced
+    """
+    tags = get_booking_cache_tags(booking)
+    transaction.on_commit(lambda: invalidate_cache_tags(*tags))
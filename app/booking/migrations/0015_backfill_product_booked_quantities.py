@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_product_booked_quantities(apps, schema_editor):
+    BookingItem = apps.get_model('booking', 'BookingItem')
+    ProductBookedQuantity = apps.get_model('product', 'ProductBookedQuantity')
+
+    booked_quantities = (
+        BookingItem.objects
+        .filter(due_datetime__isnull=False, booking__is_deleted=False)
+        .exclude(booking__status='cancelled')
+        .annotate(day=TruncDate('due_datetime'))
+        .values('product_id', 'day')
+        .annotate(quantity=Sum('quantity'))
+    )
+
+    ProductBookedQuantity.objects.all().delete()
+    ProductBookedQuantity.objects.bulk_create([
+        ProductBookedQuantity(product_id=item['product_id'], day=item['day'], quantity=item['quantity'])
+        for item in booked_quantities
+    ], batch_size=1_000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0014_booking_deleted_at_booking_is_deleted'),
+        ('product', '0013_product_booked_quantity'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_product_booked_quantities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0015_backfill_product_booked_quantities'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0016_booking_hold_expires_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['customer', 'created_at'], name='booking_customer_created_idx'),
+        ),
+    ]
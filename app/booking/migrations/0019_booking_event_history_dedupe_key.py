@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+
+# the key of an event is the sha256 of its fields, like BookingEventHistory.build_dedupe_key, which writes None
+# for the empty ones. No row is deleted: the later copies of an event are flagged as duplicates and also hash
+# their id in, so their key stays unique and the earliest row keeps the key of the event for the next writes
+SET_DEDUPE_KEYS = """
+UPDATE booking_bookingeventhistory AS event_history
+SET is_duplicate = ranked_event_history.position > 1,
+dedupe_key = encode(sha256(convert_to(
+    concat_ws(
+        '_',
+        event_history.event_type,
+        coalesce(event_history.instance_type, 'None'),
+        coalesce(event_history.instance_id, 'None'),
+        coalesce(event_history.description, 'None')
+    ) || CASE WHEN ranked_event_history.position > 1 THEN '_' || event_history.id::text ELSE '' END,
+    'UTF8'
+)), 'hex')
+FROM (
+    SELECT
+        id,
+        row_number() OVER (
+            PARTITION BY event_type, instance_type, instance_id, description
+            ORDER BY created_at, id
+        ) AS position
+    FROM booking_bookingeventhistory
+) AS ranked_event_history
+WHERE ranked_event_history.id = event_history.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0018_booking_outbox_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingeventhistory',
+            name='dedupe_key',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='bookingeventhistory',
+            name='is_duplicate',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunSQL(SET_DEDUPE_KEYS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0019_booking_event_history_dedupe_key'),
+    ]
+
+    # the unique constraint is added once the existing rows are deduplicated and committed
+    operations = [
+        migrations.AlterField(
+            model_name='bookingeventhistory',
+            name='dedupe_key',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='bookingeventhistory',
+            index=models.Index(fields=['instance_type', 'instance_id', 'created_at'], name='booking_history_instance_idx'),
+        ),
+    ]
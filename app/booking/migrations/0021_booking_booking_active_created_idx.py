@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0020_booking_event_history_unique_dedupe_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at'], name='booking_active_created_idx'),
+        ),
+    ]
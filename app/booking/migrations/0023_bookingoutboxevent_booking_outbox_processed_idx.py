@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0022_alter_booking_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookingoutboxevent',
+            index=models.Index(condition=models.Q(('processed_at__isnull', False)), fields=['processed_at'], name='booking_outbox_processed_idx'),
+        ),
+    ]
@@ -1,9 +1,12 @@
+import hashlib
 import uuid
-from datetime import datetime
-from django.db import models
+from enum import Enum
+
+from django.db import models, transaction
 
 from app.base.models import BaseModel, SoftDeleteMixin
 from app.base.enums import BaseEnum
+from app.core.utils.code import allocate_code, allocate_codes
 from app.product.models import Currency, Product
 from app.user.models import User
 
@@ -30,10 +33,25 @@ class BookingStatus(models.TextChoices):
     REJECTED = 'rejected'
     COMPLETED = 'completed'
     CANCELLED = 'cancelled'
+    # paid after it was cancelled and its capacity could not be taken back, to refund or review
+    REFUND_PENDING = 'refund_pending'
 
 
 class Booking(BaseModel, SoftDeleteMixin):
     PREFIX_CODE = 'BK'
+    # statuses whose items no longer count against the product capacity
+    CAPACITY_RELEASED_STATUSES = [BookingStatus.CANCELLED, BookingStatus.REFUND_PENDING]
+    # statuses whose capacity hold is released by the sweeper once expired
+    CAPACITY_HOLD_STATUSES = [BookingStatus.NEW, BookingStatus.PENDING_PAYMENT]
+    CAPACITY_HOLD_TTL = 60 * 15
+    # statuses of the bookings the customer has paid for
+    PAID_STATUSES = [
+        BookingStatus.PAID,
+        BookingStatus.CONFIRMED,
+        BookingStatus.PROCESSING,
+        BookingStatus.PROCESSING_BY_GOVERNMENT,
+        BookingStatus.COMPLETED,
+    ]
 
     code = models.CharField(max_length=16, unique=True)
     status = models.CharField(max_length=32, choices=BookingStatus.choices, default=BookingStatus.NEW)
@@ -52,26 +70,36 @@ class Booking(BaseModel, SoftDeleteMixin):
     guest_info = models.JSONField(default=dict)
     details = models.JSONField(default=dict)
 
+    # the booked quantities are only held until then if the booking is not paid
+    hold_expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # customer listing aggregates and the bookings of a customer by date
+            models.Index(fields=['customer', 'created_at'], name='booking_customer_created_idx'),
+            # the booking listing, which never shows the deleted bookings
+            models.Index(fields=['-created_at'], name='booking_active_created_idx', condition=models.Q(is_deleted=False)),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.code:
             self.code = self.generate_unique_code()
             
         if not self.validate():
             raise ValueError('Invalid data')
-            
-        return super().save(*args, **kwargs)
+        
+        # the booked quantity counters are adjusted by the save signals, within the same transaction
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
 
     def generate_unique_code(self):
         # code = BK + YYMMDD + 4 digits
         # example: BK2506170001
-        today = datetime.now().strftime('%y%m%d')
-        last_booking = Booking.objects.filter(code__startswith=f'{self.PREFIX_CODE}{today}').order_by('-code').first()
-        if last_booking:
-            last_booking_number = int(last_booking.code.split(f'{self.PREFIX_CODE}{today}')[1])
-            new_booking_number = last_booking_number + 1
-        else:
-            new_booking_number = 1
-        return f'{self.PREFIX_CODE}{today}{new_booking_number:04d}'
+        return allocate_code(Booking, self.PREFIX_CODE)
+
+    @classmethod
+    def generate_unique_codes(cls, count: int) -> list[str]:
+        return allocate_codes(cls, cls.PREFIX_CODE, count)
 
     def validate(self):
         if self.contact_info and not self.validate_booking_detail_section(self.contact_info, CONTACT_INFO_REQUIRED_FIELDS):
@@ -97,7 +125,16 @@ class Booking(BaseModel, SoftDeleteMixin):
             self.total_price = sum(item.total for item in booking_items)
         self.save()
         
-    def cancel(self):
+    @property
+    def holds_capacity(self) -> bool:
+        return not self.is_deleted and self.status not in self.CAPACITY_RELEASED_STATUSES
+
+    @property
+    def is_hold_expired(self) -> bool:
+        # the bookings cancelled by the sweeper keep their expiry, a late payment may take their capacity back
+        return self.status == BookingStatus.CANCELLED and self.hold_expires_at is not None
+
+    def cancel(self, hold_expired: bool = False):
         if self.status in [
             BookingStatus.NEW,
             BookingStatus.PENDING_PAYMENT,
@@ -105,6 +142,8 @@ class Booking(BaseModel, SoftDeleteMixin):
             BookingStatus.CONFIRMED,
         ]:
             self.status = BookingStatus.CANCELLED
+            if not hold_expired:
+                self.hold_expires_at = None
             self.save()
         else:
             raise ValueError('Booking is not cancellable')
@@ -128,7 +167,9 @@ class BookingItem(BaseModel):
         if not self.index:
             self.index = self.get_index()
 
-        return super().save(*args, **kwargs)
+        # the booked quantity counters are adjusted by the save signals, within the same transaction
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
 
     def get_index(self):
         return self.booking.bookingitem_set.filter(index__lt=self.index).count() + 1
@@ -159,3 +200,72 @@ class BookingEventHistory(models.Model):
     instance_id = models.CharField(max_length=128, null=True, blank=True)
     value = models.JSONField(blank=True, null=True)
     description = models.TextField(blank=True, null=True)
+
+    # hash of the fields an event is identified by, the same event is only stored once
+    dedupe_key = models.CharField(max_length=64, unique=True)
+    # a copy of an earlier event, written before the histories were deduplicated
+    is_duplicate = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # the histories of a booking, in the order they happened
+            models.Index(
+                fields=['instance_type', 'instance_id', 'created_at'],
+                name='booking_history_instance_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.dedupe_key:
+            self.dedupe_key = self.build_dedupe_key(
+                self.event_type,
+                self.instance_type,
+                self.instance_id,
+                self.description,
+            )
+
+        return super().save(*args, **kwargs)
+
+    @staticmethod
+    def build_dedupe_key(event_type, instance_type, instance_id, description) -> str:
+        # the enum members are hashed by their value, like the strings read back from the database
+        values = [event_type, instance_type, instance_id, description]
+        key = '_'.join([str(value.value if isinstance(value, Enum) else value) for value in values])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+
+class BookingOutboxEventTypeEnum(str, BaseEnum):
+    BOOKING_CREATED = 'booking_created'
+    BOOKING_UPDATED = 'booking_updated'
+    BOOKING_STATUS_CHANGED = 'booking_status_changed'
+    PAYMENT_STATUS_CHANGED = 'payment_status_changed'
+
+
+class BookingOutboxEvent(BaseModel):
+    """
+    Side effect of a booking or payment write, stored in the same transaction and applied later by a consumer
+    """
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='outbox_events')
+
+    event_type = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the consumer only scans the pending events
+            models.Index(
+                fields=['id'],
+                name='booking_outbox_pending_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+            # the purge only scans the processed events
+            models.Index(
+                fields=['processed_at'],
+                name='booking_outbox_processed_idx',
+                condition=models.Q(processed_at__isnull=False),
+            ),
+        ]
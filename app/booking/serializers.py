@@ -1,5 +1,10 @@
+from datetime import timedelta
+
 from rest_framework import serializers
+from django.contrib.postgres.aggregates import ArrayAgg
 from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 
 from app.booking.models import (
     Booking, BookingEventHistory, BookingItem,
@@ -13,6 +18,7 @@ from app.payment.models import (
 )
 from app.product.models import Product
 from app.product.serializers import ProductSerializer
+from app.product.services.product_availability.booked_quantity_helpers import ProductCapacityExceededError
 
 
 ########################
@@ -35,7 +41,20 @@ class BookingSerializer(serializers.ModelSerializer):
             'service_types': {'read_only': True},
         }
         
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # one aggregated column instead of a query per booking
+        return queryset.annotate(
+            item_service_types=ArrayAgg(
+                'bookingitem__product__service_type',
+                filter=Q(bookingitem__isnull=False),
+                ordering='bookingitem__index',
+            ),
+        )
+
     def get_service_types(self, obj):
+        if hasattr(obj, 'item_service_types'):
+            return obj.item_service_types or []
         return obj.bookingitem_set.values_list('product__service_type', flat=True)
         
     def validate(self, attrs):
@@ -103,7 +122,10 @@ class AddBookingItemSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data.pop('product_code_name')
-        booking_item = BookingItem.objects.create(**validated_data)
+        try:
+            booking_item = BookingItem.objects.create(**validated_data)
+        except ProductCapacityExceededError as e:
+            raise serializers.ValidationError({'quantity': str(e)})
         return booking_item
 
 
@@ -128,6 +150,10 @@ class AddBookingItemsPayloadSerializer(serializers.Serializer):
                 serializer.is_valid(raise_exception=True)
                 serializer.save()
 
+            # the quantities reserved above are released by the sweeper if the booking is not paid in time
+            Booking.objects.filter(id=booking.id).update(
+                hold_expires_at=timezone.now() + timedelta(seconds=Booking.CAPACITY_HOLD_TTL),
+            )
             booking.refresh_from_db()
 
         return booking
@@ -211,5 +237,18 @@ class CustomerBookingSerializer(serializers.ModelSerializer):
             'service_types': {'read_only': True},
         }
         
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # one aggregated column instead of a query per booking
+        return queryset.annotate(
+            item_service_types=ArrayAgg(
+                'bookingitem__product__service_type',
+                filter=Q(bookingitem__isnull=False),
+                ordering='bookingitem__index',
+            ),
+        )
+
     def get_service_types(self, obj):
+        if hasattr(obj, 'item_service_types'):
+            return obj.item_service_types or []
         return obj.bookingitem_set.values_list('product__service_type', flat=True)
@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.booking.models import BookingEventHistory
+
+
+BOOKING_EVENT_HISTORY_BATCH_SIZE = 500
+
+_buffered_event_histories: ContextVar[dict] = ContextVar('buffered_booking_event_histories', default=None)
+
+
+def add_booking_event_history(**fields) -> BookingEventHistory:
+    """
+    This function will record a booking event history, buffered when called inside buffer_booking_event_histories
+    Input: the BookingEventHistory fields
+    Output: BookingEventHistory, not saved yet when buffered
+    """
+    event_history = BookingEventHistory(**fields)
+    event_history.dedupe_key = BookingEventHistory.build_dedupe_key(
+        event_history.event_type,
+        event_history.instance_type,
+        event_history.instance_id,
+        event_history.description,
+    )
+
+    buffer = _buffered_event_histories.get()
+    if buffer is None:
+        write_booking_event_histories([event_history])
+    else:
+        # the first occurrence wins, like the rows already stored
+        buffer.setdefault(event_history.dedupe_key, event_history)
+
+    return event_history
+
+
+def write_booking_event_histories(event_histories: list[BookingEventHistory]) -> None:
+    """
+    This function will insert the event histories in batches, the events already stored are skipped by the unique dedupe key
+    Input: event_histories
+    Output: None
+    """
+    if not event_histories:
+        return
+
+    BookingEventHistory.objects.bulk_create(
+        event_histories,
+        batch_size=BOOKING_EVENT_HISTORY_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+@contextmanager
+def buffer_booking_event_histories():
+    """
+    Buffer the event histories recorded in the block and write them when it exits.
+    A nested block hands its events over to the outer one, an exception discards them.
+    """
+    outer_buffer = _buffered_event_histories.get()
+    buffer = {}
+    token = _buffered_event_histories.set(buffer)
+
+    try:
+        yield
+    finally:
+        _buffered_event_histories.reset(token)
+
+    if outer_buffer is None:
+        write_booking_event_histories(list(buffer.values()))
+    else:
+        for dedupe_key, event_history in buffer.items():
+            outer_buffer.setdefault(dedupe_key, event_history)
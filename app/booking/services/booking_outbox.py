@@ -0,0 +1,261 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from app.core.celery import celery_app
+from app.core.utils.logger import logger
+from app.booking.cache import invalidate_booking_cache
+from app.booking.models import (
+    Booking,
+    BookingEventTypeEnum,
+    BookingInstanceTypeEnum,
+    BookingOutboxEvent,
+    BookingOutboxEventTypeEnum,
+    BookingStatus,
+)
+from app.booking.services.booking_event_history import add_booking_event_history, buffer_booking_event_histories
+from app.booking.services.create_booking_customer import create_booking_customer
+from app.payment.models import PaymentMethodType, PaymentTransaction, PaymentTransactionStatus
+from app.product.services.product_availability.booked_quantity_helpers import ProductCapacityExceededError
+
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+# the processed events are only kept to investigate recent issues
+OUTBOX_RETENTION_DAYS = 7
+OUTBOX_PURGE_BATCH_SIZE = 1_000
+
+
+def publish_booking_outbox_event(booking_id, event_type: BookingOutboxEventTypeEnum, payload: dict = None) -> BookingOutboxEvent:
+    """
+    This function will store a booking event in the caller's transaction and wake up the consumer once it commits
+    Input: booking_id, event_type, payload
+    Output: BookingOutboxEvent
+    """
+    event = BookingOutboxEvent.objects.create(
+        booking_id=booking_id,
+        event_type=event_type,
+        payload=payload or {},
+    )
+
+    transaction.on_commit(lambda: celery_app.send_task("process_booking_outbox_task"))
+
+    return event
+
+
+def process_booking_outbox(booking_ids: list = None, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    This function will apply the pending booking events in order, the events locked by another consumer are skipped
+    Input: booking_ids to only process the events of some bookings, batch_size
+    Output: number of processed events
+    """
+    processed_count = 0
+    failed_event_ids = set()
+
+    while True:
+        with transaction.atomic():
+            query = BookingOutboxEvent.objects.select_for_update(skip_locked=True).filter(
+                processed_at__isnull=True,
+                attempts__lt=OUTBOX_MAX_ATTEMPTS,
+            ).exclude(id__in=failed_event_ids)
+
+            if booking_ids:
+                query = query.filter(booking_id__in=booking_ids)
+
+            events = list(query.order_by('id')[:batch_size])
+
+            processed_event_ids = []
+            # the histories of the whole batch are written at once, before it commits
+            with buffer_booking_event_histories():
+                for event in events:
+                    try:
+                        # a savepoint per event, a failing handler only rolls back its own changes
+                        with transaction.atomic(), buffer_booking_event_histories():
+                            handle_booking_outbox_event(event)
+                        processed_event_ids.append(event.id)
+                    except Exception as e:
+                        logger.error(f'Can not process booking outbox event {event.id}: {e}')
+                        failed_event_ids.add(event.id)
+                        event.attempts += 1
+                        event.last_error = str(e)
+                        event.updated_at = timezone.now()
+                        event.save(update_fields=['attempts', 'last_error', 'updated_at'])
+
+            BookingOutboxEvent.objects.filter(id__in=processed_event_ids).update(
+                processed_at=timezone.now(),
+                updated_at=timezone.now(),
+            )
+
+        # the handlers may publish follow-up events, keep going until nothing is pending
+        processed_count += len(processed_event_ids)
+        if not events:
+            break
+
+    return processed_count
+
+
+def purge_processed_booking_outbox_events(retention_days: int = OUTBOX_RETENTION_DAYS) -> int:
+    """
+    This function will delete the events processed before the retention period, in batches to keep the locks short,
+    the pending events and the ones out of attempts are kept
+    Input: retention_days
+    Output: number of deleted events
+    """
+    processed_before = timezone.now() - timedelta(days=retention_days)
+    deleted_count = 0
+
+    while True:
+        event_ids = list(
+            BookingOutboxEvent.objects
+            .filter(processed_at__lt=processed_before)
+            .values_list('id', flat=True)[:OUTBOX_PURGE_BATCH_SIZE]
+        )
+        if not event_ids:
+            break
+
+        deleted_count += BookingOutboxEvent.objects.filter(id__in=event_ids).delete()[0]
+
+    logger.info(f'Purged {deleted_count} processed booking outbox events')
+
+    return deleted_count
+
+
+def handle_booking_outbox_event(event: BookingOutboxEvent) -> None:
+    handlers = {
+        BookingOutboxEventTypeEnum.BOOKING_CREATED: handle_booking_created,
+        BookingOutboxEventTypeEnum.BOOKING_UPDATED: handle_booking_updated,
+        BookingOutboxEventTypeEnum.BOOKING_STATUS_CHANGED: handle_booking_status_changed,
+        BookingOutboxEventTypeEnum.PAYMENT_STATUS_CHANGED: handle_payment_status_changed,
+    }
+
+    handler = handlers.get(event.event_type)
+    if not handler:
+        raise ValueError(f'Invalid booking outbox event type {event.event_type}')
+
+    booking = Booking.objects.select_related('customer').get(id=event.booking_id)
+    handler(booking, event.payload)
+
+
+def add_booking_history(booking: Booking, description: str) -> None:
+    add_booking_event_history(
+        event_type=BookingEventTypeEnum.UPDATE,
+        instance_type=BookingInstanceTypeEnum.BOOKING,
+        instance_id=str(booking.id),
+        trigger_by=booking.customer,
+        description=description,
+    )
+
+
+# every handler checks the current state first and the histories are deduplicated,
+# so a redelivered event has no effect
+
+
+def create_booking_payment_transaction(booking: Booking) -> None:
+    """
+    This function will create the payment transaction of a new booking, in the transaction of the booking:
+    the client reads it right after the checkout
+    """
+    if not booking.payment_transactions.exists():
+        PaymentTransaction.objects.create(
+            booking=booking,
+            amount=booking.total_price,
+            currency=booking.currency,
+            payment_method_type=PaymentMethodType.CREDIT_CARD,
+        )
+
+
+def update_booking_payment_transactions(booking: Booking) -> None:
+    """
+    This function will align the payment transactions of an unpaid booking with its total, in the transaction of the booking
+    """
+    if booking.status != BookingStatus.NEW:
+        return
+
+    for payment_transaction in booking.payment_transactions.all():
+        if payment_transaction.amount != booking.total_price or payment_transaction.currency != booking.currency:
+            payment_transaction.amount = booking.total_price
+            payment_transaction.currency = booking.currency
+            payment_transaction.save()
+
+
+def handle_booking_created(booking: Booking, payload: dict) -> None:
+    # created with the booking, only the events stored before that are missing it
+    create_booking_payment_transaction(booking)
+
+    customer = create_booking_customer(booking.id)
+    # the customer is set without saving the booking, its cached listings are cleared here
+    booking.customer = customer
+    invalidate_booking_cache(booking)
+
+    add_booking_event_history(
+        event_type=BookingEventTypeEnum.CREATE,
+        instance_type=BookingInstanceTypeEnum.BOOKING,
+        instance_id=str(booking.id),
+        trigger_by=customer,
+    )
+
+
+def handle_booking_updated(booking: Booking, payload: dict) -> None:
+    # updated with the booking, only the events stored before that are behind.
+    # the latest total is read from the booking, an older event can not overwrite a newer one
+    update_booking_payment_transactions(booking)
+
+
+def handle_booking_status_changed(booking: Booking, payload: dict) -> None:
+    status = payload.get('status')
+
+    if status == BookingStatus.PAID and booking.status == BookingStatus.PAID:
+        booking.status = BookingStatus.CONFIRMED
+        booking.save()
+        add_booking_history(booking, 'Confirmed booking')
+    elif status == BookingStatus.CANCELLED and booking.status == BookingStatus.CANCELLED:
+        add_booking_history(booking, 'Cancelled booking')
+
+
+def mark_booking_refund_pending(booking: Booking, reason: str) -> None:
+    booking.status = BookingStatus.REFUND_PENDING
+    booking.save()
+    add_booking_history(booking, f'Booking status updated to {booking.status}: {reason}')
+
+
+def handle_payment_status_changed(booking: Booking, payload: dict) -> None:
+    status = payload.get('status')
+
+    # the payment may have changed again since the event was stored
+    payment_transaction = PaymentTransaction.objects.filter(id=payload.get('payment_transaction_id')).first()
+    if not payment_transaction or payment_transaction.status != status:
+        return
+
+    if status == PaymentTransactionStatus.PENDING:
+        if booking.status == BookingStatus.NEW:
+            booking.status = BookingStatus.PENDING_PAYMENT
+            booking.save()
+            add_booking_history(booking, f'Booking status updated to {booking.status}')
+    elif status == PaymentTransactionStatus.SUCCESS:
+        if booking.status in [BookingStatus.NEW, BookingStatus.PENDING_PAYMENT]:
+            booking.status = BookingStatus.PAID
+            booking.hold_expires_at = None
+            booking.save()
+            add_booking_history(booking, f'Booking status updated to {booking.status}')
+        elif booking.is_hold_expired:
+            # a payment may succeed after the hold expired, the booking takes its capacity back if there is still some
+            try:
+                booking.status = BookingStatus.PAID
+                booking.hold_expires_at = None
+                booking.save()
+                add_booking_history(booking, f'Booking status updated to {booking.status}')
+            except ProductCapacityExceededError as e:
+                booking.refresh_from_db()
+                mark_booking_refund_pending(booking, f'Paid after its hold expired and product {e.product_id} is fully booked on {e.day}')
+        elif booking.status == BookingStatus.CANCELLED:
+            # cancelled on purpose, the payment is refunded and the booking stays cancelled
+            mark_booking_refund_pending(booking, 'Paid after it was cancelled')
+    elif status == PaymentTransactionStatus.FAILED:
+        add_booking_history(booking, 'Failed to purchase booking')
+    elif status == PaymentTransactionStatus.CANCELLED:
+        if booking.status in [BookingStatus.NEW, BookingStatus.PENDING_PAYMENT]:
+            booking.status = BookingStatus.CANCELLED
+            booking.hold_expires_at = None
+            booking.save()
+            add_booking_history(booking, 'Cancelled payment transaction')
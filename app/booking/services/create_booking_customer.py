@@ -1,3 +1,5 @@
+from django.utils import timezone
+
 from app.core.utils.logger import logger
 from app.booking.models import Booking
 from app.user.models import User
@@ -20,8 +22,8 @@ def create_booking_customer(booking_id):
         if not customer:
             customer = User.objects.create(email=customer_email)
 
-        booking.customer = customer
-        booking.save()
+        # a plain update, saving the booking would publish its events again
+        Booking.objects.filter(id=booking.id).update(customer=customer, updated_at=timezone.now())
     except Exception as e:
         logger.error(f'Can not create customer: {e}')
         raise Exception('Can not create customer')
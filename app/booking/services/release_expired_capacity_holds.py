@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from app.core.utils.logger import logger
+from app.booking.models import Booking, BookingOutboxEvent
+from app.booking.services.booking_outbox import OUTBOX_MAX_ATTEMPTS
+
+
+RELEASE_BATCH_SIZE = 100
+
+
+def release_expired_capacity_holds() -> int:
+    """
+    Cancel the unpaid bookings whose capacity hold has expired, which releases their booked quantities
+    """
+    released_count = 0
+
+    while True:
+        with transaction.atomic():
+            # skip the bookings another worker or a payment is updating right now,
+            # and the ones with pending events, a successful payment may not be applied yet.
+            # the events out of attempts are never retried, they do not keep the hold
+            bookings = list(
+                Booking.objects.select_for_update(skip_locked=True).filter(
+                    hold_expires_at__lte=timezone.now(),
+                    status__in=Booking.CAPACITY_HOLD_STATUSES,
+                    is_deleted=False,
+                ).exclude(
+                    Exists(BookingOutboxEvent.objects.filter(
+                        booking=OuterRef('pk'),
+                        processed_at__isnull=True,
+                        attempts__lt=OUTBOX_MAX_ATTEMPTS,
+                    )),
+                )[:RELEASE_BATCH_SIZE]
+            )
+
+            for booking in bookings:
+                booking.cancel(hold_expired=True)
+
+        released_count += len(bookings)
+        if len(bookings) < RELEASE_BATCH_SIZE:
+            break
+
+    logger.info(f'Released {released_count} expired capacity holds')
+
+    return released_count
@@ -1,65 +1,121 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from app.booking.models import (
     Booking,
-    BookingEventHistory,
-    BookingInstanceTypeEnum,
-    BookingEventTypeEnum,
-    BookingStatus,
+    BookingItem,
+    BookingOutboxEventTypeEnum,
 )
-from app.payment.models import PaymentMethodType, PaymentTransaction
-from app.booking.services.create_booking_customer import create_booking_customer
+from app.booking.cache import invalidate_booking_cache
+from app.booking.services.booking_outbox import (
+    create_booking_payment_transaction,
+    publish_booking_outbox_event,
+    update_booking_payment_transactions,
+)
+from app.product.services.product_availability.booked_quantity_helpers import adjust_booked_quantities, group_booked_quantities
+
+
+def booking_holds_capacity(booking_id) -> bool:
+    # read from the database, the booking cached on an item may be stale
+    booking = Booking.objects.filter(id=booking_id).only('status', 'is_deleted').first()
+    return booking.holds_capacity if booking else False
+
+
+@receiver(pre_save, sender=Booking)
+def snapshot_booking(sender, instance, **kwargs):
+    previous = None
+    if instance.id:
+        previous = Booking.objects.filter(id=instance.id).only('status', 'is_deleted', 'total_price', 'currency').first()
+
+    instance._previous_booking = previous
+    instance._previously_held_capacity = previous.holds_capacity if previous else False
 
 
 @receiver(post_save, sender=Booking)
-def create_payment_transaction(sender, instance, created, **kwargs):
-    def init_payment_transaction():
-        PaymentTransaction.objects.create(
-            booking=instance,
-            amount=instance.total_price,
-            currency=instance.currency,
-            payment_method_type=PaymentMethodType.CREDIT_CARD,
-        )
+def update_booked_quantities_by_booking(sender, instance, created, **kwargs):
+    previously_held_capacity = getattr(instance, '_previously_held_capacity', False)
+    if created or previously_held_capacity == instance.holds_capacity:
+        return
 
-    def init_booking_history(customer):
-        BookingEventHistory.objects.create(
-            event_type=BookingEventTypeEnum.CREATE,
-            instance_type=BookingInstanceTypeEnum.BOOKING,
-            instance_id=str(instance.id),
-            trigger_by=customer,
-        )
-        
-    def add_booking_history(booking, description):
-        BookingEventHistory.objects.create(
-            event_type=BookingEventTypeEnum.UPDATE,
-            instance_type=BookingInstanceTypeEnum.BOOKING,
-            instance_id=str(booking.id),
-            trigger_by=booking.customer,
-            description=description,
-        )
+    # the booking was cancelled or restored, release or take back the quantities of all its items
+    sign = 1 if instance.holds_capacity else -1
+    booked_quantities = group_booked_quantities(
+        instance.bookingitem_set.values_list('product_id', 'due_datetime', 'quantity'),
+    )
+
+    # a restored booking can not take back more than the remaining capacity
+    adjust_booked_quantities(
+        {key: sign * quantity for key, quantity in booked_quantities.items()},
+        enforce_capacity=instance.holds_capacity,
+    )
 
-    def update_payment_transaction():
-        payment_transaction = PaymentTransaction.objects.get(booking=instance)
-        if (payment_transaction.amount != instance.total_price) or (payment_transaction.currency != instance.currency):
-            payment_transaction.amount = instance.total_price
-            payment_transaction.currency = instance.currency
-            payment_transaction.save()
-            
-    def track_booking_event():
-        if instance.status == BookingStatus.PAID:
-            instance.status = BookingStatus.CONFIRMED
-            instance.save()
-            add_booking_history(instance, f'Confirmed booking')
-        elif instance.status == BookingStatus.CANCELLED:
-            add_booking_history(instance, f'Cancelled booking')
 
+@receiver(post_save, sender=Booking)
+def publish_booking_events(sender, instance, created, **kwargs):
+    # the payment transaction is written with the booking, the client reads it right away.
+    # the other side effects are applied by the outbox consumer, nothing here saves the booking again
     if created:
-        init_payment_transaction()
-        customer = create_booking_customer(instance.id)
-        init_booking_history(customer)
-    else:
-        if instance.status == BookingStatus.NEW:
-            update_payment_transaction()
-        else:
-            track_booking_event()
+        create_booking_payment_transaction(instance)
+        publish_booking_outbox_event(instance.id, BookingOutboxEventTypeEnum.BOOKING_CREATED)
+        return
+
+    previous = getattr(instance, '_previous_booking', None)
+    if not previous:
+        return
+
+    if previous.status != instance.status:
+        publish_booking_outbox_event(
+            instance.id,
+            BookingOutboxEventTypeEnum.BOOKING_STATUS_CHANGED,
+            {'previous_status': previous.status, 'status': instance.status},
+        )
+
+    if previous.total_price != instance.total_price or previous.currency != instance.currency:
+        update_booking_payment_transactions(instance)
+        publish_booking_outbox_event(instance.id, BookingOutboxEventTypeEnum.BOOKING_UPDATED)
+
+
+@receiver(pre_save, sender=BookingItem)
+def snapshot_booking_item_booked_quantities(sender, instance, **kwargs):
+    instance._booking_holds_capacity = booking_holds_capacity(instance.booking_id)
+    if not instance.id or not instance._booking_holds_capacity:
+        instance._previous_booked_quantities = {}
+        return
+
+    instance._previous_booked_quantities = group_booked_quantities(
+        BookingItem.objects.filter(id=instance.id).values_list('product_id', 'due_datetime', 'quantity'),
+    )
+
+
+@receiver(post_save, sender=BookingItem)
+def update_booked_quantities_by_booking_item(sender, instance, **kwargs):
+    if not getattr(instance, '_booking_holds_capacity', False):
+        return
+
+    deltas = group_booked_quantities([(instance.product_id, instance.due_datetime, instance.quantity)])
+    for key, quantity in instance._previous_booked_quantities.items():
+        deltas[key] = deltas.get(key, 0) - quantity
+
+    adjust_booked_quantities(deltas, enforce_capacity=True)
+
+
+@receiver(post_delete, sender=BookingItem)
+def release_booked_quantities_by_booking_item(sender, instance, **kwargs):
+    if not booking_holds_capacity(instance.booking_id):
+        return
+
+    booked_quantities = group_booked_quantities([(instance.product_id, instance.due_datetime, instance.quantity)])
+
+    adjust_booked_quantities({key: -quantity for key, quantity in booked_quantities.items()})
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_cache_by_booking(sender, instance, **kwargs):
+    invalidate_booking_cache(instance)
+
+
+@receiver(post_save, sender=BookingItem)
+@receiver(post_delete, sender=BookingItem)
+def invalidate_booking_cache_by_booking_item(sender, instance, **kwargs):
+    invalidate_booking_cache(instance.booking)
@@ -1 +1,18 @@
- 
\ No newline at end of file
+from app.core.celery import celery_app
+from app.booking.services.booking_outbox import process_booking_outbox, purge_processed_booking_outbox_events
+from app.booking.services.release_expired_capacity_holds import release_expired_capacity_holds
+
+
+@celery_app.task(name="release_expired_capacity_holds_task")
+def release_expired_capacity_holds_task():
+    release_expired_capacity_holds()
+
+
+@celery_app.task(name="process_booking_outbox_task")
+def process_booking_outbox_task():
+    process_booking_outbox()
+
+
+@celery_app.task(name="purge_booking_outbox_task")
+def purge_booking_outbox_task():
+    purge_processed_booking_outbox_events()
@@ -1,3 +1,326 @@
-from django.test import TestCase
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError, connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.base.cache import invalidate_cache_tags
+from app.booking.cache import get_booking_list_cache_tags
+from app.booking.models import Booking, BookingItem, BookingOutboxEvent, BookingStatus
+from app.booking.services.booking_outbox import (
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETENTION_DAYS,
+    handle_payment_status_changed,
+    purge_processed_booking_outbox_events,
+)
+from app.booking.services.release_expired_capacity_holds import release_expired_capacity_holds
+from app.base.models import CodeCounter
+from app.core.celery import celery_app
+from app.core.utils.code import get_code_counter_key, get_day_prefix
+from app.payment.models import PaymentTransaction, PaymentTransactionStatus
+from app.product.models import Product, ProductAvailabilityConfiguration, ProductBookedQuantity, ServiceType, ProductUnit
+from app.product.models.availability_configuration import ProductAvailabilityConfigurationType
+from app.product.services.product_availability.booked_quantity_helpers import ProductCapacityExceededError, get_booked_day
+from app.supplier.models import Supplier
+from app.user.models import User, UserRole
+
+
+def create_limited_product(due_datetime, capacity: int) -> Product:
+    product = Product.objects.create(
+        name='Limited product',
+        code_name='limited_product',
+        service_type=ServiceType.FAST_TRACK,
+        unit=ProductUnit.PERSON,
+        base_price_vnd=100_000,
+        base_price_usd=10,
+    )
+    ProductAvailabilityConfiguration.objects.create(
+        product=product,
+        day=get_booked_day(due_datetime),
+        type=ProductAvailabilityConfigurationType.FIXED_QUANTITY,
+        value=capacity,
+    )
+    return product
+
+
+def create_booking(product: Product, due_datetime, quantity: int = 1) -> Booking:
+    booking = Booking.objects.create(
+        contact_info={'fullName': 'Customer', 'phoneNumber': '0000000000', 'email': 'customer@example.com'},
+        hold_expires_at=timezone.now() + timedelta(seconds=Booking.CAPACITY_HOLD_TTL),
+    )
+    BookingItem.objects.create(booking=booking, product=product, due_datetime=due_datetime, quantity=quantity, price=1)
+    return booking
+
+
+def get_booked_quantity(product: Product) -> int:
+    return ProductBookedQuantity.objects.get(product=product).quantity
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'the listings aggregate the service types with ArrayAgg')
+class BookingListQueriesTestCase(TestCase):
+    """
+    The number of queries of a listing page does not grow with its size
+    """
+    NUMBER_OF_BOOKINGS = 60
+    ITEMS_PER_BOOKING = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create(email='customer@example.com', role=UserRole.CUSTOMER)
+        cls.staff = User.objects.create(email='staff@example.com', role=UserRole.STAFF)
+
+        supplier = Supplier.objects.create(name='Supplier')
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Product {index}',
+                code_name=f'product_{index}',
+                service_type=ServiceType.choices[index % len(ServiceType.choices)][0],
+                unit=ProductUnit.PERSON,
+                base_price_vnd=100_000,
+                base_price_usd=10,
+                supplier=supplier,
+            )
+            for index in range(cls.ITEMS_PER_BOOKING)
+        ])
+
+        for _ in range(cls.NUMBER_OF_BOOKINGS):
+            booking = Booking.objects.create(
+                customer=cls.customer,
+                contact_info={'fullName': 'Customer', 'phoneNumber': '0000000000', 'email': cls.customer.email},
+            )
+            for index, product in enumerate(products):
+                BookingItem.objects.create(
+                    booking=booking,
+                    product=product,
+                    index=index + 1,
+                    quantity=1,
+                    price=1,
+                    due_datetime=timezone.now(),
+                )
+
+    def assert_list_queries(self, user, url: str, number_of_queries: int) -> None:
+        client = APIClient()
+        client.force_authenticate(user)
+
+        for page_size in [10, 50]:
+            # the database work is measured, not the response cache
+            invalidate_cache_tags(*get_booking_list_cache_tags(user))
+            with self.assertNumQueries(number_of_queries):
+                response = client.get(url, {'page_size': page_size})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['data']), page_size)
+
+    def test_booking_list_of_staff(self):
+        # the count of the paginator and the page
+        self.assert_list_queries(self.staff, '/api/v1/booking/', 2)
+
+    def test_booking_list_of_customer(self):
+        self.assert_list_queries(self.customer, '/api/v1/booking/', 2)
+
+    def test_bookings_of_customer(self):
+        # the customer, the count of the paginator and the page
+        self.assert_list_queries(self.staff, f'/api/v1/customer/{self.customer.id}/bookings', 3)
+
+
+class LatePaymentTestCase(TestCase):
+    def setUp(self):
+        self.due_datetime = timezone.now() + timedelta(days=7)
+        self.product = create_limited_product(self.due_datetime, capacity=1)
+        self.booking = create_booking(self.product, self.due_datetime)
+
+    def pay(self, booking: Booking) -> None:
+        payment_transaction = PaymentTransaction.objects.create(
+            booking=booking,
+            amount=booking.total_price,
+            status=PaymentTransactionStatus.SUCCESS,
+        )
+        handle_payment_status_changed(
+            booking,
+            {'status': PaymentTransactionStatus.SUCCESS, 'payment_transaction_id': payment_transaction.id},
+        )
+        booking.refresh_from_db()
+
+    def test_expired_hold_takes_its_capacity_back(self):
+        self.booking.cancel(hold_expired=True)
+        self.assertEqual(get_booked_quantity(self.product), 0)
+
+        self.pay(self.booking)
+
+        self.assertEqual(self.booking.status, BookingStatus.PAID)
+        self.assertEqual(get_booked_quantity(self.product), 1)
+
+    def test_expired_hold_without_capacity_is_refund_pending(self):
+        self.booking.cancel(hold_expired=True)
+        create_booking(self.product, self.due_datetime)
+
+        self.pay(self.booking)
+
+        self.assertEqual(self.booking.status, BookingStatus.REFUND_PENDING)
+        self.assertEqual(get_booked_quantity(self.product), 1)
+
+    def test_cancelled_booking_is_refund_pending(self):
+        self.booking.cancel()
+
+        self.pay(self.booking)
+
+        self.assertEqual(self.booking.status, BookingStatus.REFUND_PENDING)
+        self.assertEqual(get_booked_quantity(self.product), 0)
+
+
+class BookingOutboxTestCase(TestCase):
+    def setUp(self):
+        self.due_datetime = timezone.now() + timedelta(days=7)
+        self.product = create_limited_product(self.due_datetime, capacity=1)
+        self.booking = create_booking(self.product, self.due_datetime)
+        Booking.objects.filter(id=self.booking.id).update(hold_expires_at=timezone.now() - timedelta(minutes=1))
+        # the booking created event
+        self.event = BookingOutboxEvent.objects.get(booking=self.booking)
+
+    def test_payment_transaction_is_created_with_the_booking(self):
+        payment_transaction = self.booking.payment_transactions.get()
+        self.assertEqual(payment_transaction.amount, self.booking.total_price)
+
+        self.booking.total_price += 1
+        self.booking.save()
+
+        payment_transaction.refresh_from_db()
+        self.assertEqual(payment_transaction.amount, self.booking.total_price)
+
+    def test_pending_event_keeps_the_hold(self):
+        release_expired_capacity_holds()
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.NEW)
+        self.assertEqual(get_booked_quantity(self.product), 1)
+
+    def test_event_out_of_attempts_releases_the_hold(self):
+        self.event.attempts = OUTBOX_MAX_ATTEMPTS
+        self.event.save()
+
+        release_expired_capacity_holds()
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, BookingStatus.CANCELLED)
+        self.assertEqual(get_booked_quantity(self.product), 0)
+
+    def test_purge_keeps_the_recent_and_pending_events(self):
+        processed_event = BookingOutboxEvent.objects.create(
+            booking=self.booking,
+            event_type=self.event.event_type,
+            processed_at=timezone.now() - timedelta(days=OUTBOX_RETENTION_DAYS + 1),
+        )
+        recent_event = BookingOutboxEvent.objects.create(
+            booking=self.booking,
+            event_type=self.event.event_type,
+            processed_at=timezone.now(),
+        )
+
+        self.assertEqual(purge_processed_booking_outbox_events(), 1)
+        self.assertFalse(BookingOutboxEvent.objects.filter(id=processed_event.id).exists())
+        self.assertEqual(BookingOutboxEvent.objects.filter(id__in=[recent_event.id, self.event.id]).count(), 2)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'the row locks of the counters need PostgreSQL')
+class CapacityReservationTransactionTestCase(TransactionTestCase):
+    """
+    Parallel checkouts against a single product and day, each thread has its own connection
+    """
+    CHECKOUTS = 500
+    WORKERS = 50
+    CAPACITY = 100
+
+    def setUp(self):
+        # the outbox consumer and the price recompute are not part of the checkout
+        patcher = mock.patch.object(celery_app, 'send_task')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def checkout(self, product: Product, due_datetime) -> bool:
+        try:
+            create_booking(product, due_datetime)
+            return True
+        except ProductCapacityExceededError:
+            return False
+        finally:
+            connection.close()
+
+    def test_capacity_is_never_oversold(self):
+        due_datetime = timezone.now() + timedelta(days=7)
+        product = create_limited_product(due_datetime, capacity=self.CAPACITY)
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            results = list(executor.map(lambda _: self.checkout(product, due_datetime), range(self.CHECKOUTS)))
+
+        item_quantity = BookingItem.objects.filter(product=product).aggregate(total=Sum('quantity'))['total']
+        self.assertEqual(results.count(True), self.CAPACITY)
+        self.assertEqual(get_booked_quantity(product), self.CAPACITY)
+        self.assertEqual(item_quantity, self.CAPACITY)
+
+
+class CodeAllocationTestCase(TestCase):
+    def create_booking_code(self) -> str:
+        return Booking.objects.create(
+            contact_info={'fullName': 'Customer', 'phoneNumber': '0000000000', 'email': 'customer@example.com'},
+        ).code
+
+    def test_counter_starts_after_the_last_code_of_the_day(self):
+        day_prefix = get_day_prefix(Booking.PREFIX_CODE)
+        Booking.objects.create(code=f'{day_prefix}0041', contact_info={'fullName': 'Customer', 'phoneNumber': '0000000000', 'email': 'customer@example.com'})
+        CodeCounter.objects.filter(key=get_code_counter_key(Booking)).delete()
+
+        self.assertEqual(self.create_booking_code(), f'{day_prefix}0042')
+        self.assertEqual(Booking.generate_unique_codes(2), [f'{day_prefix}0043', f'{day_prefix}0044'])
+
+    def test_counter_of_another_day_is_reset(self):
+        CodeCounter.objects.update_or_create(
+            key=get_code_counter_key(Booking),
+            defaults={'day': timezone.localdate() - timedelta(days=1), 'value': 99},
+        )
+
+        self.assertEqual(self.create_booking_code(), f'{get_day_prefix(Booking.PREFIX_CODE)}0001')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'the concurrent inserts need the row locks of PostgreSQL')
+class CodeAllocationTransactionTestCase(TransactionTestCase):
+    """
+    Parallel booking inserts, each thread has its own connection
+    """
+    INSERTS = 1_000
+    WORKERS = 50
+    BATCH_SIZE = 200
+
+    def setUp(self):
+        patcher = mock.patch.object(celery_app, 'send_task')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_booking_code(self):
+        try:
+            return Booking.objects.create(
+                contact_info={'fullName': 'Customer', 'phoneNumber': '0000000000', 'email': 'customer@example.com'},
+            ).code
+        except IntegrityError:
+            return None
+        finally:
+            connection.close()
+
+    def test_codes_never_collide(self):
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            codes = list(executor.map(lambda _: self.create_booking_code(), range(self.INSERTS)))
+
+        self.assertNotIn(None, codes)
+        self.assertEqual(len(set(codes)), self.INSERTS)
+
+        # codes reserved for a bulk import are never handed out again
+        reserved_codes = Booking.generate_unique_codes(self.BATCH_SIZE)
+        self.assertEqual(len(set(reserved_codes)), self.BATCH_SIZE)
+        self.assertFalse(set(reserved_codes) & set(codes))
+
+        next_code = self.create_booking_code()
+        self.assertIsNotNone(next_code)
+        self.assertGreater(next_code, reserved_codes[-1])
@@ -1,7 +1,4 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
-from django.core.cache import cache
 
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -15,6 +12,7 @@ from app.booking.models import (
     Booking, BookingStatus, BookingItem,
     BookingEventHistory, BookingInstanceTypeEnum,
 )
+from app.booking.cache import BOOKING_CACHE_TAG, get_booking_list_cache_tags
 from app.booking.serializers import (
     BookingSerializer,
     BookingItemSerializer,
@@ -23,11 +21,20 @@ from app.booking.serializers import (
     DeleteBookingItemsPayloadSerializer,
 )
 from app.product.models import ServiceType, Product
-from app.base.pagination import CustomPagination
+from app.base.cache import cache_response, get_object_cache_tag
+from app.base.pagination import CustomCursorPagination, CustomPagination
 from app.payment.serializers import PaymentTransactionSerializer
 from app.base.mixins import SoftDeleteViewSetMixin
 
 
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class BookingEventHistoryCursorPagination(CustomCursorPagination):
+    page_size = 100
+    ordering = ('created_at', 'id')
+
+
 class BookingModelViewSet(viewsets.ModelViewSet, SoftDeleteViewSetMixin):
     queryset = Booking.objects.filter(is_deleted=False)
     serializer_class = BookingSerializer
@@ -52,50 +59,34 @@ class BookingModelViewSet(viewsets.ModelViewSet, SoftDeleteViewSetMixin):
 
     def get_queryset(self):
         if self.action in ['create', 'retrieve', 'items', 'payment_transaction', 'event_histories', 'next_action']:
-            return super().get_queryset()
+            queryset = super().get_queryset()
         else:
             if self.request.user.is_internal:
-                return super().get_queryset()
+                queryset = super().get_queryset()
             else:
-                return super().get_queryset().filter(customer=self.request.user)
+                queryset = super().get_queryset().filter(customer=self.request.user)
 
-    @method_decorator(cache_page(60 * 60 * 24, key_prefix="booking_list"))
+        if self.action in ['list', 'retrieve', 'update', 'partial_update']:
+            queryset = BookingSerializer.setup_eager_loading(queryset)
+
+        return queryset
+
+    @cache_response(CACHE_TIMEOUT, prefix="booking_list", vary_on_user=True, tags=lambda view, request, *args, **kwargs: (
+        get_booking_list_cache_tags(request.user)
+    ))
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
     
-    @method_decorator(cache_page(60 * 60 * 24, key_prefix="booking_retrieve"))
+    @cache_response(CACHE_TIMEOUT, prefix="booking_retrieve", vary_on_user=True, tags=lambda view, request, *args, **kwargs: [
+        get_object_cache_tag(BOOKING_CACHE_TAG, kwargs["code"]),
+    ])
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
-    def _clear_cache(self):
-        prefixes = [
-            "booking_list",
-            "booking_retrieve",
-        ]
-        
-        for prefix in prefixes:
-            keys = cache.keys(f"*{prefix}*")
-            cache.delete_many(keys)
-
-    def create(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().create(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().destroy(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().partial_update(request, *args, **kwargs)
-
     @action(detail=True, methods=['get'], url_path='payment_transaction')
     def payment_transaction(self, request, *args, **kwargs):
         booking = self.get_object()
+        # created with the booking
         payment_transactions = booking.payment_transactions.first()
         serializer = PaymentTransactionSerializer(payment_transactions)
         return Response({'data': serializer.data})
@@ -116,7 +107,7 @@ class BookingModelViewSet(viewsets.ModelViewSet, SoftDeleteViewSetMixin):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         serializer.save()
-        booking_items = booking.bookingitem_set.all()
+        booking_items = booking.bookingitem_set.select_related('product__supplier')
         booking.update_total_price()
 
         booking_items_serializer = BookingItemSerializer(booking_items, many=True)
@@ -124,7 +115,7 @@ class BookingModelViewSet(viewsets.ModelViewSet, SoftDeleteViewSetMixin):
 
     def get_items(self, request, *args, **kwargs):
         booking = self.get_object()
-        booking_items = booking.bookingitem_set.all()
+        booking_items = booking.bookingitem_set.select_related('product__supplier')
         serializer = BookingItemSerializer(booking_items, many=True)
         return Response({'data': serializer.data})
 
@@ -141,31 +132,24 @@ class BookingModelViewSet(viewsets.ModelViewSet, SoftDeleteViewSetMixin):
 
     @action(detail=True, methods=['get'], url_path='event_histories')
     def event_histories(self, request, *args, **kwargs):
-        def get_unique_event_histories(event_histories):
-            unique_event_histories = []
-            unique_keys = []
-            for event_history in event_histories:
-                key = '_'.join([
-                    str(event_history['event_type']),
-                    str(event_history['instance_type']),
-                    str(event_history['instance_id']),
-                    str(event_history['description']),
-                ])
-                if key not in unique_keys:
-                    unique_event_histories.append(event_history)
-                    unique_keys.append(key)
-            return unique_event_histories
-
         booking = self.get_object()
+        # the histories are deduplicated when written, one indexed range scan returns them
         event_histories = BookingEventHistory.objects.filter(
             instance_type=BookingInstanceTypeEnum.BOOKING,
             instance_id=str(booking.id),
-        ).order_by('created_at')
-        serializer = BookingEventHistorySerializer(event_histories, many=True)
+            is_duplicate=False,
+        ).order_by('created_at', 'id')
 
-        unique_event_histories = get_unique_event_histories(serializer.data)
-        
-        return Response({'data': unique_event_histories})
+        # the whole list unless the client asks for pages
+        paginator = BookingEventHistoryCursorPagination()
+        if not {paginator.cursor_query_param, paginator.page_size_query_param} & set(request.query_params):
+            serializer = BookingEventHistorySerializer(event_histories, many=True)
+            return Response({'data': serializer.data})
+
+        page = paginator.paginate_queryset(event_histories, request)
+        serializer = BookingEventHistorySerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['get'], url_path='next_action')
     def next_action(self, request, *args, **kwargs):
@@ -216,7 +200,7 @@ class BookingModelViewSet(viewsets.ModelViewSet, SoftDeleteViewSetMixin):
 
 
 class BookingItemModelViewSet(viewsets.ModelViewSet):
-    queryset = BookingItem.objects.all()
+    queryset = BookingItem.objects.select_related('product__supplier')
     permission_classes = [IsAuthenticated]
     serializer_class = BookingItemSerializer
     pagination_class = CustomPagination
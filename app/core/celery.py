@@ -7,7 +7,18 @@ from app.core import settings
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
 
-celery_app = Celery(
+# the tasks whose result is read, by name, with the reason. The results of the other tasks are not stored
+TASKS_WITH_RESULTS: dict[str, str] = {}
+
+
+class EskeptCelery(Celery):
+    def send_task(self, name, *args, **kwargs):
+        # a task sent by name does not know its policy, without ignore_result the producer subscribes to its result
+        kwargs.setdefault('ignore_result', name not in TASKS_WITH_RESULTS)
+        return super().send_task(name, *args, **kwargs)
+
+
+celery_app = EskeptCelery(
     'eskept',
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
@@ -22,11 +33,29 @@ celery_app = Celery(
 )
 
 celery_app.config_from_object('django.conf:settings', namespace='CELERY')
+celery_app.conf.task_annotations = {name: {'ignore_result': False} for name in TASKS_WITH_RESULTS}
 celery_app.autodiscover_tasks()
 
 celery_app.conf.beat_schedule = {
     'precompute_product_price_task': {
         'task': 'precompute_product_price_task',
-        'schedule': crontab(minute='*/30')
+        'schedule': crontab(minute='*/30'),
+    },
+    'precompute_product_price_calendar_task': {
+        'task': 'precompute_product_price_calendar_task',
+        'schedule': crontab(hour=0, minute=5),
+    },
+    'release_expired_capacity_holds_task': {
+        'task': 'release_expired_capacity_holds_task',
+        'schedule': crontab(minute='*')
+    },
+    # picks up the events whose wake up message was lost
+    'process_booking_outbox_task': {
+        'task': 'process_booking_outbox_task',
+        'schedule': crontab(minute='*')
+    },
+    'purge_booking_outbox_task': {
+        'task': 'purge_booking_outbox_task',
+        'schedule': crontab(hour=1, minute=0)
     },
 }
\ No newline at end of file
@@ -0,0 +1,145 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from app.core.utils.logger import logger
+
+
+# seconds between two checks of the replication lag of the replicas, per process
+REPLICA_LAG_CHECK_INTERVAL = 5
+
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# the reads of the current request or task may go to a replica
+_read_replica = ContextVar('read_replica', default=False)
+# the reads must see the writes of the client, made in this request or a previous one
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+# the current request or task has written to the primary
+_has_written = ContextVar('has_written', default=False)
+
+_healthy_replicas = []
+_replica_lag_checked_at = None
+
+
+@contextmanager
+def use_read_replica(enabled: bool = True, pinned_to_primary: bool = False):
+    """
+    Send the reads made inside the block to a replica, until the first write
+    Input:
+        enabled: bool, False to only track the writes, see enable_read_replica
+        pinned_to_primary: bool, read from the primary anyway, e.g. the client has just written
+    """
+    tokens = [
+        (_read_replica, _read_replica.set(enabled)),
+        (_pinned_to_primary, _pinned_to_primary.set(pinned_to_primary)),
+        (_has_written, _has_written.set(False)),
+    ]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Read from the primary inside the block, for the results that outlive the request like the cached ones:
+    a replica may be up to REPLICA_MAX_LAG behind and its data would stay cached after the invalidation
+    """
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def enable_read_replica() -> None:
+    # until the end of the enclosing use_read_replica block
+    _read_replica.set(True)
+
+
+def has_written_to_primary() -> bool:
+    return _has_written.get()
+
+
+def get_replica_lag(alias: str) -> float:
+    """
+    This function will return how many seconds the replica is behind the primary
+    Input: alias, the database alias of the replica
+    Output: the lag in seconds, None when the replica cannot be reached
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(REPLICA_LAG_QUERY)
+            return float(cursor.fetchone()[0])
+    except DatabaseError as e:
+        logger.warning(f"Replica {alias} is unavailable: {e}")
+        connection.close()
+        return None
+
+
+def get_healthy_replicas() -> list[str]:
+    """
+    This function will return the replicas whose lag is under REPLICA_MAX_LAG, the lag is checked again every REPLICA_LAG_CHECK_INTERVAL seconds
+    Output: list of database aliases
+    """
+    global _healthy_replicas, _replica_lag_checked_at
+
+    now = time.monotonic()
+    if _replica_lag_checked_at is not None and now - _replica_lag_checked_at < REPLICA_LAG_CHECK_INTERVAL:
+        return _healthy_replicas
+
+    healthy_replicas = []
+    for alias in settings.DATABASE_REPLICAS:
+        lag = get_replica_lag(alias)
+        if lag is None:
+            continue
+        if lag > settings.REPLICA_MAX_LAG:
+            logger.warning(f"Replica {alias} is {lag:.1f}s behind the primary, reading from the primary")
+            continue
+        healthy_replicas.append(alias)
+
+    _healthy_replicas, _replica_lag_checked_at = healthy_replicas, now
+    return healthy_replicas
+
+
+class ReadReplicaRouter:
+    """
+    Send the reads of the opted-in requests and tasks to a replica, see use_read_replica.
+    The writes always go to the primary, the reads go back to the primary after the first write
+    and inside the transactions of the primary.
+    """
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or not _read_replica.get():
+            return DEFAULT_DB_ALIAS
+        if _pinned_to_primary.get() or _has_written.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        replicas = get_healthy_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _has_written.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replicas are migrated by the replication
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration of the production server, driven by the gunicorn section of config.yaml.
+
+    gunicorn --config app/core/gunicorn.conf.py
+
+The command line options take precedence over this file, e.g. --workers 2.
+Send HUP to the master for a graceful reload: new workers are started with the new code and the old ones
+finish their requests before exiting.
+"""
+import os
+
+# a module level name matching a gunicorn setting is read as that setting, hence the alias
+from app.core.settings import config as app_config
+
+
+def get_cpu_count() -> int:
+    # the cores the container may use, not the cores of the host
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+gunicorn_config = app_config.get("gunicorn") or {}
+
+wsgi_app = "app.core.wsgi:application"
+bind = f"0.0.0.0:{app_config['server']['port']}"
+backlog = gunicorn_config.get("backlog", 2048)
+
+# the views block on PostgreSQL and Redis, threads keep a worker busy while one of them waits
+worker_class = gunicorn_config.get("worker_class", "gthread")
+workers = gunicorn_config.get("workers") or get_cpu_count() * 2 + 1
+threads = gunicorn_config.get("threads", 4)
+
+# recycle the workers after a number of requests to release the memory they hold, the jitter avoids restarting them all at once
+max_requests = gunicorn_config.get("max_requests", 1000)
+max_requests_jitter = gunicorn_config.get("max_requests_jitter", 100)
+
+timeout = gunicorn_config.get("timeout", 30)
+graceful_timeout = gunicorn_config.get("graceful_timeout", 30)
+# keep the idle connections of the load balancer open longer than the load balancer does, to avoid resetting them
+keepalive = gunicorn_config.get("keepalive", 5)
+
+# the code is loaded by each worker, so that HUP reloads it
+preload_app = False
+# the heartbeat files of the workers, in memory instead of the container overlay filesystem
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = gunicorn_config.get("accesslog", "-")
+errorlog = "-"
+loglevel = gunicorn_config.get("loglevel", "info")
@@ -0,0 +1,33 @@
+from django.conf import settings
+
+from app.core.db_routers import enable_read_replica, has_written_to_primary, use_read_replica
+
+
+PIN_TO_PRIMARY_COOKIE = 'pin_to_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReadReplicaMiddleware:
+    """
+    Send the reads of the safe requests to the views with use_read_replica = True to a replica.
+    After a write, the next requests of the client read from the primary for REPLICA_MAX_LAG seconds,
+    so that the client sees its writes even when the replicas are behind.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned_to_primary = PIN_TO_PRIMARY_COOKIE in request.COOKIES
+        with use_read_replica(enabled=False, pinned_to_primary=pinned_to_primary):
+            response = self.get_response(request)
+            has_written = has_written_to_primary()
+
+        if has_written and settings.DATABASE_REPLICAS:
+            response.set_cookie(PIN_TO_PRIMARY_COOKIE, '1', max_age=settings.REPLICA_MAX_LAG, httponly=True, samesite='Lax')
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if request.method in SAFE_METHODS and getattr(view_class, 'use_read_replica', False):
+            enable_read_replica()
@@ -0,0 +1,183 @@
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from django_redis.client import DefaultClient
+from redis.exceptions import RedisError
+
+from app.core.utils.logger import logger
+
+
+CACHE_STATS_KEY = 'cache_stats'
+# seconds between two flushes of the counters of a process to redis
+CACHE_STATS_FLUSH_INTERVAL = 10
+# the memory report stops after this number of keys, the namespaces are then only sampled
+MEMORY_USAGE_MAX_KEYS = 100_000
+MEMORY_USAGE_BATCH_SIZE = 1_000
+
+_MISSING = object()
+
+
+def get_key_namespace(key) -> str:
+    # product_render:1 -> product_render, views.decorators.cache.cache_page... -> views
+    return str(key).split(':', 1)[0].split('.', 1)[0]
+
+
+class InstrumentedRedisClient(DefaultClient):
+    """
+    django_redis client counting the hits, misses, writes and written bytes of each key namespace.
+    The counters are kept in memory and added to the cache_stats:<namespace> hashes of redis in one pipeline
+    every CACHE_STATS_FLUSH_INTERVAL seconds, so the instrumentation does not add a round trip per operation.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats = defaultdict(Counter)
+        self._stats_lock = threading.Lock()
+        self._stats_flushed_at = time.monotonic()
+        self._local = threading.local()
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, default=_MISSING, version=version, client=client)
+        self.record_stats({get_key_namespace(key): Counter(hits=int(value is not _MISSING), misses=int(value is _MISSING))})
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        values = super().get_many(keys, version=version, client=client)
+
+        stats = defaultdict(Counter)
+        for key in keys:
+            stats[get_key_namespace(key)]['hits' if key in values else 'misses'] += 1
+        self.record_stats(stats)
+
+        return values
+
+    def set(self, key, value, *args, **kwargs):
+        result = super().set(key, value, *args, **kwargs)
+        encoded_size = getattr(self._local, 'encoded_size', 0)
+        self.record_stats({get_key_namespace(key): Counter(sets=1, bytes_written=encoded_size)})
+        return result
+
+    def encode(self, value):
+        encoded_value = super().encode(value)
+        # read back by set, the size of the value once serialized and compressed
+        self._local.encoded_size = len(encoded_value) if isinstance(encoded_value, bytes) else len(str(encoded_value))
+        return encoded_value
+
+    def record_stats(self, stats: dict[str, Counter]) -> None:
+        with self._stats_lock:
+            for namespace, counter in stats.items():
+                self._stats[namespace].update(counter)
+            should_flush = time.monotonic() - self._stats_flushed_at >= CACHE_STATS_FLUSH_INTERVAL
+
+        if should_flush:
+            self.flush_stats()
+
+    def flush_stats(self) -> None:
+        with self._stats_lock:
+            stats, self._stats = self._stats, defaultdict(Counter)
+            self._stats_flushed_at = time.monotonic()
+
+        if not stats:
+            return
+
+        try:
+            pipeline = self.get_client(write=True).pipeline(transaction=False)
+            for namespace, counter in stats.items():
+                for field, value in counter.items():
+                    if value:
+                        pipeline.hincrby(f'{CACHE_STATS_KEY}:{namespace}', field, value)
+            pipeline.execute()
+        except RedisError as e:
+            logger.warning(f'Can not flush the cache stats: {e}')
+
+
+def get_stored_key_namespace(stored_key: str) -> str:
+    # the stored keys are <prefix>:<version>:<key>, except the ones written without the cache API
+    match = re.match(rf'^{re.escape(settings.CACHES["default"].get("KEY_PREFIX", ""))}:\d+:', stored_key)
+    return get_key_namespace(stored_key[match.end():] if match else stored_key)
+
+
+def get_cache_memory_usage() -> tuple[dict[str, Counter], bool]:
+    """
+    This function will return the number of keys and the memory used by each key namespace of the cache database
+    Output:
+        ({<namespace>: Counter(keys=, memory_bytes=)}, whether every key was measured)
+    """
+    redis = get_redis_connection('default')
+    usage = defaultdict(Counter)
+    scanned_keys = 0
+
+    batch = []
+    for stored_key in redis.scan_iter(count=MEMORY_USAGE_BATCH_SIZE):
+        batch.append(stored_key.decode())
+        scanned_keys += 1
+        if len(batch) >= MEMORY_USAGE_BATCH_SIZE or scanned_keys >= MEMORY_USAGE_MAX_KEYS:
+            add_memory_usage(redis, batch, usage)
+            batch = []
+        if scanned_keys >= MEMORY_USAGE_MAX_KEYS:
+            return usage, False
+
+    add_memory_usage(redis, batch, usage)
+    return usage, True
+
+
+def add_memory_usage(redis, stored_keys: list[str], usage: dict[str, Counter]) -> None:
+    if not stored_keys:
+        return
+
+    # one round trip per batch of keys
+    pipeline = redis.pipeline(transaction=False)
+    for stored_key in stored_keys:
+        pipeline.memory_usage(stored_key)
+
+    for stored_key, memory_bytes in zip(stored_keys, pipeline.execute()):
+        namespace = get_stored_key_namespace(stored_key)
+        usage[namespace]['keys'] += 1
+        usage[namespace]['memory_bytes'] += memory_bytes or 0
+
+
+def get_cache_stats() -> dict:
+    """
+    This function will report the hit ratio, the writes and the memory of each key namespace of the cache
+    Output:
+        {
+            'namespaces': {<namespace>: {'hits', 'misses', 'hit_ratio', 'sets', 'bytes_written', 'keys', 'memory_bytes'}},
+            'complete': whether the memory of every key was measured,
+        }
+    """
+    if isinstance(cache.client, InstrumentedRedisClient):
+        cache.client.flush_stats()
+
+    redis = get_redis_connection('default')
+    stats_keys = [stats_key.decode() for stats_key in redis.scan_iter(match=f'{CACHE_STATS_KEY}:*')]
+    pipeline = redis.pipeline(transaction=False)
+    for stats_key in stats_keys:
+        pipeline.hgetall(stats_key)
+
+    namespaces = defaultdict(Counter)
+    for stats_key, counters in zip(stats_keys, pipeline.execute()):
+        namespaces[stats_key.split(':', 1)[1]].update({field.decode(): int(value) for field, value in counters.items()})
+
+    memory_usage, complete = get_cache_memory_usage()
+    for namespace, counter in memory_usage.items():
+        namespaces[namespace].update(counter)
+
+    report = {}
+    for namespace, counter in sorted(namespaces.items()):
+        lookups = counter['hits'] + counter['misses']
+        report[namespace] = {
+            'hits': counter['hits'],
+            'misses': counter['misses'],
+            'hit_ratio': round(counter['hits'] / lookups, 4) if lookups else None,
+            'sets': counter['sets'],
+            'bytes_written': counter['bytes_written'],
+            'keys': counter['keys'],
+            'memory_bytes': counter['memory_bytes'],
+        }
+
+    return {'namespaces': report, 'complete': complete}
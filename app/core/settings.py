@@ -86,6 +86,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.core.middleware.ReadReplicaMiddleware",
 ]
 
 ROOT_URLCONF = "app.core.urls"
@@ -120,18 +121,57 @@ DATABASES = {
         "PASSWORD": config["postgres"]["password"],
         "HOST": config["postgres"]["host"],
         "PORT": config["postgres"]["port"],
+        # keep the connection of each worker thread open between requests and tasks, 0 closes it after each of them
+        "CONN_MAX_AGE": config["postgres"].get("conn_max_age", 60),
+        # a reused connection is checked before the request, a connection dropped by the server is reopened instead of failing the request
+        "CONN_HEALTH_CHECKS": config["postgres"].get("conn_health_checks", True),
+        # PgBouncer in transaction mode hands the server connection to another client after each transaction,
+        # the cursors which outlive a transaction cannot be used through it
+        "DISABLE_SERVER_SIDE_CURSORS": config["postgres"].get("pgbouncer", False),
+        "OPTIONS": {
+            "connect_timeout": config["postgres"].get("connect_timeout", 5),
+        },
     }
 }
 
+# Read replicas, the reads of the views with use_read_replica = True go to them, except the ones that are cached
+DATABASE_REPLICAS = []
+for index, replica_config in enumerate(config["postgres"].get("replicas") or []):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": replica_config.get("db_name", DATABASES["default"]["NAME"]),
+        "USER": replica_config.get("user", DATABASES["default"]["USER"]),
+        "PASSWORD": replica_config.get("password", DATABASES["default"]["PASSWORD"]),
+        "HOST": replica_config["host"],
+        "PORT": replica_config.get("port", DATABASES["default"]["PORT"]),
+        # the tests run against the primary only
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["app.core.db_routers.ReadReplicaRouter"]
+# seconds a replica may be behind the primary before the reads go back to the primary,
+# and seconds the client of a write reads from the primary
+REPLICA_MAX_LAG = config["postgres"].get("replica_max_lag", 5)
+
 # Redis Configuration
 REDIS_HOST = config["redis"]["host"]
 REDIS_PORT = config["redis"]["port"]
 REDIS_USER = config["redis"]["user"]
 REDIS_PASSWORD = config["redis"]["password"]
-if REDIS_USER and REDIS_PASSWORD:
-    REDIS_URL = f"redis://{REDIS_USER}:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/0"
-else:
-    REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
+
+
+def get_redis_url(db: int) -> str:
+    if REDIS_USER and REDIS_PASSWORD:
+        return f"redis://{REDIS_USER}:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{db}"
+    return f"redis://{REDIS_HOST}:{REDIS_PORT}/{db}"
+
+
+# one logical database per role, the scans and the evictions of the cache do not touch the queues nor the results
+REDIS_CACHE_URL = get_redis_url(config["redis"].get("cache_db", 0))
+REDIS_BROKER_URL = get_redis_url(config["redis"].get("broker_db", 1))
+REDIS_RESULT_URL = get_redis_url(config["redis"].get("result_db", 2))
 
 # MinIO Configuration
 MINIO_UPLOAD_ENDPOINT = config["minio"]["upload_endpoint"]
@@ -203,8 +243,14 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
+        "app.base.renderers.ORJSONRenderer",
+        # the browsable API renders every response as HTML forms, only for development
+        *(["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "app.base.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_PAGINATION_CLASS": "app.base.pagination.CustomPagination",
     "PAGE_SIZE": 10,
@@ -255,20 +301,36 @@ ADMIN_URL = config["server"]["admin_url"]
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": REDIS_URL,
+        "LOCATION": REDIS_CACHE_URL,
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # counts the hits, misses and written bytes per key namespace, see app.core.redis_client
+            "CLIENT_CLASS": "app.core.redis_client.InstrumentedRedisClient",
+            # the rendered products and responses are JSON, they shrink several times
+            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
+            "SOCKET_CONNECT_TIMEOUT": 5,
+            "SOCKET_TIMEOUT": 5,
+            # the pool is shared by the threads of a process
+            "CONNECTION_POOL_KWARGS": {
+                "max_connections": config["redis"].get("max_connections", 50),
+                "socket_keepalive": True,
+                "health_check_interval": 30,
+                "retry_on_timeout": True,
+            },
         },
     }
 }
 
 # Celery Configuration
-CELERY_BROKER_URL = REDIS_URL
-CELERY_RESULT_BACKEND = REDIS_URL
+CELERY_BROKER_URL = REDIS_BROKER_URL
+CELERY_RESULT_BACKEND = REDIS_RESULT_URL
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# the tasks are fire-and-forget, the ones whose result is read are declared in TASKS_WITH_RESULTS of app.core.celery
+CELERY_TASK_IGNORE_RESULT = True
+# the results which are stored are removed after an hour
+CELERY_RESULT_EXPIRES = 60 * 60
 
 # Mailer settings
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -13,12 +13,22 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 
+from app.auth.permissions import IsAdminUser
+from app.core.redis_client import get_cache_stats
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def health_check(request):  
     return Response(data={"status": "ok"}, status=status.HTTP_200_OK)
 
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    return Response(data={"data": get_cache_stats()}, status=status.HTTP_200_OK)
+
+
 api_v1_patterns = [
     path('', include('app.auth.urls')),
     path('', include('app.booking.urls')),
@@ -36,6 +46,8 @@ urlpatterns = [
     
     # Health check
     path('health', health_check),
+    # Hit ratio and memory of each cache key namespace
+    path('cache/stats', cache_stats),
 
     # API v1 URLs
     path('api/v1/', include(api_v1_patterns)),
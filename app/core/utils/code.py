@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from django.db import connections, models, router
+
+from app.base.models import CodeCounter
+
+
+CODE_DIGITS = 4
+
+# the counter of another day starts again after the last code of the day in the database,
+# the concurrent resets wait for the row lock and see the day already set
+ALLOCATE_CODES_QUERY = f"""
+    UPDATE {CodeCounter._meta.db_table}
+    SET value = CASE WHEN day = %s THEN value ELSE %s END + %s, day = %s
+    WHERE key = %s
+    RETURNING value
+"""
+ALLOCATE_CODES_OF_DAY_QUERY = f"""
+    UPDATE {CodeCounter._meta.db_table}
+    SET value = value + %s
+    WHERE key = %s AND day = %s
+    RETURNING value
+"""
+
+
+def get_day_prefix(prefix: str, day: datetime = None) -> str:
+    # example: BK250617
+    return f'{prefix}{(day or datetime.now()).strftime("%y%m%d")}'
+
+
+def get_last_code_number(model: type[models.Model], day_prefix: str, field: str = 'code') -> int:
+    # read from the primary database, a replica may not have the last codes yet
+    last_code = (
+        model.objects
+        .using(router.db_for_write(model))
+        .filter(**{f'{field}__startswith': day_prefix})
+        .order_by(f'-{field}')
+        .values_list(field, flat=True)
+        .first()
+    )
+    if not last_code:
+        return 0
+
+    return int(last_code[len(day_prefix):])
+
+
+def get_code_counter_key(model: type[models.Model]) -> str:
+    # example: booking.booking
+    return model._meta.label_lower
+
+
+def allocate_codes(model: type[models.Model], prefix: str, count: int = 1, field: str = 'code') -> list[str]:
+    """
+    This function will allocate unique increasing codes of the day for a model, like BK2506170001.
+    The counter row of the model is locked until the transaction of the caller ends
+    Input:
+        model: the model owning the codes
+        prefix: str, the code prefix of the model
+        count: int, number of codes to allocate at once, for bulk imports
+        field: str, the unique code field of the model
+    Output:
+        list[str]
+    """
+    today = datetime.now().date()
+    day_prefix = get_day_prefix(prefix)
+    key = get_code_counter_key(model)
+    database = router.db_for_write(CodeCounter)
+
+    with connections[database].cursor() as cursor:
+        cursor.execute(ALLOCATE_CODES_OF_DAY_QUERY, [count, key, today])
+        row = cursor.fetchone()
+
+        if row is None:
+            # the first codes of the day, or of a model without a counter yet
+            CodeCounter.objects.using(database).get_or_create(key=key)
+            last_number = get_last_code_number(model, day_prefix, field)
+            cursor.execute(ALLOCATE_CODES_QUERY, [today, last_number, count, today, key])
+            row = cursor.fetchone()
+
+    last_allocated_number = row[0]
+    numbers = range(last_allocated_number - count + 1, last_allocated_number + 1)
+
+    return [f'{day_prefix}{number:0{CODE_DIGITS}d}' for number in numbers]
+
+
+def allocate_code(model: type[models.Model], prefix: str, field: str = 'code') -> str:
+    return allocate_codes(model, prefix, count=1, field=field)[0]
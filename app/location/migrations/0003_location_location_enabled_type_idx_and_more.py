@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0002_location_is_enabled'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(condition=models.Q(('is_enabled', True)), fields=['type', 'province', 'city'], name='location_enabled_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(condition=models.Q(('is_enabled', True)), fields=['province', 'city', 'district', 'ward'], name='location_enabled_area_idx'),
+        ),
+    ]
@@ -24,5 +24,20 @@ class Location(BaseModel):
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
 
+    class Meta:
+        indexes = [
+            # the location listing only shows the enabled locations, filtered by type and area
+            models.Index(
+                fields=['type', 'province', 'city'],
+                name='location_enabled_type_idx',
+                condition=models.Q(is_enabled=True),
+            ),
+            models.Index(
+                fields=['province', 'city', 'district', 'ward'],
+                name='location_enabled_area_idx',
+                condition=models.Q(is_enabled=True),
+            ),
+        ]
+
     def __str__(self):
         return self.name
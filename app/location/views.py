@@ -28,6 +28,8 @@ class LocationModelViewSet(ModelViewSet):
     queryset = Location.objects.all()
     serializer_class = serializers.LocationSerializer
     pagination_class = CustomPagination
+    # the safe requests read from a replica, see ReadReplicaMiddleware
+    use_read_replica = True
 
     def get_queryset(self):
         search_query = self.request.query_params.get("search", None)
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 from app.booking.models import Booking
 from app.base.models import BaseModel
@@ -77,6 +77,11 @@ class PaymentTransaction(BaseModel):
     
     def __str__(self):
         return f"{self.booking.code} - {self.payment_method_type}"
+
+    def save(self, *args, **kwargs):
+        # the booking outbox event is stored by the save signals, within the same transaction
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
     
     def is_new(self):
         return self.status == PaymentTransactionStatus.NEW
@@ -1,10 +1,10 @@
 import time
 
 from app.booking.models import (
-    BookingEventHistory,
     BookingInstanceTypeEnum,
     BookingEventTypeEnum,
 )
+from app.booking.services.booking_event_history import add_booking_event_history
 from app.payment.models import PaymentTransaction
 
 
@@ -18,7 +18,7 @@ def process_payment(payment_transaction_id):
         time.sleep(3)
         payment_transaction.purchase_success()
 
-        BookingEventHistory.objects.create(
+        add_booking_event_history(
             event_type=BookingEventTypeEnum.PURCHASE,
             instance_type=BookingInstanceTypeEnum.BOOKING,
             instance_id=str(payment_transaction.booking.id),
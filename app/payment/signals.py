@@ -1,41 +1,26 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 
-from app.booking.models import BookingEventHistory, BookingInstanceTypeEnum, BookingEventTypeEnum, BookingStatus
-from app.payment.models import PaymentTransaction, PaymentTransactionStatus
+from app.booking.models import BookingOutboxEventTypeEnum
+from app.booking.services.booking_outbox import publish_booking_outbox_event
+from app.payment.models import PaymentTransaction
 
 
-@receiver(post_save, sender=PaymentTransaction)
-def update_booking_status(sender, instance, created, **kwargs):
-    def add_booking_history(booking, description):
-        BookingEventHistory.objects.create(
-            event_type=BookingEventTypeEnum.UPDATE,
-            instance_type=BookingInstanceTypeEnum.BOOKING,
-            instance_id=str(booking.id),
-            trigger_by=booking.customer,
-            description=description,
-        )
+@receiver(pre_save, sender=PaymentTransaction)
+def snapshot_payment_transaction_status(sender, instance, **kwargs):
+    instance._previous_status = None
+    if instance.id:
+        instance._previous_status = PaymentTransaction.objects.filter(id=instance.id).values_list('status', flat=True).first()
+
 
-    def update_booking_status():
-        if payment_transaction.status == PaymentTransactionStatus.PENDING:
-            booking.status = BookingStatus.PENDING_PAYMENT
-            booking.save()
-            add_booking_history(booking, f'Booking status updated to {booking.status}')
-        elif payment_transaction.status == PaymentTransactionStatus.SUCCESS:
-            booking.status = BookingStatus.PAID
-            booking.save()
-            add_booking_history(booking, f'Booking status updated to {booking.status}')
-        elif payment_transaction.status == PaymentTransactionStatus.FAILED:
-            booking.status = BookingStatus.FAILED
-            booking.save()
-            add_booking_history(booking, f'Failed to purchase booking')
-        elif payment_transaction.status == PaymentTransactionStatus.CANCELLED:
-            booking.status = BookingStatus.CANCELLED
-            booking.save()
-            add_booking_history(booking, f'Cancelled payment transaction')
+@receiver(post_save, sender=PaymentTransaction)
+def publish_payment_status_changed(sender, instance, created, **kwargs):
+    # the booking is updated by the outbox consumer, in its own transaction
+    if created or instance._previous_status == instance.status:
+        return
 
-    payment_transaction = instance
-    booking = payment_transaction.booking
-    
-    if not created:
-        update_booking_status()
+    publish_booking_outbox_event(
+        instance.booking_id,
+        BookingOutboxEventTypeEnum.PAYMENT_STATUS_CHANGED,
+        {'status': instance.status, 'payment_transaction_id': instance.id},
+    )
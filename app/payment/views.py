@@ -48,8 +48,9 @@ class PaymentTransactionModelViewSet(viewsets.ModelViewSet):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
+        # the booking status is updated by the outbox consumer, the status of the payment itself is always current
         booking = payment_transaction.booking
-        if booking.status not in [BookingStatus.NEW, BookingStatus.PENDING_PAYMENT]:
+        if booking.status not in [BookingStatus.NEW, BookingStatus.PENDING_PAYMENT] or payment_transaction.is_success():
             return Response({'error': 'Can not purchase this booking'}, status=status.HTTP_400_BAD_REQUEST)
 
         payment_transaction.purchase()
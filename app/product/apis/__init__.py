@@ -9,6 +9,7 @@ from .availability_configuration import (
 from .price_configuration import (
     ProductPriceConfigurationModelViewSet,
     ProductPricePreviewAPIView,
+    ProductPriceCalendarAPIView,
 )
 from .product import ProductModelViewSet, ProductUnitAPIView
 
@@ -24,6 +25,7 @@ __all__ = [
     # Product Pricing
     'ProductPriceConfigurationModelViewSet',
     'ProductPricePreviewAPIView',
+    'ProductPriceCalendarAPIView',
     
     # Product
     'ProductModelViewSet',
@@ -3,6 +3,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
@@ -13,6 +14,7 @@ from app.base.mixins import SoftDeleteViewSetMixin
 from app.product import serializers
 from app.product.models import ProductPriceConfiguration
 from app.product.services.product_price_configuration.get_applied_price_configuration_product_service import GetAppliedPriceConfigurationProductService
+from app.product.services.product_price_configuration.get_product_price_calendar_service import GetProductPriceCalendarService
 
 
 class ProductPriceConfigurationModelViewSet(SoftDeleteViewSetMixin, ModelViewSet):
@@ -62,9 +64,14 @@ class ProductPricePreviewAPIView(APIView):
 
         product_ids = serializer.validated_data.get('product_ids')
         
-        applied_product_prices = GetAppliedPriceConfigurationProductService(product_ids=product_ids).perform()
+        # the preview is complete even when the cache is cold
+        applied_product_prices = GetAppliedPriceConfigurationProductService(product_ids=product_ids, compute_missing=True).perform()
         
-        serializer = serializers.ProductPricePreviewResponseSerializer(applied_product_prices.values(), many=True)
+        # the products without an applicable configuration are left out
+        serializer = serializers.ProductPricePreviewResponseSerializer(
+            [applied_product_price for applied_product_price in applied_product_prices.values() if applied_product_price],
+            many=True,
+        )
         
         paginator = CustomPagination()
         page = paginator.paginate_queryset(serializer.data, request)
@@ -75,3 +82,26 @@ class ProductPricePreviewAPIView(APIView):
             data=serializer.data,
             status=status.HTTP_200_OK
         )
+
+
+class ProductPriceCalendarAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        serializer = serializers.ProductPriceCalendarRequestSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        prices_by_product = GetProductPriceCalendarService(
+            product_ids=serializer.validated_data['product_ids'],
+            start_date=serializer.validated_data['start_date'],
+            end_date=serializer.validated_data['end_date'],
+        ).perform()
+
+        calendar_items = [
+            {'product_id': int(product_id), 'prices': prices}
+            for product_id, prices in prices_by_product.items()
+        ]
+
+        serializer = serializers.ProductPriceCalendarItemSerializer(calendar_items, many=True)
+
+        return Response({'data': serializer.data}, status=status.HTTP_200_OK)
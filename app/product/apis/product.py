@@ -1,5 +1,4 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from django.core.cache import cache
 from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 
@@ -10,23 +9,32 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from app.core.utils.logger import logger
+from app.base.cache import cache_response, get_list_cache_tag, get_object_cache_tag, invalidate_cache_tags
 from app.base.pagination import CustomPagination
+from app.base.renderers import PrerenderedJSONResponse, render_prerendered_list
 from app.base.mixins import SoftDeleteViewSetMixin
 
 from app.product import serializers
 from app.product.filters import ProductFilter
 from app.product.models import Product, ProductUnit
-from app.product.services.product_price_configuration.get_applied_price_configuration_product_service import GetAppliedPriceConfigurationProductService
+from app.product.services.product_render.get_rendered_product_service import GetRenderedProductService
+
+
+CACHE_TIMEOUT = 60 * 60 * 24
 
 
 class ProductModelViewSet(SoftDeleteViewSetMixin, ModelViewSet):    
     queryset = Product.objects.filter(is_deleted=False)
     serializer_class = serializers.ProductSerializer
     pagination_class = CustomPagination
+    # the safe requests read from a replica, see ReadReplicaMiddleware
+    use_read_replica = True
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_class = ProductFilter
     search_fields = ["id", "name", "code_name", "supplier__name"]
     ordering_fields = [
+        "price_vnd",
+        "price_usd",
         "base_price_vnd",
         "base_price_usd",
         "rating",
@@ -45,8 +53,16 @@ class ProductModelViewSet(SoftDeleteViewSetMixin, ModelViewSet):
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = serializers.ProductWithPriceConfigurationSerializer.setup_eager_loading(queryset)
+        return queryset
     
-    @method_decorator(cache_page(60 * 60 * 24, key_prefix="product_list"))
+    @cache_response(CACHE_TIMEOUT, prefix="product_list", tags=lambda view, request, *args, **kwargs: [
+        get_list_cache_tag("product"),
+    ])
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         paginator = CustomPagination()
@@ -55,56 +71,46 @@ class ProductModelViewSet(SoftDeleteViewSetMixin, ModelViewSet):
         products = page if page is not None else queryset
         product_ids = [product.id for product in products]
 
-        applied_prices = GetAppliedPriceConfigurationProductService(product_ids=product_ids).perform()
-
-        serializer = serializers.ProductWithPriceConfigurationSerializer(
-            products,
-            many=True,
-            context={"applied_prices": applied_prices},
-        )
+        # the page is assembled from the rendered products, one MGET and no field by field serialization
+        rendered_products = GetRenderedProductService(product_ids=product_ids).perform() if product_ids else {}
+        rendered_items = [rendered_products[product_id] for product_id in product_ids if product_id in rendered_products]
 
-        if page is not None:
-            return paginator.get_paginated_response(serializer.data)
-
-        return Response(serializer.data)
+        envelope = paginator.get_paginated_response([]).data if page is not None else None
+        return PrerenderedJSONResponse(render_prerendered_list(envelope, rendered_items))
     
-    @method_decorator(cache_page(60 * 60 * 24, key_prefix="product_retrieve"))
+    @cache_response(CACHE_TIMEOUT, prefix="product_retrieve", tags=lambda view, request, *args, **kwargs: [
+        get_object_cache_tag("product", kwargs["pk"]),
+    ])
     def retrieve(self, request, *args, **kwargs):
         product = self.get_object()
-        applied_product_price = GetAppliedPriceConfigurationProductService(product_id=product.id).perform()
-        
-        serializer = serializers.ProductWithPriceConfigurationSerializer(
-            product,
-            context={"applied_price": applied_product_price},
-        )
-        
-        return Response(serializer.data)
+        return PrerenderedJSONResponse(GetRenderedProductService(product_id=product.id).perform())
 
-    def _clear_cache(self):
-        prefixes = [
-            "product_list",
-            "product_retrieve",
-        ]
-        
-        for prefix in prefixes:
-            keys = cache.keys(f"*{prefix}*")
-            cache.delete_many(keys)
+    def _clear_cache(self, pk=None):
+        tags = [get_list_cache_tag("product")]
+        if pk is not None:
+            tags.append(get_object_cache_tag("product", pk))
+
+        invalidate_cache_tags(*tags)
 
     def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
         self._clear_cache()
-        return super().create(request, *args, **kwargs)
+        return response
 
     def update(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().update(request, *args, **kwargs)
+        response = super().update(request, *args, **kwargs)
+        self._clear_cache(kwargs.get("pk"))
+        return response
         
     def destroy(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().destroy(request, *args, **kwargs)
+        response = super().destroy(request, *args, **kwargs)
+        self._clear_cache(kwargs.get("pk"))
+        return response
     
     def partial_update(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().partial_update(request, *args, **kwargs)
+        response = super().partial_update(request, *args, **kwargs)
+        self._clear_cache(kwargs.get("pk"))
+        return response
 
 
 class ProductUnitAPIView(APIView):
@@ -46,6 +46,8 @@ class ProductFilter(django_filters.FilterSet):
         supplier_names = value.split(',')
         return queryset.filter(supplier__id__in=supplier_names)
 
+    # the JSON filters are containment (@>) lookups, served by the jsonb_path_ops GIN indexes of Product
+
     def filter_by_province(self, queryset, name, value):
         return queryset.filter(available_locations__contains=[{'province': value}])
     
@@ -79,35 +81,41 @@ class ProductFilter(django_filters.FilterSet):
     def filter_by_price_min(self, queryset, name, value):
         currency_selected = self.form.cleaned_data.get('currency')
         
+        # the effective price is the one displayed to the customers
         if currency_selected == Currency.VND.value:
-            return queryset.filter(base_price_vnd__gte=value)
-        return queryset.filter(base_price_usd__gte=value)
+            return queryset.filter(effective_price__price_vnd__gte=value)
+        return queryset.filter(effective_price__price_usd__gte=value)
 
     def filter_by_price_max(self, queryset, name, value):
         currency_selected = self.form.cleaned_data.get('currency')
         
         if currency_selected == Currency.VND.value:
-            return queryset.filter(base_price_vnd__lte=value)
-        return queryset.filter(base_price_usd__lte=value)
+            return queryset.filter(effective_price__price_vnd__lte=value)
+        return queryset.filter(effective_price__price_usd__lte=value)
 
     def filter_by_statuses(self, queryset, name, value):
         statuses_to_filter = value.split(',')
         return queryset.filter(status__in=statuses_to_filter)
 
+    # details is an object, the numbers are stored either as numbers or as strings
+    def filter_by_details_number(self, queryset, key, value):
+        value = int(value) if value == int(value) else float(value)
+        return queryset.filter(Q(details__contains={key: value}) | Q(details__contains={key: str(value)}))
+
     # Airport service
     def filter_by_number_of_travellers(self, queryset, name, value):
-        return queryset.filter(details__contains=[{'number_of_travellers': value}])
+        return self.filter_by_details_number(queryset, 'number_of_travellers', value)
     
     def filter_by_number_of_days(self, queryset, name, value):
-        return queryset.filter(details__contains=[{'number_of_days': value}])
+        return self.filter_by_details_number(queryset, 'number_of_days', value)
     
-    # Fast track
+    # Fast track, the available times are stored as HH:MM
     def filter_by_available_time_from(self, queryset, name, value):
-        return queryset.filter(details__available_time_from=value)
+        return queryset.filter(details__contains={'available_time_from': value.strftime('%H:%M')})
     
     def filter_by_available_time_to(self, queryset, name, value):
-        return queryset.filter(details__available_time_to=value)
+        return queryset.filter(details__contains={'available_time_to': value.strftime('%H:%M')})
     
     # E-visa
     def filter_by_processing_time(self, queryset, name, value):
-        return queryset.filter(details__contains=[{'processing_time': value}])
+        return self.filter_by_details_number(queryset, 'processing_time', value)
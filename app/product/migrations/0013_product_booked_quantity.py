@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0012_remove_productavailabilityconfiguration_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductBookedQuantity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('day', models.DateField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_quantities', to='product.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('product', 'day'), name='unique_product_booked_quantity_per_day')],
+            },
+        ),
+    ]
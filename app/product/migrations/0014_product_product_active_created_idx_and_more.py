@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0013_product_booked_quantity'),
+        ('supplier', '0007_supplier_supplier_active_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at'], name='product_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['service_type', 'status'], name='product_active_service_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productavailabilityconfiguration',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['product', 'day'], name='product_avail_config_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productpriceconfiguration',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at'], name='price_config_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:56
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0014_product_product_active_created_idx_and_more'),
+        ('supplier', '0007_supplier_supplier_active_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['available_locations'], name='product_locations_gin_idx', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['details'], name='product_details_gin_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0015_product_product_locations_gin_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductEffectivePrice',
+            fields=[
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='effective_price', serialize=False, to='product.product')),
+                ('price_vnd', models.DecimalField(db_index=True, decimal_places=2, max_digits=16)),
+                ('price_usd', models.DecimalField(db_index=True, decimal_places=2, max_digits=16)),
+                ('price_configuration', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='effective_prices', to='product.productpriceconfiguration')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+BATCH_SIZE = 1_000
+
+
+def backfill_product_effective_prices(apps, schema_editor):
+    Product = apps.get_model('product', 'Product')
+    ProductEffectivePrice = apps.get_model('product', 'ProductEffectivePrice')
+
+    # the base prices until the next price precompute applies the price configurations,
+    # every product gets a row, the deleted ones included
+    products = Product.objects.filter(effective_price__isnull=True).values_list('id', 'base_price_vnd', 'base_price_usd')
+
+    effective_prices = []
+    for product_id, base_price_vnd, base_price_usd in products.iterator(chunk_size=BATCH_SIZE):
+        effective_prices.append(ProductEffectivePrice(product_id=product_id, price_vnd=base_price_vnd, price_usd=base_price_usd))
+        if len(effective_prices) >= BATCH_SIZE:
+            ProductEffectivePrice.objects.bulk_create(effective_prices, ignore_conflicts=True)
+            effective_prices = []
+
+    ProductEffectivePrice.objects.bulk_create(effective_prices, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0016_product_effective_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_product_effective_prices, migrations.RunPython.noop),
+    ]
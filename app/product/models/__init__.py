@@ -2,6 +2,8 @@ from .availability_configuration import (
     ProductAvailabilityConfiguration,
     ProductAvailabilityConfigurationType,
 )
+from .booked_quantity import ProductBookedQuantity
+from .effective_price import ProductEffectivePrice
 from .product import (
     Product,
     ServiceType,
@@ -18,6 +20,7 @@ __all__ = [
     # Product Availability
     'ProductAvailabilityConfiguration',
     'ProductAvailabilityConfigurationType',
+    'ProductBookedQuantity',
     
     # Product
     'Product',
@@ -29,4 +32,5 @@ __all__ = [
     # Product Pricing
     'ProductPriceConfiguration',
     'PriceAdjustmentType',
+    'ProductEffectivePrice',
 ]
\ No newline at end of file
@@ -24,6 +24,16 @@ class ProductAvailabilityConfiguration(BaseModel, SoftDeleteMixin):
     value = models.IntegerField(default=0)
     day = models.DateField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # the availability calendar and the capacity checks read a day range of some products
+            models.Index(
+                fields=['product', 'day'],
+                name='product_avail_config_day_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         self.validate()
         super().save(*args, **kwargs)
@@ -0,0 +1,18 @@
+from django.db import models
+
+from app.base.models import BaseModel
+
+
+class ProductBookedQuantity(BaseModel):
+    """
+    Quantity of a product already booked for a day, maintained from the booking items
+    """
+    product = models.ForeignKey("Product", related_name="booked_quantities", on_delete=models.CASCADE)
+
+    day = models.DateField()
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'day'], name='unique_product_booked_quantity_per_day'),
+        ]
@@ -0,0 +1,21 @@
+from django.db import models
+
+from app.base.models import BaseModel
+
+
+class ProductEffectivePrice(BaseModel):
+    """
+    Price a product is sold at right now, materialized by the price precompute so the catalogue can filter and sort on it
+    """
+    product = models.OneToOneField("Product", related_name="effective_price", on_delete=models.CASCADE, primary_key=True)
+    # no price configuration means that the base price applies
+    price_configuration = models.ForeignKey(
+        "ProductPriceConfiguration",
+        related_name="effective_prices",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+
+    price_vnd = models.DecimalField(max_digits=16, decimal_places=2, db_index=True)
+    price_usd = models.DecimalField(max_digits=16, decimal_places=2, db_index=True)
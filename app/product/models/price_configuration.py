@@ -1,9 +1,13 @@
-from datetime import timezone, datetime
+from datetime import timezone, datetime, time
+from typing import Optional
 
 from django.db import models
+from django.utils import timezone as django_timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from app.base.models import BaseModel, SoftDeleteMixin  
 from app.base.enums import BaseEnum
+from app.core.utils.code import allocate_code, allocate_codes
 
 
 class PriceAdjustmentType(models.TextChoices):
@@ -55,6 +59,11 @@ class ProductPriceConfiguration(BaseModel, SoftDeleteMixin):
 
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='price_config_created_idx', condition=models.Q(is_deleted=False)),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.code:
             self.code = self.generate_unique_code()
@@ -66,26 +75,28 @@ class ProductPriceConfiguration(BaseModel, SoftDeleteMixin):
     def generate_unique_code(self):
         # code = PC + YYMMDD + 4 digits
         # example: PC2506170001
-        today = datetime.now().strftime('%y%m%d')
-        last_price_configuration = ProductPriceConfiguration.objects.filter(code__startswith=f'{self.PREFIX_CODE}{today}').order_by('-code').first()
-        if last_price_configuration:
-            last_price_configuration_number = int(last_price_configuration.code.split(f'{self.PREFIX_CODE}{today}')[1])
-            new_price_configuration_number = last_price_configuration_number + 1
-        else:
-            new_price_configuration_number = 1
-        return f'{self.PREFIX_CODE}{today}{new_price_configuration_number:04d}'
+        return allocate_code(ProductPriceConfiguration, self.PREFIX_CODE)
+
+    @classmethod
+    def generate_unique_codes(cls, count: int) -> list[str]:
+        return allocate_codes(cls, cls.PREFIX_CODE, count)
     
     def validate(self):
         self._validate_adjustment()
         self._validate_time_range()
 
-    def is_time_range_valid(self) -> bool:
+    def is_time_range_valid(self, at: datetime = None) -> bool:
+        """
+        Check whether the price configuration applies at the given moment, now by default
+        """
+        at = django_timezone.localtime(at)
+
         if self.time_range_type == PriceAdjustmentTimeRangeType.PERIOD:
-            return self._verify_time_range_period()
+            return self._verify_time_range_period(at)
         elif self.time_range_type == PriceAdjustmentTimeRangeType.RECURRING_DAY_OF_WEEK:
-            return self._verify_time_range_recurring_day_of_week()
+            return self._verify_time_range_recurring_day_of_week(at)
         elif self.time_range_type == PriceAdjustmentTimeRangeType.RECURRING_DAY_OF_MONTH:
-            return self._verify_time_range_recurring_day_of_month()
+            return self._verify_time_range_recurring_day_of_month(at)
 
     def is_valid_products(self, product_id: int) -> bool:
         if not self.products.all(): return True
@@ -175,7 +186,7 @@ class ProductPriceConfiguration(BaseModel, SoftDeleteMixin):
             raise ValueError('Day of week must be a list')
         
         for day in day_of_week:
-            if day not in DayOfWeek.choices():
+            if day not in DayOfWeek.values():
                 raise ValueError('Invalid day of week')
 
     def _validate_time_range_recurring_day_of_month(self):
@@ -195,48 +206,73 @@ class ProductPriceConfiguration(BaseModel, SoftDeleteMixin):
         if day_of_month < 1 or day_of_month > 31:
             raise ValueError('Day of month must be between 1 and 31')
 
-    def _verify_time_range_period(self) -> bool:
+    def _verify_time_range_period(self, at: datetime) -> bool:
         if not isinstance(self.time_range_value, dict):
             return False
         
-        start_date = self.time_range_value.get('start_date')
-        end_date = self.time_range_value.get('end_date')
+        start_datetime = self._parse_time_range_datetime(
+            self.time_range_value.get('start_datetime') or self.time_range_value.get('start_date'),
+        )
+        end_datetime = self._parse_time_range_datetime(
+            self.time_range_value.get('end_datetime') or self.time_range_value.get('end_date'),
+            end_of_day=True,
+        )
         
         # if no time range, it means the price configuration is always valid
-        if not start_date or not end_date:
-            return True
-        
-        if start_date and end_date:
-            return start_date <= datetime.now() <= end_date
-        elif start_date:
-            return start_date <= datetime.now()
-        elif end_date:
-            return datetime.now() <= end_date
+        if start_datetime and end_datetime:
+            return start_datetime <= at <= end_datetime
+        elif start_datetime:
+            return start_datetime <= at
+        elif end_datetime:
+            return at <= end_datetime
 
         return True
 
-    def _verify_time_range_recurring_day_of_week(self) -> bool:
-        if not isinstance(self.time_range_value, list):
-            return False
-        
+    def _verify_time_range_recurring_day_of_week(self, at: datetime) -> bool:
         day_of_week_list = self.time_range_value
+        if isinstance(day_of_week_list, dict):
+            day_of_week_list = day_of_week_list.get('day_of_week')
+
+        if not isinstance(day_of_week_list, list):
+            return False
         
         for day_of_week in day_of_week_list:   
-            if day_of_week not in DayOfWeek.choices(): 
+            if day_of_week not in DayOfWeek.values(): 
                 return False
 
-        now = datetime.now()
-        return now.weekday() in day_of_week_list
+        # DayOfWeek is declared from monday to sunday, like datetime.weekday()
+        return DayOfWeek.values()[at.weekday()] in day_of_week_list
 
-    def _verify_time_range_recurring_day_of_month(self) -> bool:
-        if not isinstance(self.time_range_value, list):
-            return False
-        
+    def _verify_time_range_recurring_day_of_month(self, at: datetime) -> bool:
         day_of_month_list = self.time_range_value
+        if isinstance(day_of_month_list, dict):
+            day_of_month_list = day_of_month_list.get('day_of_month')
+
+        if isinstance(day_of_month_list, int):
+            day_of_month_list = [day_of_month_list]
+
+        if not isinstance(day_of_month_list, list):
+            return False
         
         for day_of_month in day_of_month_list:
             if day_of_month < 1 or day_of_month > 31:
                 return False
 
-        now = datetime.now()
-        return now.day in day_of_month_list
+        return at.day in day_of_month_list
+
+    @staticmethod
+    def _parse_time_range_datetime(value, end_of_day: bool = False) -> Optional[datetime]:
+        if not value or not isinstance(value, str):
+            return None
+
+        parsed_datetime = parse_datetime(value)
+        if not parsed_datetime:
+            parsed_date = parse_date(value)
+            if not parsed_date:
+                return None
+            parsed_datetime = datetime.combine(parsed_date, time.max if end_of_day else time.min)
+
+        if django_timezone.is_naive(parsed_datetime):
+            parsed_datetime = django_timezone.make_aware(parsed_datetime)
+
+        return parsed_datetime
@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 
 from app.base.models import BaseModel, SoftDeleteMixin  
 from app.core.utils.string import slugify
@@ -62,6 +63,20 @@ class Product(BaseModel, SoftDeleteMixin):
 
     supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # the catalogue only lists the products that are not deleted, newest first
+            models.Index(fields=['-created_at'], name='product_active_created_idx', condition=models.Q(is_deleted=False)),
+            models.Index(
+                fields=['service_type', 'status'],
+                name='product_active_service_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+            # containment (@>) filters on the JSON columns, jsonb_path_ops only supports @> and is smaller
+            GinIndex(fields=['available_locations'], name='product_locations_gin_idx', opclasses=['jsonb_path_ops']),
+            GinIndex(fields=['details'], name='product_details_gin_idx', opclasses=['jsonb_path_ops']),
+        ]
+
     def __str__(self):
         return self.name
 
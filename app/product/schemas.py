@@ -1,5 +1,7 @@
+from array import array
 from datetime import date
 from dataclasses import dataclass
+from typing import Optional
 
 from app.product.models import Product, ProductAvailabilityConfiguration
 
@@ -16,6 +18,31 @@ class AppliedProductPrice:
     price_usd: float
 
 
+@dataclass
+class ProductPriceCalendar:
+    """
+    Applied prices of a product for consecutive days starting at start_date.
+    The i-th item of each array is the price of start_date + i days,
+    a price_configuration_id of 0 means that no price configuration applies on that day.
+    """
+    product_id: int
+    start_date: date
+    base_price_vnd: float
+    base_price_usd: float
+    price_configuration_ids: array
+    prices_vnd: array
+    prices_usd: array
+
+    def get_index(self, day: date) -> Optional[int]:
+        index = (day - self.start_date).days
+        if 0 <= index < len(self.prices_vnd):
+            return index
+        return None
+
+    def covers(self, start_date: date, end_date: date) -> bool:
+        return self.get_index(start_date) is not None and self.get_index(end_date) is not None
+
+
 @dataclass
 class ProductAvailability:
     product_id: int
@@ -24,8 +51,22 @@ class ProductAvailability:
     max_capacity: int = 0
 
 
+@dataclass
+class ProductAvailabilityConfigurationItem:
+    """
+    Read-only projection of a ProductAvailabilityConfiguration row, cheaper to build than a model instance
+    """
+    id: int
+    product_id: int
+    day: date
+    type: str
+    value: int
+
+
 @dataclass
 class ComputedProductAvailability:
     product: Product
-    availability_configuration: ProductAvailabilityConfiguration
+    availability_configuration: ProductAvailabilityConfiguration | ProductAvailabilityConfigurationItem
     max_capacity: int
+    booking_count: int = 0
+    remaining_capacity: int = 0
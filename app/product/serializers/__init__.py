@@ -15,6 +15,8 @@ from .price_configuration import (
     ProductPriceConfigurationSerializer,
     ProductPricePreviewRequestSerializer,
     ProductPricePreviewResponseSerializer,
+    ProductPriceCalendarRequestSerializer,
+    ProductPriceCalendarItemSerializer,
 )
 
 
@@ -36,4 +38,6 @@ __all__ = [
     'ProductPriceConfigurationSerializer',
     'ProductPricePreviewRequestSerializer',
     'ProductPricePreviewResponseSerializer',
+    'ProductPriceCalendarRequestSerializer',
+    'ProductPriceCalendarItemSerializer',
 ]
\ No newline at end of file
@@ -79,6 +79,8 @@ class ProductAvailabilityItemDetailSerializer(serializers.Serializer):
     product = CalendarProductItemSerializer(required=True)
     availability_configuration = CalendarProductAvailabilityConfigurationItemSerializer(required=True)
     max_capacity = serializers.IntegerField(required=True)
+    booking_count = serializers.IntegerField(required=True)
+    remaining_capacity = serializers.IntegerField(required=True)
 
 
 class ProductAvailabilityItemSerializer(serializers.Serializer):
@@ -1,6 +1,14 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from app.product.models import ProductPriceConfiguration
+from app.product.services.product_price_configuration.precompute_product_price_calendar_service import (
+    PRODUCT_PRICE_CALENDAR_HORIZON_DAYS,
+    PRODUCT_PRICE_CALENDAR_MAX_PRODUCTS,
+)
 
 
 class ProductPriceConfigurationSerializer(serializers.ModelSerializer):
@@ -12,15 +20,18 @@ class ProductPriceConfigurationSerializer(serializers.ModelSerializer):
             'code': {'read_only': True},
         }
 
+    # the configuration and its products are committed together, the price recompute reads both
     def create(self, *args, **kwargs):
         try:
-            return super().create(*args, **kwargs)
+            with transaction.atomic():
+                return super().create(*args, **kwargs)
         except Exception as e:
             raise serializers.ValidationError(e)
 
     def update(self, *args, **kwargs):
         try:
-            return super().update(*args, **kwargs)
+            with transaction.atomic():
+                return super().update(*args, **kwargs)
         except Exception as e:
             raise serializers.ValidationError(e)
 
@@ -38,3 +49,43 @@ class ProductPricePreviewResponseSerializer(serializers.Serializer):
     price_vnd = serializers.FloatField()
     base_price_usd = serializers.FloatField()
     price_usd = serializers.FloatField()
+
+
+class ProductPriceCalendarRequestSerializer(serializers.Serializer):
+    product_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=True,
+        allow_empty=False,
+        max_length=PRODUCT_PRICE_CALENDAR_MAX_PRODUCTS,
+    )
+    start_date = serializers.DateField(required=True)
+    end_date = serializers.DateField(required=True)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        if attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError({'end_date': 'End date must be after start date'})
+
+        today = timezone.localdate()
+        if attrs['start_date'] < today:
+            raise serializers.ValidationError({'start_date': 'Start date must not be in the past'})
+
+        if attrs['end_date'] >= today + timedelta(days=PRODUCT_PRICE_CALENDAR_HORIZON_DAYS):
+            raise serializers.ValidationError({'end_date': f'End date must be within {PRODUCT_PRICE_CALENDAR_HORIZON_DAYS} days'})
+
+        attrs['product_ids'] = list(dict.fromkeys(attrs['product_ids']))
+
+        return attrs
+
+
+class ProductDailyPriceSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    price_configuration_id = serializers.IntegerField(allow_null=True)
+    price_vnd = serializers.FloatField()
+    price_usd = serializers.FloatField()
+
+
+class ProductPriceCalendarItemSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    prices = ProductDailyPriceSerializer(many=True)
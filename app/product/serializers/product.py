@@ -1,3 +1,5 @@
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 
 from app.product.models import Product
@@ -39,46 +41,28 @@ class ProductWithPriceConfigurationSerializer(ProductSerializer):
         model = Product
         fields = '__all__'
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # the price fields are read from these annotations when no applied price is given in the context
+        return queryset.select_related('supplier').annotate(
+            price_configuration_id=F('effective_price__price_configuration_id'),
+            price_configuration_name=F('effective_price__price_configuration__name'),
+            # never empty, the listings sort and paginate on them
+            price_vnd=Coalesce(F('effective_price__price_vnd'), F('base_price_vnd')),
+            price_usd=Coalesce(F('effective_price__price_usd'), F('base_price_usd')),
+        )
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
 
+        # the applied price given in the context takes precedence over the annotated one
         applied_price = self.context.get("applied_price")
         if applied_price:
-            return self.to_representation_for_single_product(instance)
-        
-        applied_prices = self.context.get("applied_prices")
-        if applied_prices:
-            return self.to_representation_for_multiple_products(instance)
-
-        return data
-    
-    def to_representation_for_single_product(self, instance):
-        data = super().to_representation(instance)
-
-        applied_price = self.context.get("applied_price", {})
-
-        data['price_configuration_id'] = applied_price.price_configuration_id
-        data['price_configuration_name'] = applied_price.price_configuration_name
-        data['base_price_vnd'] = float(applied_price.base_price_vnd)
-        data['price_vnd'] = float(applied_price.price_vnd)
-        data['base_price_usd'] = float(applied_price.base_price_usd)
-        data['price_usd'] = float(applied_price.price_usd)
-
-        return data
-    
-    def to_representation_for_multiple_products(self, instance):
-        data = super().to_representation(instance)
-
-        applied_prices = self.context.get("applied_prices", {})
-        applied_price = applied_prices.get(str(instance.id), None)
-        if not applied_price:
-            return data
-
-        data['price_configuration_id'] = applied_price.price_configuration_id
-        data['price_configuration_name'] = applied_price.price_configuration_name
-        data['base_price_vnd'] = float(applied_price.base_price_vnd)
-        data['price_vnd'] = float(applied_price.price_vnd)
-        data['base_price_usd'] = float(applied_price.base_price_usd)
-        data['price_usd'] = float(applied_price.price_usd)
+            data['price_configuration_id'] = applied_price.price_configuration_id
+            data['price_configuration_name'] = applied_price.price_configuration_name
+            data['base_price_vnd'] = float(applied_price.base_price_vnd)
+            data['price_vnd'] = float(applied_price.price_vnd)
+            data['base_price_usd'] = float(applied_price.base_price_usd)
+            data['price_usd'] = float(applied_price.price_usd)
 
         return data
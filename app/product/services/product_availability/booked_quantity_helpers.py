@@ -0,0 +1,124 @@
+from datetime import date, datetime
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from app.product.models import ProductAvailabilityConfiguration, ProductBookedQuantity
+from app.product.services.product_availability.compute_product_availability_service import compute_max_capacity
+
+
+class ProductCapacityExceededError(ValueError):
+    def __init__(self, product_id: int, day: date):
+        self.product_id = product_id
+        self.day = day
+        super().__init__(f'Product {product_id} is fully booked on {day}')
+
+
+def get_booked_day(due_datetime: Optional[datetime]) -> Optional[date]:
+    """
+    This function will return the day a booked quantity is counted on
+    Input:
+        due_datetime: datetime, the due datetime of the booking item
+    Output:
+        date, or None when the booking item has no due datetime
+    """
+    if not due_datetime:
+        return None
+
+    if timezone.is_naive(due_datetime):
+        return due_datetime.date()
+
+    return timezone.localdate(due_datetime)
+
+
+def group_booked_quantities(items) -> dict[tuple[int, date], int]:
+    """
+    This function will sum the quantities of booking items by the product and day they are booked on
+    Input:
+        items: [(<product_id>, <due_datetime>, <quantity>)]
+    Output:
+        {(<product_id>, <day>): <quantity>}
+    """
+    booked_quantities = {}
+    for product_id, due_datetime, quantity in items:
+        day = get_booked_day(due_datetime)
+        if day is None or not quantity:
+            continue
+        booked_quantities[(product_id, day)] = booked_quantities.get((product_id, day), 0) + quantity
+
+    return booked_quantities
+
+
+def get_capacities(cells: list[tuple[int, date]]) -> dict[tuple[int, date], int]:
+    """
+    This function will return the capacity of the given (product, day) cells, the lowest one when several configurations apply
+    Input:
+        cells: [(<product_id>, <day>)]
+    Output:
+        {(<product_id>, <day>): <max capacity>}, cells without configuration have no limit
+    """
+    cells = set(cells)
+    availability_configurations = ProductAvailabilityConfiguration.objects.filter(
+        product_id__in={product_id for product_id, _ in cells},
+        day__in={day for _, day in cells},
+        is_deleted=False,
+    ).values_list('product_id', 'day', 'type', 'value', 'product__max_quantity')
+
+    capacities = {cell: ProductAvailabilityConfiguration.NO_LIMIT_MAX_CAPACITY for cell in cells}
+    for product_id, day, type, value, max_quantity in availability_configurations:
+        if (product_id, day) in cells:
+            capacities[(product_id, day)] = min(capacities[(product_id, day)], compute_max_capacity(type, value, max_quantity))
+
+    return capacities
+
+
+def adjust_booked_quantities(deltas: dict[tuple[int, date], int], enforce_capacity: bool = False) -> None:
+    """
+    This function will add the given deltas to the booked quantity counters, creating the missing ones
+    Input:
+        deltas: {(<product_id>, <day>): <quantity to add, negative to release>}
+        enforce_capacity: bool, refuse to book more than the capacity of a cell
+    Raise:
+        ProductCapacityExceededError, nothing is adjusted in that case
+    """
+    deltas = {cell: delta for cell, delta in deltas.items() if delta}
+    capacities = get_capacities([cell for cell, delta in deltas.items() if delta > 0]) if enforce_capacity else {}
+
+    with transaction.atomic():
+        # a stable order keeps concurrent adjustments from locking the same rows in a different order
+        for (product_id, day), delta in sorted(deltas.items()):
+            counter = ProductBookedQuantity.objects.filter(product_id=product_id, day=day)
+            if (product_id, day) in capacities:
+                # the row lock taken by the update makes the capacity check and the increment one atomic step
+                counter = counter.filter(quantity__lte=capacities[(product_id, day)] - delta)
+
+            if counter.update(quantity=F('quantity') + delta, updated_at=timezone.now()):
+                continue
+
+            ProductBookedQuantity.objects.get_or_create(product_id=product_id, day=day)
+            if not counter.update(quantity=F('quantity') + delta, updated_at=timezone.now()):
+                raise ProductCapacityExceededError(product_id, day)
+
+
+def list_booked_quantities(product_ids: list[int], start_date: date, end_date: date) -> dict[tuple[int, date], int]:
+    """
+    This function will list the booked quantities of products within a time range
+    Input:
+        product_ids: list[int]
+        start_date: date
+        end_date: date
+    Output:
+        {(<product_id>, <day>): <booked quantity>}
+    """
+    booked_quantities = ProductBookedQuantity.objects.filter(
+        product_id__in=product_ids,
+        day__gte=start_date,
+        day__lte=end_date,
+    ).values_list('product_id', 'day', 'quantity')
+
+    return {
+        (product_id, day): quantity
+        for product_id, day, quantity in booked_quantities
+    }
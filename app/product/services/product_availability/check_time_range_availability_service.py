@@ -33,4 +33,4 @@ class CheckTimeRangeAvailabilityService(BaseService):
         return ProductAvailabilityConfiguration.objects.filter(
             day__gte=self.start_date,
             day__lte=self.end_date,
-        ).values_list('product_id', flat=True)
+        ).values_list('product_id', flat=True).distinct()
@@ -9,6 +9,28 @@ from app.product.models import (
 from app.product.schemas import ComputedProductAvailability
 
 
+def compute_max_capacity(type: str, value: int, max_quantity: int) -> int:
+    """
+    This function will compute the capacity granted by an availability configuration
+    Input:
+        type: ProductAvailabilityConfigurationType
+        value: int, the configuration value
+        max_quantity: int, the product max quantity
+    Output:
+        int
+    """
+    if type == ProductAvailabilityConfigurationType.FIXED_QUANTITY:
+        return value
+    elif type == ProductAvailabilityConfigurationType.PERCENTAGE_QUANTITY:
+        return round(max_quantity * value / 100)
+    elif type == ProductAvailabilityConfigurationType.BLOCK:
+        return 0
+    elif type == ProductAvailabilityConfigurationType.NO_LIMIT:
+        return ProductAvailabilityConfiguration.NO_LIMIT_MAX_CAPACITY
+    else:
+        raise ValueError(f"Invalid product availability configuration type: {type}")
+
+
 class ComputeProductAvailabilityService(BaseService):
     def __init__(self, product: Product, product_availability_configuration: ProductAvailabilityConfiguration):
         self.product = product
@@ -34,7 +56,11 @@ class ComputeProductAvailabilityService(BaseService):
         )
 
     def perform_percentage_quantity(self) -> ComputedProductAvailability:
-        max_capacity = max(round(self.product.max_quantity * self.product_availability_configuration.value / 100))
+        max_capacity = compute_max_capacity(
+            self.product_availability_configuration.type,
+            self.product_availability_configuration.value,
+            self.product.max_quantity,
+        )
         
         return ComputedProductAvailability(
             product=self.product,
@@ -1,17 +1,21 @@
 from datetime import date, timedelta
-from typing import Any, Optional
-
-from django.core.cache import cache
 
 from app.base.service import BaseService
 
-from app.core.utils.logger import logger
 from app.product.models import ProductAvailabilityConfiguration, Product
-from app.product.services.product_availability.compute_product_availability_service import ComputeProductAvailabilityService
-from app.product.schemas import ComputedProductAvailability
+from app.product.services.product_availability.compute_product_availability_service import compute_max_capacity
+from app.product.services.product_availability.booked_quantity_helpers import list_booked_quantities
+from app.product.schemas import ComputedProductAvailability, ProductAvailabilityConfigurationItem
 
 
 class PrecomputeProductAvailabilityService(BaseService):
+    """
+    Compute the effective availability of products for every day of a time range.
+
+    The configurations of the whole range are loaded in one query and reduced in a single pass into a
+    (product, day) indexed table holding the configuration with the lowest capacity of each cell.
+    Booked quantities come from the maintained ProductBookedQuantity counters, read with one more query.
+    """
     CACHE_KEY_PREFIX = "computed_product_availability:by_day"
     CACHE_TTL = 60 * 60 * 24
 
@@ -21,8 +25,9 @@ class PrecomputeProductAvailabilityService(BaseService):
         self.end_date = end_date
     
     def perform(self) -> dict[date, list[ComputedProductAvailability]]:
-        self.availability_configuration_mapper = self.group_product_availabilities()
         self.products = self.group_products()
+        self.optimal_availability_configurations = self.select_optimal_availability_configurations()
+        self.booked_quantities = list_booked_quantities(self.products.keys(), self.start_date, self.end_date)
 
         return self.compute_time_range()
                 
@@ -38,57 +43,59 @@ class PrecomputeProductAvailabilityService(BaseService):
                 
     def compute_a_day(self, day: date) -> list[ComputedProductAvailability]:
         result = []
-        
-        availability_configurations = self.availability_configuration_mapper.get(day, [])
-
-        for product in self.products:
-            optimal_availability_configuration = self.select_optimal_availability_configuration(product, availability_configurations)
-            if optimal_availability_configuration:
-                computed_product_availability = ComputeProductAvailabilityService(
-                    product=product,
-                    product_availability_configuration=optimal_availability_configuration,
-                ).perform()
-                result.append(computed_product_availability)
+
+        for product in self.products.values():
+            optimal_availability_configuration = self.optimal_availability_configurations.get((product.id, day))
+            if not optimal_availability_configuration:
+                continue
+
+            availability_configuration, max_capacity = optimal_availability_configuration
+            booking_count = self.booked_quantities.get((product.id, day), 0)
+            result.append(ComputedProductAvailability(
+                product=product,
+                availability_configuration=availability_configuration,
+                max_capacity=max_capacity,
+                booking_count=booking_count,
+                remaining_capacity=max(max_capacity - booking_count, 0),
+            ))
         
         return result
 
-    def group_product_availabilities(self) -> dict[date, list[ProductAvailabilityConfiguration]]:
-        product_availabilities = ProductAvailabilityConfiguration.objects.filter(
-            product_id__in=self.product_ids,
+    def group_products(self) -> dict[int, Product]:
+        return {
+            product.id: product
+            for product in Product.objects.filter(id__in=self.product_ids)
+        }
+
+    def select_optimal_availability_configurations(self) -> dict[tuple[int, date], tuple[ProductAvailabilityConfigurationItem, int]]:
+        """
+        Index the availability configurations by (product_id, day), keeping the one with the lowest capacity
+        Output:
+            {(<product_id>, <day>): (ProductAvailabilityConfigurationItem, <max_capacity>)}
+        """
+        availability_configurations = ProductAvailabilityConfiguration.objects.filter(
+            product_id__in=self.products.keys(),
             day__gte=self.start_date,
             day__lte=self.end_date,
-        ).all()
-
-        result = {
-            day: []
-            for day in product_availabilities.values_list('day', flat=True).distinct()
+            is_deleted=False,
+        ).order_by('id').values_list('id', 'product_id', 'day', 'type', 'value')
+
+        max_quantities = {product_id: product.max_quantity for product_id, product in self.products.items()}
+
+        # reduce raw rows first, only the selected configuration of each cell is turned into an object
+        selected_rows = {}
+        for row in availability_configurations:
+            id, product_id, day, type, value = row
+            max_capacity = compute_max_capacity(type, value, max_quantities[product_id])
+
+            current = selected_rows.get((product_id, day))
+            if current is None or max_capacity <= current[1]:
+                selected_rows[(product_id, day)] = (row, max_capacity)
+
+        return {
+            cell: (
+                ProductAvailabilityConfigurationItem(id=id, product_id=product_id, day=day, type=type, value=value),
+                max_capacity,
+            )
+            for cell, ((id, product_id, day, type, value), max_capacity) in selected_rows.items()
         }
-        for product_availability in product_availabilities:
-            result[product_availability.day].append(product_availability)
-
-        return result
-
-    def group_products(self) -> list[Product]:
-        return Product.objects.filter(id__in=self.product_ids).all()
-
-    def select_optimal_availability_configuration(self, product: Product, availabilitity_configurations: list[ProductAvailabilityConfiguration]) -> Optional[ProductAvailabilityConfiguration]:
-        max_capacity = ProductAvailabilityConfiguration.NO_LIMIT_MAX_CAPACITY
-        effective_product_availability_configuration = None
-        
-        for configuration in availabilitity_configurations:
-            logger.info(f"Selecting optimal availability configuration for product: {product.id}")
-            logger.info(f"Configuration: {configuration.id}")
-            logger.info(f"Configuration product ids: {configuration.product_id}")
-            if product.id != configuration.product_id:
-                continue
-
-            computed_product_availability = ComputeProductAvailabilityService(
-                product=product,
-                product_availability_configuration=configuration,
-            ).perform()
-
-            if computed_product_availability.max_capacity <= max_capacity:
-                effective_product_availability_configuration = configuration
-                max_capacity = computed_product_availability.max_capacity
-        
-        return effective_product_availability_configuration
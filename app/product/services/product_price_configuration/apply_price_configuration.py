@@ -8,16 +8,17 @@ from app.product.models.price_configuration import (
 from app.product.schemas import AppliedProductPrice
 
 
-def apply_price_configuration(product: Product, price_configuration: ProductPriceConfiguration) -> AppliedProductPrice:
+def apply_price_configuration(product: Product, price_configuration: ProductPriceConfiguration, at: datetime = None) -> AppliedProductPrice:
     """
     This function will apply the price configuration to the product
     Input:
         product_id: int
         price_configuration_id: int
+        at: datetime, now by default
     Output:
         AppliedProductPrice
     """
-    if not price_configuration.is_time_range_valid():
+    if not price_configuration.is_time_range_valid(at):
         raise Exception("Price configuration time range is not valid")
     
     if price_configuration.adjustment_type == PriceAdjustmentType.PERCENTAGE:
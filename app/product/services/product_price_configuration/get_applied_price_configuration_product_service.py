@@ -4,50 +4,64 @@ from app.base.service import BaseService
 
 from app.product.schemas import AppliedProductPrice
 from app.product.services.product_price_configuration.precompute_product_price_service import (
-    PRECOMPUTE_PRODUCT_PRICE_CACHE_KEY,
+    NO_APPLIED_PRODUCT_PRICE,
     PrecomputeProductPriceService,
+    get_applied_product_price_cache_key,
+)
+from app.product.services.product_price_configuration.price_recompute_debouncer import (
+    PRICE_RECOMPUTE,
+    schedule_price_recompute,
 )
 
 
 class GetAppliedPriceConfigurationProductService(BaseService):
-    def __init__(self, product_id: int = None, product_ids: list[int] = None):
-        self.product_id = product_id
+    """
+    Read the applied prices from the cache, the prices missing from it are recomputed in background.
+    Until then they are None, or computed for this read only with compute_missing
+    """
+    def __init__(self, product_ids: list[int], compute_missing: bool = False):
         self.product_ids = product_ids or []
+        self.compute_missing = compute_missing
 
-        if not self.product_id and not self.product_ids:
-            raise ValueError("Either product_id or product_ids must be provided")
-        
-    def perform(self) -> AppliedProductPrice:
-        if self.product_ids:
-            return self.perform_multiple()
-        else:
-            return self.perform_single()
+        if not self.product_ids:
+            raise ValueError("product_ids must be provided")
 
-    def perform_single(self) -> AppliedProductPrice:
-        applied_product_prices = self.get_cached_applied_product_prices()
+    def perform(self) -> dict[str, AppliedProductPrice]:
+        return self.get_applied_product_prices(self.product_ids)
 
-        if not applied_product_prices or not applied_product_prices.get(str(self.product_id), None):
-            applied_product_prices = PrecomputeProductPriceService(product_ids=[self.product_id]).perform()
-            
-        applied_product_price = applied_product_prices.get(str(self.product_id), None)
+    def get_applied_product_prices(self, product_ids: list[int]) -> dict[str, AppliedProductPrice]:
+        cached_applied_product_prices = self.get_cached_applied_product_prices(product_ids)
 
-        if not applied_product_price:
-            raise Exception("Applied product price not found")
+        missing_product_ids = [
+            product_id for product_id in product_ids
+            if str(product_id) not in cached_applied_product_prices
+        ]
+        if missing_product_ids:
+            # a read does not write: the debounced recompute fills the cache for the next reads
+            schedule_price_recompute({PRICE_RECOMPUTE: missing_product_ids})
 
-        return applied_product_price
-    
-    def perform_multiple(self) -> dict[str, AppliedProductPrice]:
-        applied_product_prices = self.get_cached_applied_product_prices()
+            if self.compute_missing:
+                computed_applied_product_prices = PrecomputeProductPriceService(product_ids=missing_product_ids).compute()
+                cached_applied_product_prices.update({
+                    str(product_id): computed_applied_product_prices.get(str(product_id)) or NO_APPLIED_PRODUCT_PRICE
+                    for product_id in missing_product_ids
+                })
 
-        for product_id in self.product_ids:
-            if str(product_id) not in applied_product_prices.keys():
-                applied_product_prices = PrecomputeProductPriceService(product_ids=self.product_ids).perform()
-                break
+        applied_product_prices = {}
+        for product_id in product_ids:
+            applied_product_price = cached_applied_product_prices.get(str(product_id))
+            applied_product_prices[str(product_id)] = None if applied_product_price == NO_APPLIED_PRODUCT_PRICE else applied_product_price
 
-        return {
-            str(product_id): applied_product_prices.get(str(product_id), None)
-            for product_id in self.product_ids
+        return applied_product_prices
+
+    def get_cached_applied_product_prices(self, product_ids: list[int]) -> dict[str, AppliedProductPrice]:
+        cache_keys = {
+            get_applied_product_price_cache_key(product_id): str(product_id)
+            for product_id in product_ids
         }
+        cached_applied_product_prices = cache.get_many(cache_keys.keys())
 
-    def get_cached_applied_product_prices(self) -> dict[str, AppliedProductPrice]:
-        return cache.get(f"{PRECOMPUTE_PRODUCT_PRICE_CACHE_KEY}") or {}
+        return {
+            cache_keys[cache_key]: applied_product_price
+            for cache_key, applied_product_price in cached_applied_product_prices.items()
+        }
@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+from app.base.service import BaseService
+
+from app.product.models import Product
+from app.product.schemas import ProductPriceCalendar
+from app.product.services.product_price_configuration.precompute_product_price_calendar_service import get_product_price_calendar_cache_key
+from app.product.services.product_price_configuration.price_recompute_debouncer import (
+    CALENDAR_RECOMPUTE,
+    schedule_price_recompute,
+)
+
+
+class GetProductPriceCalendarService(BaseService):
+    """
+    Read the price calendars from the cache only. The products whose calendar is missing or does not cover
+    the dates are left out of the result and recomputed in background, the unknown products are ignored.
+    """
+    def __init__(self, product_ids: list[int], start_date: date, end_date: date):
+        self.product_ids = product_ids
+        self.start_date = start_date
+        self.end_date = end_date
+
+        if self.start_date > self.end_date:
+            raise ValueError("start_date must be before end_date")
+
+    def perform(self) -> dict[str, list[dict]]:
+        product_price_calendars = self.get_product_price_calendars()
+
+        return {
+            product_id: self.slice(product_price_calendar)
+            for product_id, product_price_calendar in product_price_calendars.items()
+        }
+
+    def get_product_price_calendars(self) -> dict[str, ProductPriceCalendar]:
+        cache_keys = {
+            get_product_price_calendar_cache_key(product_id): str(product_id)
+            for product_id in self.product_ids
+        }
+        product_price_calendars = {
+            cache_keys[cache_key]: product_price_calendar
+            for cache_key, product_price_calendar in cache.get_many(cache_keys.keys()).items()
+            if product_price_calendar.covers(self.start_date, self.end_date)
+        }
+
+        missing_product_ids = [
+            product_id for product_id in self.product_ids
+            if str(product_id) not in product_price_calendars
+        ]
+        if missing_product_ids:
+            # only the live products are recomputed, a request can not schedule work for made up ids
+            missing_product_ids = list(
+                Product.objects.filter(id__in=missing_product_ids, is_deleted=False).values_list('id', flat=True)
+            )
+        if missing_product_ids:
+            schedule_price_recompute({CALENDAR_RECOMPUTE: missing_product_ids})
+
+        return product_price_calendars
+
+    def slice(self, product_price_calendar: ProductPriceCalendar) -> list[dict]:
+        start_index = product_price_calendar.get_index(self.start_date)
+        end_index = product_price_calendar.get_index(self.end_date)
+        if start_index is None or end_index is None:
+            return []
+
+        return [
+            {
+                'date': product_price_calendar.start_date + timedelta(days=index),
+                'price_configuration_id': product_price_calendar.price_configuration_ids[index] or None,
+                'price_vnd': product_price_calendar.prices_vnd[index],
+                'price_usd': product_price_calendar.prices_usd[index],
+            }
+            for index in range(start_index, end_index + 1)
+        ]
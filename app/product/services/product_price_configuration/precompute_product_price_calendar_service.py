@@ -0,0 +1,165 @@
+from array import array
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from app.core.utils.logger import logger
+from app.base.service import BaseService
+
+from app.product.models import Product, ProductPriceConfiguration
+from app.product.schemas import ProductPriceCalendar
+from app.product.services.product_price_configuration.price_configuration_helpers import (
+    list_price_configurations_by_products,
+    prune_price_configurations,
+    select_optimal_price_configuration,
+)
+
+
+PRODUCT_PRICE_CALENDAR_CACHE_KEY = "product_price_calendar"
+PRODUCT_PRICE_CALENDAR_HORIZON_DAYS = 365
+# the products of a calendar request, one cache key each
+PRODUCT_PRICE_CALENDAR_MAX_PRODUCTS = 50
+CACHE_TIMEOUT = 60 * 60 * 24 * 2
+
+
+def get_product_price_calendar_cache_key(product_id: int) -> str:
+    return f"{PRODUCT_PRICE_CALENDAR_CACHE_KEY}:{product_id}"
+
+
+class PrecomputeProductPriceCalendarService(BaseService):
+    """
+    Expand the price configuration rules into a per product, per day price table.
+
+    Every price configuration is evaluated once per day of the horizon. Days on which the same set of
+    configurations is valid share a single price resolution per product, so the work grows with the number
+    of distinct rule combinations rather than with the number of days.
+    """
+    def __init__(self, product_ids: list[int] = None, start_date: date = None, number_of_days: int = PRODUCT_PRICE_CALENDAR_HORIZON_DAYS):
+        self.product_ids = product_ids or []
+        self.start_date = start_date or timezone.localdate()
+        self.number_of_days = number_of_days
+
+    def perform(self) -> dict[str, ProductPriceCalendar]:
+        self.products = self.get_products()
+        logger.info(f"Found {len(self.products)} products to precompute price calendar")
+
+        self.all_price_configurations = list_price_configurations_by_products(self.products)
+        self.day_groups = self.group_days_by_valid_price_configurations()
+
+        product_price_calendars = self.compute_product_price_calendars()
+
+        self.store_cache(product_price_calendars)
+        logger.info(f"Precomputed price calendar for {len(product_price_calendars)} products successfully")
+
+        return product_price_calendars
+
+    def get_products(self) -> list[Product]:
+        query = Product.objects.filter(is_deleted=False)
+
+        if self.product_ids:
+            query = query.filter(id__in=self.product_ids)
+
+        return query
+
+    def get_day_datetime(self, index: int) -> datetime:
+        day = self.start_date + timedelta(days=index)
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def group_days_by_valid_price_configurations(self) -> dict[frozenset[int], list[int]]:
+        """
+        Group the day indexes of the horizon by the set of price configurations valid on that day
+        Output:
+            {frozenset(<price_configuration_id>): [<day_index>, ...]}
+        """
+        price_configurations = {
+            price_configuration.id: price_configuration
+            for price_configurations in self.all_price_configurations.values()
+            for price_configuration in price_configurations
+        }
+
+        result = defaultdict(list)
+        for index in range(self.number_of_days):
+            at = self.get_day_datetime(index)
+            valid_price_configuration_ids = frozenset(
+                price_configuration_id
+                for price_configuration_id, price_configuration in price_configurations.items()
+                if self._is_time_range_valid(price_configuration, at)
+            )
+            result[valid_price_configuration_ids].append(index)
+
+        return result
+
+    def compute_product_price_calendars(self) -> dict[str, ProductPriceCalendar]:
+        # global configurations only depend on the day group, prune them once per group
+        global_price_configurations_by_group = {
+            valid_price_configuration_ids: prune_price_configurations(
+                [
+                    price_configuration for price_configuration in self.all_price_configurations['all']
+                    if price_configuration.id in valid_price_configuration_ids
+                ],
+                at=self.get_day_datetime(day_indexes[0]),
+            )
+            for valid_price_configuration_ids, day_indexes in self.day_groups.items()
+        }
+
+        result = {}
+        for product in self.products:
+            base_price_vnd = float(product.base_price_vnd)
+            base_price_usd = float(product.base_price_usd)
+
+            product_price_calendar = ProductPriceCalendar(
+                product_id=product.id,
+                start_date=self.start_date,
+                base_price_vnd=base_price_vnd,
+                base_price_usd=base_price_usd,
+                price_configuration_ids=array('q', [0]) * self.number_of_days,
+                prices_vnd=array('d', [base_price_vnd]) * self.number_of_days,
+                prices_usd=array('d', [base_price_usd]) * self.number_of_days,
+            )
+
+            product_price_configurations = self.all_price_configurations.get(str(product.id), [])
+
+            for valid_price_configuration_ids, day_indexes in self.day_groups.items():
+                potential_price_configurations = [
+                    price_configuration for price_configuration in product_price_configurations
+                    if price_configuration.id in valid_price_configuration_ids
+                ] + global_price_configurations_by_group[valid_price_configuration_ids]
+
+                if not potential_price_configurations:
+                    continue
+
+                applied_product_price = select_optimal_price_configuration(
+                    product,
+                    potential_price_configurations,
+                    at=self.get_day_datetime(day_indexes[0]),
+                )
+                if not applied_product_price:
+                    continue
+
+                for index in day_indexes:
+                    product_price_calendar.price_configuration_ids[index] = applied_product_price.price_configuration_id
+                    product_price_calendar.prices_vnd[index] = applied_product_price.price_vnd
+                    product_price_calendar.prices_usd[index] = applied_product_price.price_usd
+
+            result[str(product.id)] = product_price_calendar
+
+        return result
+
+    def store_cache(self, product_price_calendars: dict[str, ProductPriceCalendar]) -> None:
+        cache.set_many(
+            {
+                get_product_price_calendar_cache_key(product_id): product_price_calendar
+                for product_id, product_price_calendar in product_price_calendars.items()
+            },
+            timeout=CACHE_TIMEOUT,
+        )
+
+    @staticmethod
+    def _is_time_range_valid(price_configuration: ProductPriceConfiguration, at: datetime) -> bool:
+        try:
+            return bool(price_configuration.is_time_range_valid(at))
+        except Exception as e:
+            logger.error(f"Error verifying time range of price configuration {price_configuration.id}: {e}")
+            return False
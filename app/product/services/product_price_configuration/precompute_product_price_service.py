@@ -1,35 +1,56 @@
 from django.core.cache import cache
+from django.utils import timezone
 
 from app.core.utils.logger import logger
 from app.base.service import BaseService
 
-from app.product.models import Product
+from app.product.models import Product, ProductEffectivePrice
 from app.product.schemas import AppliedProductPrice
+from app.product.services.product_render.precompute_product_render_service import PrecomputeProductRenderService
 from app.product.services.product_price_configuration.price_configuration_helpers import (
     list_price_configurations_by_products,
+    prune_price_configurations,
     select_optimal_price_configuration,
 )
 
 
 PRECOMPUTE_PRODUCT_PRICE_CACHE_KEY = "precompute_product_price"
 CACHE_TIMEOUT = 60 * 60 * 24
+# cached for the products without an applicable configuration, a lookup of them is a hit and not a miss
+NO_APPLIED_PRODUCT_PRICE = "none"
+
+
+def get_applied_product_price_cache_key(product_id: int) -> str:
+    return f"{PRECOMPUTE_PRODUCT_PRICE_CACHE_KEY}:{product_id}"
+
 
 class PrecomputeProductPriceService(BaseService):
     def __init__(self, product_ids: list[int] = None):
         self.product_ids = product_ids or []
 
     def perform(self) -> dict[str, AppliedProductPrice]:
+        new_applied_product_prices = self.compute()
+
+        self.store_effective_prices(new_applied_product_prices)
+        self.store_cache(new_applied_product_prices)
+        # the rendered products embed the applied price, rendering them also invalidates the cached responses
+        PrecomputeProductRenderService(product_ids=self.product_ids).perform()
+        logger.info(f"Precomputed product price for {len(new_applied_product_prices)} products successfully")
+        
+        return new_applied_product_prices
+
+    def compute(self) -> dict[str, AppliedProductPrice]:
+        """
+        This function will compute the applied prices without storing them
+        Output: {<product id>: AppliedProductPrice, None without an applicable configuration}
+        """
         self.products = self.get_products()
         logger.info(f"Found {len(self.products)} products to precompute price")
 
         self.all_price_configurations = list_price_configurations_by_products(self.products)
-        
-        new_applied_product_prices = self.get_applicable_price_configurations()
+        self.all_price_configurations['all'] = prune_price_configurations(self.all_price_configurations['all'])
 
-        self.store_cache(new_applied_product_prices)
-        logger.info(f"Precomputed product price for {len(new_applied_product_prices)} products successfully")
-        
-        return self.applied_product_prices
+        return self.get_applicable_price_configurations()
 
     def get_products(self) -> list[Product]:
         query = Product.objects.filter(is_deleted=False)
@@ -40,9 +61,7 @@ class PrecomputeProductPriceService(BaseService):
         return query
 
     def get_applicable_price_configurations(self) -> dict[str, AppliedProductPrice]:
-        applied_product_prices = {
-            str(product.id): None for product in self.products
-        }
+        applied_product_prices = {}
 
         for product in self.products:
             potential_price_configurations = self.all_price_configurations.get(str(product.id), []) + self.all_price_configurations.get('all', [])
@@ -53,15 +72,37 @@ class PrecomputeProductPriceService(BaseService):
             
         return applied_product_prices
 
-    def store_cache(self, new_applied_product_prices: dict[str, AppliedProductPrice]) -> None:
-        self.applied_product_prices = self.get_cached_applied_product_prices()
-        self.applied_product_prices.update(new_applied_product_prices)
-
-        cache.set(
-            f"{PRECOMPUTE_PRODUCT_PRICE_CACHE_KEY}",
-            self.applied_product_prices,
-            timeout=CACHE_TIMEOUT,
+    def store_effective_prices(self, new_applied_product_prices: dict[str, AppliedProductPrice]) -> None:
+        # upserted in batches, the catalogue filters and sorts on these rows
+        now = timezone.now()
+        effective_prices = []
+        for product in self.products:
+            applied_product_price = new_applied_product_prices.get(str(product.id))
+            effective_prices.append(ProductEffectivePrice(
+                product_id=product.id,
+                price_configuration_id=applied_product_price.price_configuration_id if applied_product_price else None,
+                price_vnd=applied_product_price.price_vnd if applied_product_price else product.base_price_vnd,
+                price_usd=applied_product_price.price_usd if applied_product_price else product.base_price_usd,
+                updated_at=now,
+            ))
+
+        ProductEffectivePrice.objects.bulk_create(
+            effective_prices,
+            batch_size=1_000,
+            update_conflicts=True,
+            unique_fields=['product'],
+            update_fields=['price_configuration', 'price_vnd', 'price_usd', 'updated_at'],
         )
 
-    def get_cached_applied_product_prices(self) -> dict[str, AppliedProductPrice]:
-        return cache.get(f"{PRECOMPUTE_PRODUCT_PRICE_CACHE_KEY}") or {}
+    def store_cache(self, new_applied_product_prices: dict[str, AppliedProductPrice]) -> None:
+        # one key per product, written in a single pipeline: no read-modify-write of a shared blob
+        # the requested products that are deleted or do not exist have no applicable configuration either
+        cached_applied_product_prices = {
+            get_applied_product_price_cache_key(product_id): NO_APPLIED_PRODUCT_PRICE
+            for product_id in self.product_ids
+        }
+        cached_applied_product_prices.update({
+            get_applied_product_price_cache_key(product_id): applied_product_price or NO_APPLIED_PRODUCT_PRICE
+            for product_id, applied_product_price in new_applied_product_prices.items()
+        })
+        cache.set_many(cached_applied_product_prices, timeout=CACHE_TIMEOUT)
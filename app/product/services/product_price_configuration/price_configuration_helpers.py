@@ -1,6 +1,9 @@
+from collections import defaultdict
+from datetime import datetime
+
 from app.core.utils.logger import logger
 
-from app.product.models import ProductPriceConfiguration, Product
+from app.product.models import ProductPriceConfiguration, Product, PriceAdjustmentType
 from app.product.services.product_price_configuration.apply_price_configuration import apply_price_configuration
 from app.product.schemas import AppliedProductPrice
 
@@ -9,30 +12,21 @@ def get_price_configurations_by_product(product: Product) -> list[ProductPriceCo
     """
     This function will get the price configuration for a given product
     Input:
-        product_ids: list[int]
+        product: Product
     Output:
-        list[int]
+        list[ProductPriceConfiguration]
     """
-    result = []
+    price_configurations = list_price_configurations_by_products([product])
 
-    price_configurations = ProductPriceConfiguration.objects.filter(
-        is_active=True,
-    )
-    
-    for price_configuration in price_configurations:
-        if price_configuration.products.count() == 0:
-            result.append(price_configuration)
-        else:
-            if price_configuration.products.filter(id=product.id).exists():
-                result.append(price_configuration)
-                break
-
-    return result
+    return price_configurations[str(product.id)] + price_configurations['all']
 
     
 def list_price_configurations_by_products(products: list[Product]) -> dict[str, list[ProductPriceConfiguration]]:
     """
-    This function will list all price configurations that are active and not associated with any product
+    This function will list all price configurations that are active, grouped by the products they are associated with.
+    Price configurations that are not associated with any product are listed under 'all'.
+    It runs two queries whatever the number of products and price configurations:
+    one for the active price configurations and one for their product links.
     Output will be a dictionary with the following structure:
     {
         'all': [price_configuration],
@@ -40,32 +34,111 @@ def list_price_configurations_by_products(products: list[Product]) -> dict[str,
         ...
     }
     """
-    
-    price_configurations = ProductPriceConfiguration.objects.filter(
+    price_configurations = list(ProductPriceConfiguration.objects.filter(
         is_active=True,
-    )
+    ))
     
     result = {str(product.id): [] for product in products}
     result['all'] = []
 
+    product_ids_by_price_configuration = list_product_ids_by_price_configurations(price_configurations)
+
     for price_configuration in price_configurations:
-        if price_configuration.products.count() == 0:
+        product_ids = product_ids_by_price_configuration.get(price_configuration.id)
+
+        if not product_ids:
             result['all'].append(price_configuration)
-        else:
-            for product in products:
-                if price_configuration.products.filter(id=product.id).exists():
-                    result[str(product.id)].append(price_configuration)
-                    break
+            continue
+
+        for product_id in product_ids:
+            if product_id in result:
+                result[product_id].append(price_configuration)
+
+    return result
+
+
+def list_product_ids_by_price_configurations(price_configurations: list[ProductPriceConfiguration]) -> dict[int, list[str]]:
+    """
+    This function will load the product links of the given price configurations in a single query
+    Output will be a dictionary with the following structure:
+    {
+        <price_configuration_id>: ['<product_id>', ...],
+        ...
+    }
+    """
+    result = defaultdict(list)
+
+    if not price_configurations:
+        return result
+
+    links = ProductPriceConfiguration.products.through.objects.filter(
+        productpriceconfiguration_id__in=[price_configuration.id for price_configuration in price_configurations],
+    ).values_list('productpriceconfiguration_id', 'product_id')
+
+    for price_configuration_id, product_id in links:
+        result[price_configuration_id].append(str(product_id))
 
     return result
 
 
-def select_optimal_price_configuration(product: Product, price_configurations: list[ProductPriceConfiguration]) -> AppliedProductPrice:
+def prune_price_configurations(price_configurations: list[ProductPriceConfiguration], at: datetime = None) -> list[ProductPriceConfiguration]:
+    """
+    This function will drop the price configurations that can never be selected as optimal,
+    whatever the product they are applied to:
+    - a percentage adjustment is monotonic in its percentage, so only the lowest one can win
+    - a fixed adjustment is monotonic in (fixed_vnd, fixed_usd), so only the lowest one can win
+    The first configuration of each adjustment type is kept too, as it wins every tie (e.g. a zero base price).
+    Configurations that are not valid at the given moment (now by default) are dropped as well.
+    The relative order of the remaining configurations is preserved, so ties resolve as in select_optimal_price_configuration
+    Input:
+        price_configurations: list[ProductPriceConfiguration]
+        at: datetime
+    Output:
+        list[ProductPriceConfiguration]
+    """
+    first_by_adjustment_type = {}
+    best_by_adjustment_type = {}
+
+    for price_configuration in price_configurations:
+        try:
+            if not price_configuration.is_time_range_valid(at):
+                continue
+
+            if price_configuration.adjustment_type == PriceAdjustmentType.PERCENTAGE:
+                key = float(price_configuration.adjustment_value.get('percentage', 0))
+            elif price_configuration.adjustment_type == PriceAdjustmentType.FIXED:
+                key = (
+                    float(price_configuration.adjustment_value.get('fixed_vnd', 0)),
+                    float(price_configuration.adjustment_value.get('fixed_usd', 0)),
+                )
+            else:
+                continue
+        except Exception as e:
+            logger.error(f"Error pruning price configuration {price_configuration.id}: {e}")
+            continue
+
+        first_by_adjustment_type.setdefault(price_configuration.adjustment_type, price_configuration)
+
+        best = best_by_adjustment_type.get(price_configuration.adjustment_type)
+        if best is None or key < best[0]:
+            best_by_adjustment_type[price_configuration.adjustment_type] = (key, price_configuration)
+
+    remaining = {id(price_configuration) for price_configuration in first_by_adjustment_type.values()}
+    remaining.update(id(price_configuration) for _, price_configuration in best_by_adjustment_type.values())
+
+    return [
+        price_configuration for price_configuration in price_configurations
+        if id(price_configuration) in remaining
+    ]
+
+
+def select_optimal_price_configuration(product: Product, price_configurations: list[ProductPriceConfiguration], at: datetime = None) -> AppliedProductPrice:
     """
     This function will select the optimal price configuration for a given product
     Input:
         product: Product
         price_configurations: list[ProductPriceConfiguration]
+        at: datetime, now by default
     Output:
         AppliedProductPrice
     """
@@ -74,7 +147,7 @@ def select_optimal_price_configuration(product: Product, price_configurations: l
     
     for price_configuration in price_configurations:
         try:
-            applied_product_price = apply_price_configuration(product, price_configuration)
+            applied_product_price = apply_price_configuration(product, price_configuration, at)
         except Exception as e:
             logger.error(f"Error applying price configuration {price_configuration.id} to product {product.id}: {e}")
             continue
@@ -0,0 +1,172 @@
+import math
+
+from django_redis import get_redis_connection
+from redis.exceptions import LockError, RedisError
+
+from app.core.celery import celery_app
+from app.core.utils.logger import logger
+from app.product.services.product_price_configuration.precompute_product_price_service import PrecomputeProductPriceService
+from app.product.services.product_price_configuration.precompute_product_price_calendar_service import PrecomputeProductPriceCalendarService
+
+
+PRICE_RECOMPUTE_KEY = 'price_recompute'
+PRICE_RECOMPUTE = 'price'
+CALENDAR_RECOMPUTE = 'calendar'
+RECOMPUTE_KINDS = (PRICE_RECOMPUTE, CALENDAR_RECOMPUTE)
+
+# the writes made within this window are recomputed together
+PRICE_RECOMPUTE_DEBOUNCE_SECONDS = 2
+# a run whose message was lost does not prevent the next writes from scheduling one
+PRICE_RECOMPUTE_SCHEDULE_TIMEOUT = PRICE_RECOMPUTE_DEBOUNCE_SECONDS + 60
+# longer than a recompute of the whole catalogue
+PRICE_RECOMPUTE_LOCK_TIMEOUT = 60 * 15
+# the delay before the next run doubles with each failed run, up to this
+PRICE_RECOMPUTE_MAX_RETRY_DELAY = 60 * 5
+
+
+def get_dirty_products_key(kind: str) -> str:
+    return f'{PRICE_RECOMPUTE_KEY}:{kind}:dirty_products'
+
+
+def get_full_recompute_key(kind: str) -> str:
+    return f'{PRICE_RECOMPUTE_KEY}:{kind}:full'
+
+
+def get_scheduled_key() -> str:
+    return f'{PRICE_RECOMPUTE_KEY}:scheduled'
+
+
+def get_lock_key() -> str:
+    return f'{PRICE_RECOMPUTE_KEY}:lock'
+
+
+def get_lock_retry_key() -> str:
+    return f'{PRICE_RECOMPUTE_KEY}:lock_retry'
+
+
+def get_failures_key() -> str:
+    return f'{PRICE_RECOMPUTE_KEY}:failures'
+
+
+def mark_dirty_products(pipeline, product_ids_by_kind: dict[str, list[int]]) -> None:
+    for kind, product_ids in product_ids_by_kind.items():
+        if product_ids is None:
+            pipeline.set(get_full_recompute_key(kind), 1)
+        elif product_ids:
+            pipeline.sadd(get_dirty_products_key(kind), *product_ids)
+
+
+def schedule_price_recompute(product_ids_by_kind: dict[str, list[int]], delay: int = PRICE_RECOMPUTE_DEBOUNCE_SECONDS) -> None:
+    """
+    This function will mark the prices of products as dirty and schedule one delayed recompute for all the writes of the window
+    Input:
+        product_ids_by_kind: {PRICE_RECOMPUTE or CALENDAR_RECOMPUTE: product ids, None for the whole catalogue}
+        delay: int, seconds to wait for the next writes
+    """
+    try:
+        pipeline = get_redis_connection('default').pipeline()
+        mark_dirty_products(pipeline, product_ids_by_kind)
+        # only the first write of the window sends the task
+        pipeline.set(get_scheduled_key(), 1, nx=True, ex=PRICE_RECOMPUTE_SCHEDULE_TIMEOUT)
+        should_schedule = pipeline.execute()[-1]
+    except RedisError as e:
+        # the scheduled full recompute catches up
+        logger.error(f'Can not schedule the price recompute of {product_ids_by_kind}: {e}')
+        return
+
+    if should_schedule:
+        send_price_recompute(delay)
+
+
+def send_price_recompute(delay: int) -> None:
+    celery_app.send_task("recompute_dirty_product_prices_task", countdown=delay)
+
+
+def has_dirty_products(redis) -> bool:
+    return bool(redis.exists(*[
+        key
+        for kind in RECOMPUTE_KINDS
+        for key in (get_dirty_products_key(kind), get_full_recompute_key(kind))
+    ]))
+
+
+def get_retry_delay(redis) -> int:
+    failures = redis.incr(get_failures_key())
+    redis.expire(get_failures_key(), PRICE_RECOMPUTE_MAX_RETRY_DELAY * 2)
+    return min(PRICE_RECOMPUTE_DEBOUNCE_SECONDS * 2 ** failures, PRICE_RECOMPUTE_MAX_RETRY_DELAY)
+
+
+def pop_dirty_products(redis) -> dict[str, list[int]]:
+    """
+    This function will take the dirty products of every kind at once, the writes made afterwards are kept for the next run
+    Input: redis
+    Output: {PRICE_RECOMPUTE or CALENDAR_RECOMPUTE: product ids, None for the whole catalogue}, only the kinds to recompute
+    """
+    pipeline = redis.pipeline(transaction=True)
+    for kind in RECOMPUTE_KINDS:
+        pipeline.smembers(get_dirty_products_key(kind))
+        pipeline.get(get_full_recompute_key(kind))
+        pipeline.delete(get_dirty_products_key(kind), get_full_recompute_key(kind))
+    results = pipeline.execute()
+
+    product_ids_by_kind = {}
+    for index, kind in enumerate(RECOMPUTE_KINDS):
+        dirty_product_ids, full_recompute, _ = results[index * 3:index * 3 + 3]
+        if full_recompute:
+            product_ids_by_kind[kind] = None
+        elif dirty_product_ids:
+            product_ids_by_kind[kind] = sorted(int(product_id) for product_id in dirty_product_ids)
+
+    return product_ids_by_kind
+
+
+def recompute_dirty_product_prices() -> dict[str, list[int]]:
+    """
+    This function will recompute the prices and price calendars of the dirty products, one run at a time
+    Output: the recomputed product ids by kind, None for the whole catalogue
+    """
+    redis = get_redis_connection('default')
+    # the writes made from now on schedule the next run
+    redis.delete(get_scheduled_key())
+
+    lock = redis.lock(get_lock_key(), timeout=PRICE_RECOMPUTE_LOCK_TIMEOUT, blocking=False)
+    if not lock.acquire():
+        # the running recompute schedules the next run once it is done,
+        # a single retry takes over when the lock expires, if that run died
+        lock_ttl = redis.pttl(get_lock_key())
+        delay = max(math.ceil(lock_ttl / 1000), PRICE_RECOMPUTE_DEBOUNCE_SECONDS)
+        if redis.set(get_lock_retry_key(), 1, nx=True, ex=delay + PRICE_RECOMPUTE_SCHEDULE_TIMEOUT):
+            logger.info(f'A price recompute is already running, checking again in {delay}s')
+            send_price_recompute(delay)
+        return {}
+
+    # the runs losing the lock to this one send a new retry
+    redis.delete(get_lock_retry_key())
+
+    try:
+        product_ids_by_kind = pop_dirty_products(redis)
+        try:
+            if PRICE_RECOMPUTE in product_ids_by_kind:
+                PrecomputeProductPriceService(product_ids=product_ids_by_kind[PRICE_RECOMPUTE]).perform()
+            if CALENDAR_RECOMPUTE in product_ids_by_kind:
+                PrecomputeProductPriceCalendarService(product_ids=product_ids_by_kind[CALENDAR_RECOMPUTE]).perform()
+        except Exception:
+            # recomputed by a later run, backing off while the failures go on
+            pipeline = redis.pipeline()
+            mark_dirty_products(pipeline, product_ids_by_kind)
+            pipeline.execute()
+            # sent even if a run is already scheduled, that one may be waiting for the lock
+            send_price_recompute(get_retry_delay(redis))
+            raise
+
+        redis.delete(get_failures_key())
+        # the writes made during the run were not recomputed by the runs they scheduled, the lock was held
+        if has_dirty_products(redis):
+            send_price_recompute(PRICE_RECOMPUTE_DEBOUNCE_SECONDS)
+
+        return product_ids_by_kind
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            logger.warning('The price recompute took longer than its lock')
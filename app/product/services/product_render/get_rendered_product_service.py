@@ -0,0 +1,52 @@
+from django.core.cache import cache
+
+from app.base.service import BaseService
+
+from app.product.services.product_render.precompute_product_render_service import (
+    PrecomputeProductRenderService,
+    get_product_render_cache_key,
+)
+
+
+class GetRenderedProductService(BaseService):
+    """
+    Read the rendered products from the cache with one MGET, the missing ones are rendered and stored on the way
+    """
+    def __init__(self, product_id: int = None, product_ids: list[int] = None):
+        self.product_id = product_id
+        self.product_ids = product_ids or []
+
+        if not self.product_id and not self.product_ids:
+            raise ValueError("Either product_id or product_ids must be provided")
+
+    def perform(self):
+        if self.product_ids:
+            return self.perform_multiple()
+        else:
+            return self.perform_single()
+
+    def perform_single(self) -> bytes:
+        rendered_product = self.perform_multiple([self.product_id]).get(self.product_id)
+
+        if not rendered_product:
+            raise Exception("Rendered product not found")
+
+        return rendered_product
+
+    def perform_multiple(self, product_ids: list[int] = None) -> dict[int, bytes]:
+        product_ids = product_ids or self.product_ids
+        cache_keys = {get_product_render_cache_key(product_id): product_id for product_id in product_ids}
+
+        rendered_products = {
+            cache_keys[cache_key]: rendered_product
+            for cache_key, rendered_product in cache.get_many(cache_keys.keys()).items()
+        }
+
+        missing_product_ids = [product_id for product_id in product_ids if product_id not in rendered_products]
+        if missing_product_ids:
+            # rendered from the current data, the cached responses are still valid
+            rendered_products.update(
+                PrecomputeProductRenderService(product_ids=missing_product_ids, invalidate_cache=False).perform()
+            )
+
+        return rendered_products
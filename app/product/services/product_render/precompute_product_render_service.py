@@ -0,0 +1,85 @@
+from django.core.cache import cache
+
+from app.core.db_routers import read_from_primary
+from app.core.utils.logger import logger
+from app.base.cache import get_list_cache_tag, get_object_cache_tag, invalidate_cache_tags
+from app.base.renderers import ORJSONRenderer
+from app.base.service import BaseService
+
+from app.product.models import Product
+from app.product.serializers import ProductWithPriceConfigurationSerializer
+
+
+PRECOMPUTE_PRODUCT_RENDER_CACHE_KEY = "precompute_product_render"
+CACHE_TIMEOUT = 60 * 60 * 24
+BATCH_SIZE = 500
+
+
+def get_product_render_cache_key(product_id: int) -> str:
+    return f"{PRECOMPUTE_PRODUCT_RENDER_CACHE_KEY}:{product_id}"
+
+
+class PrecomputeProductRenderService(BaseService):
+    """
+    Serialize products with their applied price into JSON bytes, stored per product for the list and detail endpoints
+    """
+    def __init__(self, product_ids: list[int] = None, invalidate_cache: bool = True):
+        self.product_ids = product_ids or []
+        self.invalidate_cache = invalidate_cache
+
+    def perform(self) -> dict[int, bytes]:
+        rendered_products = {}
+        # the rendered products are cached for a day, they are not rendered from a replica
+        with read_from_primary():
+            products = self.get_products()
+
+        for start in range(0, len(products), BATCH_SIZE):
+            batch = products[start:start + BATCH_SIZE]
+            rendered_batch = self.render(batch)
+            self.store_cache(rendered_batch)
+            rendered_products.update(rendered_batch)
+
+        # the cached responses embed the rendered products
+        if self.invalidate_cache:
+            invalidate_cache_tags(
+                get_list_cache_tag('product'),
+                *[get_object_cache_tag('product', product_id) for product_id in rendered_products],
+            )
+        logger.info(f"Rendered {len(rendered_products)} products successfully")
+
+        return rendered_products
+
+    def get_products(self) -> list[Product]:
+        query = Product.objects.filter(is_deleted=False)
+
+        if self.product_ids:
+            query = query.filter(id__in=self.product_ids)
+
+        return list(ProductWithPriceConfigurationSerializer.setup_eager_loading(query).order_by('id'))
+
+    def render(self, products: list[Product]) -> dict[int, bytes]:
+        renderer = ORJSONRenderer()
+        serializer = ProductWithPriceConfigurationSerializer(products, many=True)
+
+        return {
+            product.id: renderer.render(data)
+            for product, data in zip(products, serializer.data)
+        }
+
+    def store_cache(self, rendered_products: dict[int, bytes]) -> None:
+        cache.set_many(
+            {
+                get_product_render_cache_key(product_id): rendered_product
+                for product_id, rendered_product in rendered_products.items()
+            },
+            timeout=CACHE_TIMEOUT,
+        )
+
+
+def delete_product_render_cache(product_ids: list[int]) -> None:
+    """
+    This function will drop the rendered products, they are rendered again on the next read
+    Input: product_ids
+    Output: None
+    """
+    cache.delete_many([get_product_render_cache_key(product_id) for product_id in product_ids])
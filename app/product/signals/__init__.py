@@ -1,8 +1,15 @@
-from .products import precompute_product_price_by_product
-from .price_configuration import precompute_product_price_by_price_configuration
+from .products import create_product_effective_price, precompute_product_price_by_product
+from .suppliers import precompute_product_render_by_supplier
+from .price_configuration import (
+    precompute_product_price_by_price_configuration,
+    precompute_product_price_calendar_by_price_configuration_products,
+)
 
 
 __all__ = [
+    'create_product_effective_price',
     'precompute_product_price_by_product',
     'precompute_product_price_by_price_configuration',
-]
\ No newline at end of file
+    'precompute_product_price_calendar_by_price_configuration_products',
+    'precompute_product_render_by_supplier',
+]
@@ -1,12 +1,98 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, m2m_changed
 from django.dispatch import receiver
 
-from app.core.celery import celery_app
 from app.product.models import (
     ProductPriceConfiguration,
 )
+from app.product.services.product_price_configuration.price_recompute_debouncer import (
+    CALENDAR_RECOMPUTE,
+    PRICE_RECOMPUTE,
+    schedule_price_recompute,
+)
+
+
+def list_price_configuration_product_ids(price_configuration_id: int) -> list[int]:
+    return list(
+        ProductPriceConfiguration.products.through.objects
+        .filter(productpriceconfiguration_id=price_configuration_id)
+        .values_list('product_id', flat=True)
+    )
+
+
+def has_unrestricted_price_configurations(price_configuration_ids) -> bool:
+    # a configuration without products applies to the whole catalogue
+    return ProductPriceConfiguration.objects.filter(id__in=price_configuration_ids, products__isnull=True).exists()
+
+
+def schedule_price_recompute_by_products(product_ids: list[int]) -> None:
+    # None recomputes the whole catalogue
+    transaction.on_commit(lambda: schedule_price_recompute({PRICE_RECOMPUTE: product_ids, CALENDAR_RECOMPUTE: product_ids}))
 
 
 @receiver(post_save, sender=ProductPriceConfiguration)
 def precompute_product_price_by_price_configuration(sender, instance, created, **kwargs):
-    celery_app.send_task("precompute_product_price_task")
+    # the products are set after the save, they are read once the whole change is committed
+    previous_product_ids = [] if created else list_price_configuration_product_ids(instance.id)
+    was_unrestricted = not created and not previous_product_ids
+    # a configuration created with its products never applied to the whole catalogue
+    instance._is_created = created
+
+    def schedule():
+        instance._is_created = False
+        product_ids = list_price_configuration_product_ids(instance.id)
+        # only a configuration without products, before or after the change, affects the whole catalogue
+        if was_unrestricted or not product_ids:
+            product_ids = None
+        else:
+            product_ids = sorted(set(product_ids) | set(previous_product_ids))
+        schedule_price_recompute({PRICE_RECOMPUTE: product_ids, CALENDAR_RECOMPUTE: product_ids})
+
+    transaction.on_commit(schedule)
+
+
+@receiver(m2m_changed, sender=ProductPriceConfiguration.products.through)
+def precompute_product_price_calendar_by_price_configuration_products(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_add':
+        # a configuration restricted to its first products no longer applies to the whole catalogue
+        if not reverse and getattr(instance, '_is_created', False):
+            instance._had_unrestricted_price_configurations = False
+        else:
+            price_configuration_ids = pk_set if reverse else [instance.id]
+            instance._had_unrestricted_price_configurations = has_unrestricted_price_configurations(price_configuration_ids or [])
+        return
+
+    if action == 'pre_clear':
+        # the cleared products are no longer known after the clear
+        if reverse:
+            instance._cleared_price_configuration_ids = list(instance.price_configs.values_list('id', flat=True))
+            instance._cleared_product_ids = [instance.id]
+        else:
+            instance._cleared_price_configuration_ids = [instance.id]
+            instance._cleared_product_ids = list(instance.products.values_list('id', flat=True))
+        return
+
+    if action not in ['post_add', 'post_remove', 'post_clear']:
+        return
+
+    if action == 'post_clear':
+        price_configuration_ids = getattr(instance, '_cleared_price_configuration_ids', [])
+        product_ids = getattr(instance, '_cleared_product_ids', [])
+    elif reverse:
+        price_configuration_ids = list(pk_set or [])
+        product_ids = [instance.id]
+    else:
+        price_configuration_ids = [instance.id]
+        product_ids = list(pk_set or [])
+
+    if not product_ids:
+        return
+
+    if action == 'post_add':
+        applies_to_whole_catalogue = getattr(instance, '_had_unrestricted_price_configurations', False)
+    else:
+        # a configuration left without products now applies to the whole catalogue
+        applies_to_whole_catalogue = has_unrestricted_price_configurations(price_configuration_ids)
+
+    # the configurations of the products changed, so did their applied price
+    schedule_price_recompute_by_products(None if applies_to_whole_catalogue else product_ids)
@@ -1,15 +1,41 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from app.core.celery import celery_app
 from app.product.models import (
     Product,
+    ProductEffectivePrice,
 )
+from app.product.services.product_price_configuration.price_recompute_debouncer import (
+    CALENDAR_RECOMPUTE,
+    PRICE_RECOMPUTE,
+    schedule_price_recompute,
+)
+from app.product.services.product_render.precompute_product_render_service import delete_product_render_cache
 
 
 @receiver(post_save, sender=Product)
-def precompute_product_price_by_product(sender, instance, created, **kwargs):
-    celery_app.send_task(
-        "precompute_product_price_by_product_task",
-        kwargs={"product_id": instance.id},
+def create_product_effective_price(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    # the base price until the price recompute applies the price configurations,
+    # a product without this row would not match any price filter
+    ProductEffectivePrice.objects.get_or_create(
+        product=instance,
+        defaults={'price_vnd': instance.base_price_vnd, 'price_usd': instance.base_price_usd},
     )
+
+
+@receiver(post_save, sender=Product)
+def precompute_product_price_by_product(sender, instance, created, **kwargs):
+    product_ids = [instance.id]
+
+    def recompute_product_price():
+        # rendered again on the next read until the price recompute renders it with its new price
+        delete_product_render_cache(product_ids)
+        # a deleted product is not listed nor priced anymore
+        if not instance.is_deleted:
+            schedule_price_recompute({PRICE_RECOMPUTE: product_ids, CALENDAR_RECOMPUTE: product_ids})
+
+    transaction.on_commit(recompute_product_price)
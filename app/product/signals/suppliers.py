@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from app.core.celery import celery_app
+from app.product.models import Product
+from app.product.services.product_render.precompute_product_render_service import delete_product_render_cache
+from app.supplier.models import Supplier
+
+
+@receiver(post_save, sender=Supplier)
+def precompute_product_render_by_supplier(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    # the rendered products embed the supplier name
+    product_ids = list(Product.objects.filter(supplier=instance, is_deleted=False).values_list('id', flat=True))
+    if not product_ids:
+        return
+
+    def render_products():
+        delete_product_render_cache(product_ids)
+        celery_app.send_task(
+            "precompute_product_render_task",
+            kwargs={"product_ids": product_ids},
+        )
+
+    transaction.on_commit(render_products)
@@ -2,18 +2,49 @@ from datetime import datetime
 from app.core.celery import celery_app
 from app.core.utils.logger import logger
 from app.product.services.product_availability.precompute_product_availability_service import PrecomputeProductAvailabilityService
-from app.product.services.product_price_configuration.precompute_product_price_service import PrecomputeProductPriceService
+from app.product.services.product_price_configuration.price_recompute_debouncer import (
+    CALENDAR_RECOMPUTE,
+    PRICE_RECOMPUTE,
+    recompute_dirty_product_prices,
+    schedule_price_recompute,
+)
+from app.product.services.product_render.precompute_product_render_service import PrecomputeProductRenderService
 
 
 @celery_app.task(name="precompute_product_price_task")
 def precompute_product_price_task():
-    logger.info("Precomputing product price")
-    PrecomputeProductPriceService().perform()
-    logger.info("Precomputing product price completed")
+    # through the debouncer, the recomputes run one at a time under its lock
+    logger.info("Scheduling the product price recompute")
+    schedule_price_recompute({PRICE_RECOMPUTE: None})
     
 
 @celery_app.task(name="precompute_product_price_by_product_task")
 def precompute_product_price_by_product_task(product_id: int):
-    logger.info("Precomputing product price")
-    PrecomputeProductPriceService(product_ids=[product_id]).perform()
-    logger.info("Precomputing product price completed")
+    logger.info(f"Scheduling the product price recompute for product: {product_id}")
+    schedule_price_recompute({PRICE_RECOMPUTE: [product_id]})
+
+
+@celery_app.task(name="precompute_product_price_calendar_task")
+def precompute_product_price_calendar_task():
+    logger.info("Scheduling the product price calendar recompute")
+    schedule_price_recompute({CALENDAR_RECOMPUTE: None})
+
+
+@celery_app.task(name="precompute_product_price_calendar_by_products_task")
+def precompute_product_price_calendar_by_products_task(product_ids: list[int]):
+    logger.info(f"Scheduling the product price calendar recompute for products: {product_ids}")
+    schedule_price_recompute({CALENDAR_RECOMPUTE: product_ids})
+
+
+@celery_app.task(name="precompute_product_render_task")
+def precompute_product_render_task(product_ids: list[int] = None):
+    logger.info(f"Rendering products: {product_ids or 'all'}")
+    PrecomputeProductRenderService(product_ids=product_ids).perform()
+    logger.info("Rendering products completed")
+
+
+@celery_app.task(name="recompute_dirty_product_prices_task")
+def recompute_dirty_product_prices_task():
+    logger.info("Recomputing the prices of the dirty products")
+    product_ids_by_kind = recompute_dirty_product_prices()
+    logger.info(f"Recomputing the prices of the dirty products completed: {product_ids_by_kind}")
@@ -22,6 +22,7 @@ urlpatterns = [
 
     path('product/unit', apis.ProductUnitAPIView.as_view(), name='product-units'),
     path('price_configuration/preview', apis.ProductPricePreviewAPIView.as_view(), name='price-configuration-preview'),
+    path('price_configuration/calendar', apis.ProductPriceCalendarAPIView.as_view(), name='price-configuration-calendar'),
 
     path('product/', include(product_router.urls)),
 
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('supplier', '0006_alter_supplier_contact_email_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at'], name='supplier_active_created_idx'),
+        ),
+    ]
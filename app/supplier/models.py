@@ -27,6 +27,11 @@ class Supplier(BaseModel, SoftDeleteMixin):
     logo_url = models.URLField(null=True, blank=True)
     nationality = models.CharField(max_length=128, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='supplier_active_created_idx', condition=models.Q(is_deleted=False)),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -1,11 +1,8 @@
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
-from django.core.cache import cache
-
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
+from app.base.cache import cache_response, get_list_cache_tag, get_object_cache_tag, invalidate_cache_tags
 from app.base.pagination import CustomPagination
 from app.base.mixins import SoftDeleteViewSetMixin
 from app.core.utils.logger import logger
@@ -14,10 +11,15 @@ from app.supplier.filters import SupplierFilter
 from app.supplier.models import Supplier
 
 
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
 class SupplierModelViewSet(ModelViewSet, SoftDeleteViewSetMixin):
     queryset = Supplier.objects.filter(is_deleted=False)
     serializer_class = serializers.SupplierSerializer
     pagination_class = CustomPagination
+    # the safe requests read from a replica, see ReadReplicaMiddleware
+    use_read_replica = True
     filter_backends = [SearchFilter, OrderingFilter]
     filterset_class = SupplierFilter
     search_fields = ['name', 'contact_phone_number', 'contact_email']
@@ -31,36 +33,41 @@ class SupplierModelViewSet(ModelViewSet, SoftDeleteViewSetMixin):
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
-    @method_decorator(cache_page(60 * 60 * 24, key_prefix="supplier_list"))
+    @cache_response(CACHE_TIMEOUT, prefix="supplier_list", tags=lambda view, request, *args, **kwargs: [
+        get_list_cache_tag("supplier"),
+    ])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
     
-    @method_decorator(cache_page(60 * 60 * 24, key_prefix="supplier_retrieve"))
+    @cache_response(CACHE_TIMEOUT, prefix="supplier_retrieve", tags=lambda view, request, *args, **kwargs: [
+        get_object_cache_tag("supplier", kwargs["pk"]),
+    ])
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
     
-    def _clear_cache(self):
-        prefixes = [
-            "supplier_list",
-            "supplier_retrieve",
-        ]
-        
-        for prefix in prefixes:
-            keys = cache.keys(f"*{prefix}*")
-            cache.delete_many(keys)
-    
+    def _clear_cache(self, pk=None):
+        tags = [get_list_cache_tag("supplier")]
+        if pk is not None:
+            tags.append(get_object_cache_tag("supplier", pk))
+
+        invalidate_cache_tags(*tags)
+
     def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
         self._clear_cache()
-        return super().create(request, *args, **kwargs)
+        return response
 
     def update(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().update(request, *args, **kwargs)
+        response = super().update(request, *args, **kwargs)
+        self._clear_cache(kwargs.get("pk"))
+        return response
 
     def destroy(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().destroy(request, *args, **kwargs)
+        response = super().destroy(request, *args, **kwargs)
+        self._clear_cache(kwargs.get("pk"))
+        return response
 
     def partial_update(self, request, *args, **kwargs):
-        self._clear_cache()
-        return super().partial_update(request, *args, **kwargs)
+        response = super().partial_update(request, *args, **kwargs)
+        self._clear_cache(kwargs.get("pk"))
+        return response
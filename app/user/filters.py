@@ -0,0 +1,30 @@
+import django_filters
+
+from app.user.models import User
+
+
+class CustomerFilter(django_filters.FilterSet):
+    roles = django_filters.CharFilter(method='filter_by_roles')
+    statuses = django_filters.CharFilter(method='filter_by_statuses')
+
+    # booking aggregates, annotated by CustomerListingSerializer.setup_eager_loading
+    total_bookings_min = django_filters.NumberFilter(field_name='total_bookings', lookup_expr='gte')
+    total_bookings_max = django_filters.NumberFilter(field_name='total_bookings', lookup_expr='lte')
+    last_booking_from = django_filters.DateTimeFilter(field_name='last_booking_at', lookup_expr='gte')
+    last_booking_to = django_filters.DateTimeFilter(field_name='last_booking_at', lookup_expr='lte')
+    total_spend_vnd_min = django_filters.NumberFilter(field_name='total_spend_vnd', lookup_expr='gte')
+    total_spend_vnd_max = django_filters.NumberFilter(field_name='total_spend_vnd', lookup_expr='lte')
+    total_spend_usd_min = django_filters.NumberFilter(field_name='total_spend_usd', lookup_expr='gte')
+    total_spend_usd_max = django_filters.NumberFilter(field_name='total_spend_usd', lookup_expr='lte')
+
+    class Meta:
+        model = User
+        fields = ['roles', 'statuses']
+
+    def filter_by_roles(self, queryset, name, value):
+        roles_to_filter = value.split(',')
+        return queryset.filter(role__in=roles_to_filter)
+
+    def filter_by_statuses(self, queryset, name, value):
+        statuses_to_filter = value.split(',')
+        return queryset.filter(status__in=statuses_to_filter)
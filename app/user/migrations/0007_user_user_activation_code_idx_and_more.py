@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('user', '0006_alter_businessprofile_user_alter_userprofile_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('activation_code__isnull', False)), fields=['activation_code'], name='user_activation_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('role__in', ['customer', 'business'])), fields=['-id'], name='user_active_customer_idx'),
+        ),
+    ]
@@ -71,6 +71,22 @@ class User(AbstractUser, SoftDeleteMixin):
 
     objects = UserManager() 
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # the activation links look the user up by its pending code
+            models.Index(
+                fields=['activation_code'],
+                name='user_activation_code_idx',
+                condition=models.Q(activation_code__isnull=False),
+            ),
+            # the customer listing of the back office
+            models.Index(
+                fields=['-id'],
+                name='user_active_customer_idx',
+                condition=models.Q(is_deleted=False, role__in=[UserRole.CUSTOMER, UserRole.BUSINESS]),
+            ),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -1,4 +1,5 @@
 from django.contrib.auth import authenticate
+from django.db.models import Count, Max, Q, Sum
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
 
@@ -9,6 +10,8 @@ from app.user.models import (
     PhoneNumberChannels,
 )
 from app.base.serializers import FlexibleDateField
+from app.booking.models import Booking
+from app.product.models import Currency
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -204,7 +207,10 @@ class CustomerSerializer(serializers.ModelSerializer):
 
 
 class CustomerListingSerializer(serializers.ModelSerializer):
-    total_bookings = serializers.SerializerMethodField()
+    total_bookings = serializers.IntegerField(read_only=True)
+    last_booking_at = serializers.DateTimeField(read_only=True)
+    total_spend_vnd = serializers.DecimalField(max_digits=16, decimal_places=2, read_only=True)
+    total_spend_usd = serializers.DecimalField(max_digits=16, decimal_places=2, read_only=True)
     
     class Meta:
         model = User
@@ -213,5 +219,13 @@ class CustomerListingSerializer(serializers.ModelSerializer):
             'password': {'write_only': True}
         }
 
-    def get_total_bookings(self, obj):
-        return obj.booking_set.count()
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # the booking aggregates of every customer in the same grouped query as the page
+        paid_bookings = Q(booking__status__in=Booking.PAID_STATUSES)
+        return queryset.annotate(
+            total_bookings=Count('booking'),
+            last_booking_at=Max('booking__created_at'),
+            total_spend_vnd=Sum('booking__total_price', filter=paid_bookings & Q(booking__currency=Currency.VND), default=0),
+            total_spend_usd=Sum('booking__total_price', filter=paid_bookings & Q(booking__currency=Currency.USD), default=0),
+        )
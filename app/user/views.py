@@ -12,6 +12,7 @@ from app.base.mixins import SoftDeleteViewSetMixin
 from app.booking.models import Booking
 from app.booking.serializers import CustomerBookingSerializer
 from app.user import serializers
+from app.user.filters import CustomerFilter
 from app.user.models import User, UserRole
 from app.user.serializers import UserProfileSerializer
 from app.base.pagination import CustomPagination
@@ -134,14 +135,30 @@ class CustomerModelViewSet(ModelViewSet, SoftDeleteViewSetMixin):
     serializer_class = serializers.CustomerSerializer
     permission_classes = [IsInternalUser]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_class = CustomerFilter
     search_fields = ["id", "email"]
-    ordering_fields = ["id", "email", "role", "status"]
+    ordering_fields = [
+        "id",
+        "email",
+        "role",
+        "status",
+        "total_bookings",
+        "last_booking_at",
+        "total_spend_vnd",
+        "total_spend_usd",
+    ]
     ordering = ["-id"]
     
     def get_serializer_class(self):
         if self.action == 'list':
             return serializers.CustomerListingSerializer
         return serializers.CustomerSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = serializers.CustomerListingSerializer.setup_eager_loading(queryset)
+        return queryset
     
     def filter_queryset(self, queryset):
         if self.action == 'get_bookings':
@@ -152,14 +169,16 @@ class CustomerModelViewSet(ModelViewSet, SoftDeleteViewSetMixin):
     def get_bookings(self, request, *args, **kwargs):
         query_params = request.query_params
         
-        bookings_query = Booking.objects.filter(customer=self.get_object())
+        bookings_query = CustomerBookingSerializer.setup_eager_loading(
+            Booking.objects.filter(customer=self.get_object()),
+        )
 
         if query_params.get('search'):
             search_query = query_params.get('search')
             bookings_query = bookings_query.filter(code__icontains=search_query)
             
-        if query_params.get('ordering'):
-            bookings_query = bookings_query.order_by(query_params.get('ordering'))
+        # a stable order keeps the pages consistent
+        bookings_query = bookings_query.order_by(query_params.get('ordering') or '-created_at')
 
         paginator = CustomPagination()
         page = paginator.paginate_queryset(bookings_query, request)
@@ -0,0 +1,80 @@
+"""
+Compare the request latency with a new database connection per request and with persistent connections.
+
+Each thread replays what Django does around a request on a cheap endpoint: the request_started signal,
+one small query and the request_finished signal, which closes the connection unless CONN_MAX_AGE keeps it.
+The script prints the p50 and p99 latency with CONN_MAX_AGE=0 and with the configured value, the difference
+is the connection setup (TCP, TLS and authentication) saved on every request. Run it against PostgreSQL,
+the connections of SQLite cost nothing.
+
+Usage:
+    APP_ENV=<env> python scripts/benchmark_db_connections.py
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
+django.setup()
+
+from django.core import signals
+from django.db import connection, connections
+
+
+NUMBER_OF_THREADS = 8
+REQUESTS_PER_THREAD = 200
+
+
+def send_requests(latencies: list[float]) -> None:
+    # each thread opens its own connection, like the threads of a gunicorn worker
+    for _ in range(REQUESTS_PER_THREAD):
+        start_time = time.perf_counter()
+        signals.request_started.send(sender=None)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        signals.request_finished.send(sender=None)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+    connection.close()
+
+
+def run_threads(conn_max_age: int) -> list[float]:
+    # the settings are shared by the connections of every thread
+    connections.settings['default']['CONN_MAX_AGE'] = conn_max_age
+
+    latencies = []
+    threads = [
+        threading.Thread(target=send_requests, args=(latencies,))
+        for _ in range(NUMBER_OF_THREADS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return latencies
+
+
+def run():
+    configured_conn_max_age = connections.settings['default'].get('CONN_MAX_AGE') or 60
+    print(f'vendor={connection.vendor} threads={NUMBER_OF_THREADS} requests={NUMBER_OF_THREADS * REQUESTS_PER_THREAD}')
+
+    results = {}
+    for label, conn_max_age in [('new connection', 0), (f'CONN_MAX_AGE={configured_conn_max_age}', configured_conn_max_age)]:
+        percentiles = statistics.quantiles(run_threads(conn_max_age), n=100)
+        results[label] = percentiles
+        print(f'{label:<20} p50={percentiles[49]:.2f}ms p99={percentiles[98]:.2f}ms')
+
+    before, after = results.values()
+    print(f'p50 speedup={before[49] / after[49]:.1f}x p99 speedup={before[98] / after[98]:.1f}x')
+
+
+if __name__ == '__main__':
+    run()
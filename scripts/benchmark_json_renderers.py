@@ -0,0 +1,139 @@
+"""
+Compare the encode time of the DRF JSON renderer and the orjson renderer.
+
+The payloads are the ones the API sends the most: a page of the product list and a booking detail with
+its items. Both renderers must produce the same document, the script prints the median encode time of
+each and the speedup. The rows are rolled back at the end, see scripts/helpers.py.
+
+Usage:
+    APP_ENV=<env> python scripts/benchmark_json_renderers.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
+django.setup()
+
+import orjson
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from app.base.renderers import ORJSONRenderer
+from app.booking.models import Booking, BookingItem
+from app.booking.serializers import BookingItemSerializer, BookingSerializer
+from app.product.models import Product, ServiceType
+from app.product.serializers import ProductWithPriceConfigurationSerializer
+from scripts.helpers import rolled_back, seed_products
+
+
+PAGE_SIZE = 100
+NUMBER_OF_BOOKING_ITEMS = 10
+REPEAT = 200
+
+
+def seed() -> Booking:
+    run_id = uuid.uuid4().hex[:6]
+    now = timezone.now()
+    service_types = [value for value, _ in ServiceType.choices]
+
+    products = seed_products(PAGE_SIZE, prefix='benchmark_render', build=lambda index: {
+        'service_type': service_types[index % len(service_types)],
+        'base_price_vnd': 1_250_000,
+        'base_price_usd': '49.90',
+        'rating': '4.75',
+        'review_count': index,
+        'details': {'number_of_travellers': 4, 'number_of_luggage': 2, 'available_time_from': '08:00'},
+        'highlights': [f'Highlight {number} of product {index}' for number in range(5)],
+        'what_nexts': [f'Step {number}' for number in range(3)],
+        'available_locations': [
+            {'province': f'province_{number}', 'city': f'city_{number}', 'district': 'district_1', 'ward': 'ward_1'}
+            for number in range(3)
+        ],
+        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 10,
+        'cancellation_policy': 'Free cancellation up to 24 hours before the service.',
+        'created_at': now - timedelta(seconds=index),
+    })
+
+    contact_info = {'first_name': 'Benchmark', 'last_name': 'Customer', 'email': 'benchmark@example.com', 'phone': '0900000000'}
+    # bulk_create skips the signals, no outbox event is published for the seeded booking
+    booking = Booking.objects.bulk_create([
+        Booking(
+            code=f'BM{run_id}'.upper(),
+            total_price=sum(1_250_000 * 2 for _ in range(NUMBER_OF_BOOKING_ITEMS)),
+            contact_info=contact_info,
+            guest_info=contact_info,
+            details={'flight_number': 'VN123', 'pickup_address': '1 Benchmark street'},
+        )
+    ])[0]
+    BookingItem.objects.bulk_create([
+        BookingItem(
+            booking=booking,
+            product=product,
+            due_datetime=now + timedelta(days=index),
+            index=index,
+            quantity=2,
+            price=product.base_price_vnd,
+            total=product.base_price_vnd * 2,
+        )
+        for index, product in enumerate(products[:NUMBER_OF_BOOKING_ITEMS])
+    ])
+
+    return booking
+
+
+def build_product_list_payload() -> dict:
+    queryset = ProductWithPriceConfigurationSerializer.setup_eager_loading(
+        Product.objects.filter(code_name__startswith='benchmark_render_').order_by('-created_at')
+    )
+    data = ProductWithPriceConfigurationSerializer(queryset[:PAGE_SIZE], many=True).data
+    return {'total': len(data), 'total_page': 1, 'page_size': PAGE_SIZE, 'page': 1, 'data': data}
+
+
+def build_booking_detail_payload(booking: Booking) -> dict:
+    data = BookingSerializer(booking).data
+    items = booking.bookingitem_set.select_related('product').order_by('index')
+    data['items'] = BookingItemSerializer(items, many=True).data
+    return {'data': data}
+
+
+def time_renderer(renderer, payload) -> float:
+    durations = []
+    for _ in range(REPEAT):
+        start_time = time.perf_counter()
+        renderer.render(payload)
+        durations.append((time.perf_counter() - start_time) * 1000)
+
+    return statistics.median(durations)
+
+
+def compare(name: str, payload) -> None:
+    json_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+
+    # the clients must not see a difference
+    assert json.loads(json_renderer.render(payload)) == orjson.loads(orjson_renderer.render(payload)), \
+        f'{name}: the renderers do not produce the same document'
+
+    json_ms = time_renderer(json_renderer, payload)
+    orjson_ms = time_renderer(orjson_renderer, payload)
+    size = len(orjson_renderer.render(payload))
+    print(f'{name:<16} size={size / 1024:.1f}KB json={json_ms:.3f}ms orjson={orjson_ms:.3f}ms speedup={json_ms / orjson_ms:.1f}x')
+
+
+def run():
+    with rolled_back():
+        booking = seed()
+        compare('product list', build_product_list_payload())
+        compare('booking detail', build_booking_detail_payload(booking))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,95 @@
+"""
+Benchmark the number of queries and the time needed to resolve the applied price of every product.
+
+The dataset is rolled back at the end, see scripts/helpers.py.
+
+Usage:
+    APP_ENV=<env> python scripts/benchmark_price_configuration_resolution.py
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from app.product.models import ProductPriceConfiguration
+from app.product.models.price_configuration import PriceAdjustmentType, PriceAdjustmentTimeRangeType
+from app.product.services.product_price_configuration.precompute_product_price_service import PrecomputeProductPriceService
+from app.product.services.product_price_configuration.price_configuration_helpers import list_price_configurations_by_products, prune_price_configurations
+from scripts.helpers import rolled_back, seed_products
+
+
+SCENARIOS = [
+    # (number of products, number of price configurations)
+    (100, 10),
+    (1_000, 50),
+    (10_000, 500),
+]
+PRODUCTS_PER_PRICE_CONFIGURATION = 20
+
+
+def seed(number_of_products: int, number_of_price_configurations: int):
+    products = seed_products(number_of_products, build=lambda index: {
+        'base_price_vnd': 100_000 + index,
+        'base_price_usd': 10 + index % 100,
+    })
+
+    price_configurations = ProductPriceConfiguration.objects.bulk_create([
+        ProductPriceConfiguration(
+            name=f'Benchmark price configuration {index}',
+            code=f'BENCH{index:08d}',
+            adjustment_type=PriceAdjustmentType.PERCENTAGE,
+            adjustment_value={'percentage': index % 50 + 1},
+            time_range_type=PriceAdjustmentTimeRangeType.PERIOD,
+            time_range_value={},
+        )
+        for index in range(number_of_price_configurations)
+    ], batch_size=1_000)
+
+    # every other configuration is restricted to a slice of the catalogue, the rest apply to all products
+    ProductPriceConfigurationProduct = ProductPriceConfiguration.products.through
+    links = []
+    for index, price_configuration in enumerate(price_configurations):
+        if index % 2:
+            continue
+        for offset in range(PRODUCTS_PER_PRICE_CONFIGURATION):
+            product = products[(index * PRODUCTS_PER_PRICE_CONFIGURATION + offset) % number_of_products]
+            links.append(ProductPriceConfigurationProduct(
+                productpriceconfiguration_id=price_configuration.id,
+                product_id=product.id,
+            ))
+    ProductPriceConfigurationProduct.objects.bulk_create(links, batch_size=1_000, ignore_conflicts=True)
+
+
+def run(number_of_products: int, number_of_price_configurations: int):
+    with rolled_back():
+        seed(number_of_products, number_of_price_configurations)
+
+        with CaptureQueriesContext(connection) as queries:
+            start_time = time.perf_counter()
+            service = PrecomputeProductPriceService()
+            service.products = service.get_products()
+            service.all_price_configurations = list_price_configurations_by_products(service.products)
+            service.all_price_configurations['all'] = prune_price_configurations(service.all_price_configurations['all'])
+            service.get_applicable_price_configurations()
+            elapsed = time.perf_counter() - start_time
+
+        print(
+            f'products={number_of_products:>6} '
+            f'price_configurations={number_of_price_configurations:>4} '
+            f'queries={len(queries):>3} '
+            f'elapsed={elapsed:.2f}s'
+        )
+
+
+if __name__ == '__main__':
+    for number_of_products, number_of_price_configurations in SCENARIOS:
+        run(number_of_products, number_of_price_configurations)
@@ -0,0 +1,87 @@
+"""
+Benchmark the computation of a product availability calendar.
+
+The dataset is rolled back at the end, see scripts/helpers.py.
+
+Usage:
+    APP_ENV=<env> python scripts/benchmark_product_availability_calendar.py
+"""
+import os
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app.product.models import ProductAvailabilityConfiguration
+from app.product.models.availability_configuration import ProductAvailabilityConfigurationType
+from app.product.services.product_availability.precompute_product_availability_service import PrecomputeProductAvailabilityService
+from scripts.helpers import rolled_back, seed_products
+
+
+SCENARIOS = [
+    # (number of days, number of products)
+    (30, 100),
+    (90, 2_000),
+]
+CONFIGURATION_TYPES = [
+    (ProductAvailabilityConfigurationType.FIXED_QUANTITY, 5),
+    (ProductAvailabilityConfigurationType.PERCENTAGE_QUANTITY, 50),
+    (ProductAvailabilityConfigurationType.NO_LIMIT, 0),
+    (ProductAvailabilityConfigurationType.BLOCK, 0),
+]
+
+
+def seed(number_of_days: int, number_of_products: int) -> list[int]:
+    products = seed_products(number_of_products, build=lambda index: {'max_quantity': 20})
+
+    # every product gets one configuration per day, every other product a second competing one
+    start_date = timezone.localdate()
+    availability_configurations = []
+    for day_index in range(number_of_days):
+        day = start_date + timedelta(days=day_index)
+        for product_index, product in enumerate(products):
+            for offset in range(1 if product_index % 2 else 2):
+                type, value = CONFIGURATION_TYPES[(day_index + product_index + offset) % len(CONFIGURATION_TYPES)]
+                availability_configurations.append(
+                    ProductAvailabilityConfiguration(product=product, day=day, type=type, value=value),
+                )
+    ProductAvailabilityConfiguration.objects.bulk_create(availability_configurations, batch_size=5_000)
+
+    return [product.id for product in products]
+
+
+def run(number_of_days: int, number_of_products: int):
+    with rolled_back():
+        product_ids = seed(number_of_days, number_of_products)
+        start_date = timezone.localdate()
+
+        with CaptureQueriesContext(connection) as queries:
+            start_time = time.perf_counter()
+            PrecomputeProductAvailabilityService(
+                product_ids=product_ids,
+                start_date=start_date,
+                end_date=start_date + timedelta(days=number_of_days - 1),
+            ).perform()
+            elapsed = time.perf_counter() - start_time
+
+        print(
+            f'days={number_of_days:>3} '
+            f'products={number_of_products:>5} '
+            f'queries={len(queries):>3} '
+            f'elapsed={elapsed:.2f}s'
+        )
+
+
+if __name__ == '__main__':
+    for number_of_days, number_of_products in SCENARIOS:
+        run(number_of_days, number_of_products)
@@ -0,0 +1,124 @@
+"""
+Time the filtered product listing on a large catalogue.
+
+The listing query of every JSON filter (a page of products and its count) must run under TARGET_MS
+thanks to the GIN indexes, the script prints the median time and the plan of each filter and fails
+when one of them is slower. The products are rolled back at the end,
+see scripts/helpers.py. PostgreSQL only.
+
+Usage:
+    APP_ENV=<env> python scripts/benchmark_product_filters.py
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
+django.setup()
+
+from django.utils import timezone
+
+from app.product.filters import ProductFilter
+from app.product.models import Product, ServiceType
+from scripts.helpers import analyze, require_postgresql, rolled_back, seed_products
+
+
+NUMBER_OF_PRODUCTS = 50_000
+NUMBER_OF_PROVINCES = 63
+PAGE_SIZE = 10
+REPEAT = 20
+TARGET_MS = 10
+BATCH_SIZE = 5_000
+
+FILTERS = {
+    'province': {'province': 'province_1'},
+    'city': {'city': 'city_1'},
+    'district': {'district': 'district_1'},
+    'ward': {'ward': 'ward_1'},
+    'number_of_travellers': {'number_of_travellers': '4'},
+    'processing_time': {'processing_time': '2'},
+    'available_time_from': {'available_time_from': '2025-01-01T08:00:00'},
+    'province and travellers': {'province': 'province_1', 'number_of_travellers': '4'},
+}
+
+
+def build_details(service_type: str) -> dict:
+    if service_type == ServiceType.AIRPORT_TRANSFER:
+        return {'number_of_travellers': random.randint(1, 16), 'number_of_luggage': random.randint(0, 8)}
+    if service_type == ServiceType.FAST_TRACK:
+        return {'available_time_from': f'{random.randint(0, 12):02d}:00', 'available_time_to': '20:00'}
+    return {'processing_time': str(random.randint(1, 30))}
+
+
+def seed() -> None:
+    now = timezone.now()
+    service_types = [value for value, _ in ServiceType.choices]
+
+    def build(index: int) -> dict:
+        service_type = service_types[index % len(service_types)]
+        province = random.randint(0, NUMBER_OF_PROVINCES - 1)
+        return {
+            'service_type': service_type,
+            'details': build_details(service_type),
+            'available_locations': [{
+                'province': f'province_{province}',
+                'city': f'city_{province * 10 + random.randint(0, 9)}',
+                'district': f'district_{random.randint(0, 999)}',
+                'ward': f'ward_{random.randint(0, 9_999)}',
+            }],
+            'created_at': now - timedelta(seconds=index),
+        }
+
+    seed_products(NUMBER_OF_PRODUCTS, batch_size=BATCH_SIZE, build=build)
+    analyze(Product)
+
+
+def get_listing_queryset(params: dict):
+    queryset = Product.objects.filter(is_deleted=False).order_by('-created_at')
+    return ProductFilter(data=params, queryset=queryset).qs
+
+
+def time_listing(params: dict) -> float:
+    durations = []
+    for _ in range(REPEAT):
+        queryset = get_listing_queryset(params)
+        start_time = time.perf_counter()
+        # what the paginated listing runs: the count and one page
+        queryset.count()
+        list(queryset[:PAGE_SIZE])
+        durations.append((time.perf_counter() - start_time) * 1000)
+
+    return statistics.median(durations)
+
+
+def run():
+    require_postgresql('The JSON containment filters need a PostgreSQL database')
+
+    with rolled_back():
+        seed_start_time = time.perf_counter()
+        seed()
+        print(f'seeded {NUMBER_OF_PRODUCTS} products in {time.perf_counter() - seed_start_time:.1f}s')
+
+        slow_filters = []
+        for name, params in FILTERS.items():
+            median_ms = time_listing(params)
+            plan = get_listing_queryset(params)[:PAGE_SIZE].explain()
+            uses_gin = 'gin_idx' in plan
+            print(f'{name:<24} median={median_ms:.2f}ms gin_index={uses_gin}')
+            if median_ms > TARGET_MS:
+                slow_filters.append(name)
+                print(plan)
+
+    assert not slow_filters, f'slower than {TARGET_MS}ms: {", ".join(slow_filters)}'
+    print(f'OK: every filtered listing runs under {TARGET_MS}ms')
+
+
+if __name__ == '__main__':
+    run()
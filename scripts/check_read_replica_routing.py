@@ -0,0 +1,134 @@
+"""
+Check which database serves the reads of the catalogue, of the precompute tasks and of the writes.
+
+The configured replicas are used when there are some. Otherwise a replica_0 alias is registered on the
+primary database itself, like a replica without lag, so the script also runs on a single local PostgreSQL
+or SQLite database. To try real replication locally, point postgres.replicas of the config to a second
+database. The script does not write any row.
+
+Usage:
+    APP_ENV=<env> python scripts/check_read_replica_routing.py
+"""
+import os
+import sys
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
+django.setup()
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.test import Client
+
+from app.core import db_routers
+from app.core.middleware import PIN_TO_PRIMARY_COOKIE
+from app.location.models import Location
+from app.product.models import Product
+
+
+def register_mirror_replica() -> None:
+    connections.settings['replica_0'] = {**connections.settings['default'], 'TEST': {'MIRROR': 'default'}}
+    settings.DATABASE_REPLICAS = ['replica_0']
+
+
+def count_queries(function) -> Counter:
+    """
+    This function will count the queries run by the function on each database
+    Input: function, without argument
+    Output: {<alias>: <number of queries>}
+    """
+    queries = Counter()
+
+    def get_wrapper(alias):
+        def wrapper(execute, sql, params, many, context):
+            queries[alias] += 1
+            return execute(sql, params, many, context)
+        return wrapper
+
+    with ExitStack() as stack:
+        for alias in ['default', *settings.DATABASE_REPLICAS]:
+            stack.enter_context(connections[alias].execute_wrapper(get_wrapper(alias)))
+        function()
+
+    return queries
+
+
+def check(name: str, queries: Counter, expected_aliases) -> bool:
+    used_aliases = {alias for alias, count in queries.items() if count}
+    passed = bool(used_aliases) and used_aliases <= set(expected_aliases)
+    print(f'{"OK  " if passed else "FAIL"} {name:<32} {dict(queries)}')
+    return passed
+
+
+def read_product():
+    list(Product.objects.all()[:1])
+
+
+def read_product_in_replica_block():
+    with db_routers.use_read_replica():
+        read_product()
+
+
+def read_product_in_transaction():
+    with db_routers.use_read_replica(), transaction.atomic():
+        read_product()
+
+
+def read_write_read_in_replica_block():
+    with db_routers.use_read_replica():
+        read_product()
+        # matches no row, only the routing matters
+        Location.objects.filter(pk=-1).update(name='')
+        read_product()
+
+
+def run():
+    if not settings.DATABASE_REPLICAS:
+        register_mirror_replica()
+    replicas = settings.DATABASE_REPLICAS
+
+    client = Client()
+
+    def get_product_list():
+        # a query string of its own, the listing is not served from the response cache
+        client.get(f'/api/v1/product/?page_size=1&check={uuid.uuid4().hex}')
+
+    results = [
+        check('product list', count_queries(get_product_list), replicas),
+        check('read outside of a replica block', count_queries(read_product), ['default']),
+        check('read in a replica block', count_queries(read_product_in_replica_block), replicas),
+        check('read in a transaction', count_queries(read_product_in_transaction), ['default']),
+    ]
+
+    client.cookies[PIN_TO_PRIMARY_COOKIE] = '1'
+    results.append(check('product list after a write', count_queries(get_product_list), ['default']))
+    del client.cookies[PIN_TO_PRIMARY_COOKIE]
+
+    # one read before the write on a replica, the write and the read after it on the primary
+    queries = count_queries(read_write_read_in_replica_block)
+    passed = queries['default'] == 2 and sum(queries[alias] for alias in replicas) == 1
+    print(f'{"OK  " if passed else "FAIL"} {"read, write, read":<32} {dict(queries)}')
+    results.append(passed)
+
+    # a replica too far behind the primary is not read
+    max_lag = settings.REPLICA_MAX_LAG
+    settings.REPLICA_MAX_LAG = -1
+    db_routers._replica_lag_checked_at = None
+    try:
+        results.append(check('read from a lagging replica', count_queries(read_product_in_replica_block), ['default']))
+    finally:
+        settings.REPLICA_MAX_LAG = max_lag
+        db_routers._replica_lag_checked_at = None
+
+    assert all(results), 'the reads are not routed as expected'
+    print('OK: the reads are routed as expected')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,182 @@
+"""
+Run EXPLAIN (ANALYZE, BUFFERS) on the hot queries of the API against a seeded dataset.
+
+Every query is expected to be served by an index, the script prints the plans and fails when one of them
+still scans a whole table. The dataset is rolled back at the end,
+see scripts/helpers.py. PostgreSQL only.
+
+Usage:
+    APP_ENV=<env> python scripts/explain_hot_queries.py
+"""
+import os
+import random
+import sys
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
+django.setup()
+
+from django.utils import timezone
+
+from app.booking.models import Booking, BookingEventHistory, BookingEventTypeEnum, BookingInstanceTypeEnum
+from app.location.models import Location, LocationType
+from app.product.models import Product, ProductAvailabilityConfiguration, ServiceType
+from app.product.models.availability_configuration import ProductAvailabilityConfigurationType
+from app.supplier.models import Supplier
+from app.user.models import User, UserRole
+from scripts.helpers import analyze, require_postgresql, rolled_back, seed_products
+
+
+NUMBER_OF_PRODUCTS = 2_000
+NUMBER_OF_DAYS = 30
+NUMBER_OF_CUSTOMERS = 2_000
+BOOKINGS_PER_CUSTOMER = 10
+HISTORIES_PER_BOOKING = 3
+NUMBER_OF_LOCATIONS = 5_000
+NUMBER_OF_SUPPLIERS = 2_000
+DELETED_RATIO = 0.2
+BATCH_SIZE = 5_000
+
+
+def seed() -> dict:
+    run_id = uuid.uuid4().hex[:6]
+    today = timezone.localdate()
+    now = timezone.now()
+
+    suppliers = Supplier.objects.bulk_create([
+        Supplier(name=f'Explain supplier {index}', is_deleted=random.random() < DELETED_RATIO)
+        for index in range(NUMBER_OF_SUPPLIERS)
+    ], batch_size=BATCH_SIZE)
+
+    products = seed_products(NUMBER_OF_PRODUCTS, prefix='explain', batch_size=BATCH_SIZE, build=lambda index: {
+        'service_type': ServiceType.choices[index % len(ServiceType.choices)][0],
+        'supplier': random.choice(suppliers),
+        'is_deleted': random.random() < DELETED_RATIO,
+        'created_at': now - timedelta(minutes=index),
+    })
+
+    ProductAvailabilityConfiguration.objects.bulk_create([
+        ProductAvailabilityConfiguration(
+            product=product,
+            day=today + timedelta(days=day),
+            type=ProductAvailabilityConfigurationType.FIXED_QUANTITY,
+            value=100,
+        )
+        for product in products
+        for day in range(NUMBER_OF_DAYS)
+    ], batch_size=BATCH_SIZE)
+
+    customers = User.objects.bulk_create([
+        User(email=f'explain-{run_id}-{index}@example.com', role=UserRole.CUSTOMER)
+        for index in range(NUMBER_OF_CUSTOMERS)
+    ], batch_size=BATCH_SIZE)
+
+    # the codes are not allocated, bulk_create skips save()
+    bookings = Booking.objects.bulk_create([
+        Booking(
+            code=f'EX{run_id}{index}',
+            customer=customers[index % NUMBER_OF_CUSTOMERS],
+            is_deleted=random.random() < DELETED_RATIO,
+            created_at=now - timedelta(minutes=index),
+        )
+        for index in range(NUMBER_OF_CUSTOMERS * BOOKINGS_PER_CUSTOMER)
+    ], batch_size=BATCH_SIZE)
+
+    BookingEventHistory.objects.bulk_create([
+        BookingEventHistory(
+            event_type=BookingEventTypeEnum.UPDATE,
+            instance_type=BookingInstanceTypeEnum.BOOKING,
+            instance_id=str(booking.id),
+            description=f'Explain event {index}',
+            dedupe_key=uuid.uuid4().hex,
+        )
+        for booking in bookings
+        for index in range(HISTORIES_PER_BOOKING)
+    ], batch_size=BATCH_SIZE)
+
+    provinces = [f'province-{index}' for index in range(60)]
+    Location.objects.bulk_create([
+        Location(
+            name=f'Explain location {index}',
+            code=f'explain_location_{index}',
+            type=LocationType.choices[index % len(LocationType.choices)][0],
+            is_enabled=random.random() > DELETED_RATIO,
+            address='',
+            province=random.choice(provinces),
+            city=f'city-{index % 300}',
+            district=f'district-{index % 1_000}',
+            ward=f'ward-{index}',
+            latitude=0,
+            longitude=0,
+        )
+        for index in range(NUMBER_OF_LOCATIONS)
+    ], batch_size=BATCH_SIZE)
+
+    analyze(Supplier, Product, ProductAvailabilityConfiguration, User, Booking, BookingEventHistory, Location)
+
+    return {
+        'today': today,
+        'products': [product for product in products if not product.is_deleted],
+        'customer': customers[0],
+        'booking': bookings[0],
+        'activation_code': customers[0].activation_code,
+        'province': provinces[0],
+    }
+
+
+def get_hot_queries(data: dict) -> dict:
+    return {
+        'availability calendar (product, day range)': ProductAvailabilityConfiguration.objects.filter(
+            product_id__in=[product.id for product in data['products'][:20]],
+            day__gte=data['today'],
+            day__lte=data['today'] + timedelta(days=7),
+            is_deleted=False,
+        ),
+        'booking event histories': BookingEventHistory.objects.filter(
+            instance_type=BookingInstanceTypeEnum.BOOKING,
+            instance_id=str(data['booking'].id),
+        ).order_by('created_at'),
+        'bookings of a customer': Booking.objects.filter(
+            customer=data['customer'],
+            is_deleted=False,
+        ).order_by('-created_at')[:10],
+        'booking listing': Booking.objects.filter(is_deleted=False).order_by('-created_at')[:10],
+        'user by activation code': User.objects.filter(activation_code=data['activation_code']),
+        'customer listing': User.objects.filter(
+            role__in=[UserRole.CUSTOMER, UserRole.BUSINESS],
+            is_deleted=False,
+        ).order_by('-id')[:10],
+        'locations by type and area': Location.objects.filter(
+            is_enabled=True,
+            type=LocationType.AIRPORT,
+            province=data['province'],
+        ),
+        'product listing': Product.objects.filter(is_deleted=False).order_by('-created_at')[:10],
+        'supplier listing': Supplier.objects.filter(is_deleted=False).order_by('-created_at')[:10],
+    }
+
+
+def run():
+    require_postgresql('EXPLAIN (ANALYZE, BUFFERS) needs a PostgreSQL database')
+
+    with rolled_back():
+        data = seed()
+
+        sequential_scans = []
+        for name, queryset in get_hot_queries(data).items():
+            plan = queryset.explain(analyze=True, buffers=True)
+            print(f'=== {name}\n{plan}\n')
+            if 'Seq Scan' in plan:
+                sequential_scans.append(name)
+
+    assert not sequential_scans, f'sequential scans left: {", ".join(sequential_scans)}'
+    print('OK: every hot query uses an index')
+
+
+if __name__ == '__main__':
+    run()
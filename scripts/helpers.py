@@ -0,0 +1,75 @@
+"""
+Shared by the benchmark scripts: their dataset is seeded inside a transaction that is rolled back at the end,
+so they can be pointed at a development database without leaving rows behind.
+
+Imported once the script has set Django up.
+"""
+import sys
+import uuid
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+from app.product.models import Product, ProductUnit, ServiceType
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """
+    This function will run the block in a transaction and roll it back, the values assigned in the block are kept
+    Usage:
+        with rolled_back():
+            seed()
+            result = measure()
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback()
+    except Rollback:
+        pass
+
+
+def require_postgresql(reason: str) -> None:
+    if connection.vendor != 'postgresql':
+        sys.exit(reason)
+
+
+def analyze(*models) -> None:
+    # the planner only prefers the indexes once it knows the size of the tables
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+
+def seed_products(number_of_products: int, prefix: str = 'benchmark', batch_size: int = 1_000, build=None) -> list[Product]:
+    """
+    This function will bulk create products with unique code names
+    Input:
+        number_of_products: int
+        prefix: str, the prefix of the names and code names
+        batch_size: int
+        build: function(index) -> dict, the fields of a product that differ from the defaults
+    Output:
+        list[Product]
+    """
+    run_id = uuid.uuid4().hex[:6]
+    products = []
+    for index in range(number_of_products):
+        fields = {
+            'name': f'{prefix.capitalize()} product {index}',
+            'code_name': f'{prefix}_{run_id}_{index}',
+            'service_type': ServiceType.FAST_TRACK,
+            'unit': ProductUnit.PERSON,
+            'base_price_vnd': 100_000,
+            'base_price_usd': 10,
+        }
+        if build:
+            fields.update(build(index))
+        products.append(Product(**fields))
+
+    return Product.objects.bulk_create(products, batch_size=batch_size)
@@ -0,0 +1,161 @@
+"""
+Load test the API server on /health and the product list.
+
+Each client process keeps one connection open and sends requests in a loop for the duration of the run,
+the script prints the requests per second and the latency percentiles of each path.
+
+Against a running server:
+    python scripts/load_test_server.py --url http://127.0.0.1:8000
+
+With --workers, the script starts gunicorn with the production configuration once per number of workers and
+prints how the throughput scales with them, e.g. one worker per core:
+    APP_ENV=<env> python scripts/load_test_server.py --workers 1,2,4,8
+
+The clients run on the same machine as the server in that mode, keep --concurrency and the number of workers
+under the number of cores for the scaling to be visible.
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PATHS = ['/health', '/api/v1/product/']
+SERVER_PORT = 8765
+SERVER_START_TIMEOUT = 30
+
+
+def send_requests(url: str, path: str, duration: float) -> tuple[list[float], int]:
+    """
+    This function will send requests to the path on one keep-alive connection until the duration is over
+    Input:
+        url: str, the server, like http://127.0.0.1:8000
+        path: str
+        duration: float, seconds
+    Output: (the latency of each successful request in ms, the number of failed requests)
+    """
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.hostname, parts.port, timeout=30)
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start_time = time.perf_counter()
+        try:
+            connection.request('GET', path, headers={'Accept': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            continue
+
+        if response.status == 200:
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        else:
+            errors += 1
+
+    connection.close()
+    return latencies, errors
+
+
+def load_test(url: str, path: str, concurrency: int, duration: float) -> dict:
+    with multiprocessing.Pool(concurrency) as pool:
+        results = pool.starmap(send_requests, [(url, path, duration)] * concurrency)
+
+    latencies = sorted(latency for process_latencies, _ in results for latency in process_latencies)
+    errors = sum(process_errors for _, process_errors in results)
+    if len(latencies) < 2:
+        return {'rps': 0, 'p50': 0, 'p99': 0, 'errors': errors}
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        'rps': len(latencies) / duration,
+        'p50': percentiles[49],
+        'p99': percentiles[98],
+        'errors': errors,
+    }
+
+
+def print_results(label: str, path: str, result: dict) -> None:
+    print(
+        f'{label:<12} {path:<20} rps={result["rps"]:>8.1f} '
+        f'p50={result["p50"]:>7.2f}ms p99={result["p99"]:>7.2f}ms errors={result["errors"]}'
+    )
+
+
+def start_server(workers: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn',
+            '--config', 'app/core/gunicorn.conf.py',
+            '--workers', str(workers),
+            '--bind', f'127.0.0.1:{SERVER_PORT}',
+            '--access-logfile', '/dev/null',
+        ],
+        cwd=BASE_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.perf_counter() + SERVER_START_TIMEOUT
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            sys.exit(f'gunicorn exited with code {server.returncode}')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', SERVER_PORT, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+
+    stop_server(server)
+    sys.exit(f'gunicorn did not answer on /health within {SERVER_START_TIMEOUT}s')
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    # TERM is the graceful shutdown of gunicorn
+    server.send_signal(signal.SIGTERM)
+    server.wait()
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='the server to test, ignored with --workers')
+    parser.add_argument('--workers', help='comma separated numbers of gunicorn workers to start and compare')
+    parser.add_argument('--concurrency', type=int, default=os.cpu_count() or 1, help='number of client processes')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per path')
+    args = parser.parse_args()
+
+    if not args.workers:
+        for path in PATHS:
+            print_results(args.url, path, load_test(args.url, path, args.concurrency, args.duration))
+        return
+
+    url = f'http://127.0.0.1:{SERVER_PORT}'
+    baseline = {}
+    for workers in [int(value) for value in args.workers.split(',')]:
+        server = start_server(workers)
+        try:
+            for path in PATHS:
+                result = load_test(url, path, args.concurrency, args.duration)
+                baseline.setdefault(path, result['rps'])
+                print_results(f'workers={workers}', path, result)
+                if baseline[path]:
+                    print(f'{"":<12} {"":<20} scaling={result["rps"] / baseline[path]:.2f}x')
+        finally:
+            stop_server(server)
+
+
+if __name__ == '__main__':
+    run()
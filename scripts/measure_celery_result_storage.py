@@ -0,0 +1,86 @@
+"""
+Measure what the Celery result backend costs for a burst of fire-and-forget tasks.
+
+A no-op task is run NUMBER_OF_TASKS times through the Celery tracer, which stores the results the same way
+a worker does, once with the results stored (the previous behaviour) and once with the policy of
+TASKS_WITH_RESULTS. The script prints the keys, the memory and the commands added to the result database
+of Redis, and deletes the results it created. It needs the Redis result backend of the config.
+
+Usage:
+    APP_ENV=<env> python scripts/measure_celery_result_storage.py
+"""
+import logging
+import os
+import sys
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.core.settings')
+django.setup()
+
+from app.core.celery import TASKS_WITH_RESULTS, celery_app
+
+
+NUMBER_OF_TASKS = 10_000
+DELETE_BATCH_SIZE = 1_000
+TASK_NAME = 'measure_result_storage_task'
+
+
+@celery_app.task(name=TASK_NAME)
+def measure_result_storage_task(index: int):
+    return None
+
+
+def get_redis_metrics(redis) -> dict:
+    return {
+        'keys': redis.dbsize(),
+        'memory': redis.info('memory')['used_memory'],
+        'commands': redis.info('stats')['total_commands_processed'],
+    }
+
+
+def run_burst(ignore_result: bool) -> dict:
+    """
+    This function will run the burst of tasks and return what it added to the result database
+    Input: ignore_result, the policy of the task
+    Output: {'keys', 'memory', 'commands'}
+    """
+    redis = celery_app.backend.client
+    measure_result_storage_task.ignore_result = ignore_result
+
+    metrics_before = get_redis_metrics(redis)
+    task_ids = [measure_result_storage_task.apply(args=(index,)).id for index in range(NUMBER_OF_TASKS)]
+    metrics_after = get_redis_metrics(redis)
+
+    # the two INFO commands of the first measure are not part of the burst
+    added = {name: metrics_after[name] - metrics_before[name] for name in metrics_before}
+    added['commands'] -= 2
+
+    for start in range(0, len(task_ids), DELETE_BATCH_SIZE):
+        redis.delete(*[celery_app.backend.get_key_for_task(task_id) for task_id in task_ids[start:start + DELETE_BATCH_SIZE]])
+
+    return added
+
+
+def run():
+    # the tracer stores the results of the tasks run in process like a worker does
+    celery_app.conf.task_store_eager_result = True
+    logging.getLogger('celery.app.trace').setLevel(logging.WARNING)
+
+    results = {
+        'results stored': run_burst(ignore_result=False),
+        'with the policy': run_burst(ignore_result=TASK_NAME not in TASKS_WITH_RESULTS),
+    }
+
+    print(f'{NUMBER_OF_TASKS} tasks, results expire after {celery_app.conf.result_expires}s')
+    for label, added in results.items():
+        print(
+            f'{label:<16} keys=+{added["keys"]:<8} memory=+{added["memory"] / 1024 / 1024:.2f}MB '
+            f'commands=+{added["commands"]} ({added["commands"] / NUMBER_OF_TASKS:.1f} per task)'
+        )
+
+
+if __name__ == '__main__':
+    run()